@@ -0,0 +1,222 @@
+"""
+Lokaler Ersatz für die BGG XML API2
+
+Liefert synthetische Antworten für die Endpoints `plays`, `thing` und `search` (siehe benchmarks/synthetic.py),
+die Spiele werden pro Seite erzeugt, der Speicherbedarf hängt also nicht von der Anzahl der Spiele ab.
+Zum Testen des Clients lassen sich Fehler einstreuen:
+  - Latenz pro Request
+  - 202 Accepted (BGG hat die Anfrage in die Warteschlange gestellt)
+  - 429 Too Many Requests mit Retry-After
+  - abgeschnittene Antworten (unvollständiges XML)
+  - unvollständige thing-Antworten (einzelne Brettspiele fehlen)
+
+Verwendung:
+    uv run python benchmarks/fake_bgg.py --plays 10000 --latency 0.05 --throttle-rate 0.02
+    BGG_BASE_URL=http://127.0.0.1:8765 uv run ".\\bogan\\db\\update_db.py"
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import xmltodict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_play, make_thing  # noqa: E402
+
+PLAYS_PER_PAGE = 100
+# Datum des ersten synthetischen Spiels, danach drei Spiele pro Tag (siehe make_play)
+FIRST_PLAY_DATE = date(2015, 1, 1)
+PLAYS_PER_DAY = 3
+
+
+class FakeBggServer(ThreadingHTTPServer):
+    """HTTP-Server mit dem Zustand der synthetischen BGG-Daten"""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int] = ("127.0.0.1", 0),
+        plays: int = 1000,
+        boardgames: int = 200,
+        latency: float = 0.0,
+        accepted_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        truncate_rate: float = 0.0,
+        drop_rate: float = 0.0,
+        retry_after: int = 1,
+        seed: int = 1,
+    ):
+        super().__init__(address, FakeBggHandler)
+        self.plays = plays
+        self.boardgames = boardgames
+        self.latency = latency
+        self.accepted_rate = accepted_rate
+        self.throttle_rate = throttle_rate
+        self.truncate_rate = truncate_rate
+        self.drop_rate = drop_rate
+        self.retry_after = retry_after
+        self.seed = seed
+        self.requests = {"plays": 0, "thing": 0, "search": 0, "accepted": 0, "throttled": 0, "truncated": 0, "dropped": 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def add_plays(self, count: int):
+        """Neue Spiele hinzufügen (z.B. für einen inkrementellen Sync)"""
+        with self._lock:
+            self.plays += count
+
+    def count(self, key: str):
+        with self._lock:
+            self.requests[key] += 1
+
+    def roll(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < rate
+
+    def plays_page(self, page: int, mindate: str = None) -> bytes:
+        """Seite des plays-Endpoints, neueste Spiele zuerst, optional ab mindate"""
+        first_index = 0
+        if mindate:
+            days = (date.fromisoformat(mindate) - FIRST_PLAY_DATE).days
+            first_index = max(0, days * PLAYS_PER_DAY)
+        total = max(0, self.plays - first_index)
+
+        newest = self.plays - 1 - (page - 1) * PLAYS_PER_PAGE
+        indices = range(newest, max(newest - PLAYS_PER_PAGE, first_index - 1), -1)
+        plays = [make_play(index, self.boardgames, self.seed) for index in indices]
+
+        document = {"plays": {"@username": "fake", "@userid": "1", "@total": str(total), "@page": str(page)}}
+        if plays:
+            document["plays"]["play"] = plays
+        return xmltodict.unparse(document).encode()
+
+    def things(self, ids: list[int]) -> bytes:
+        """Antwort des thing-Endpoints für ids, mit drop_rate fehlen einzelne Brettspiele"""
+        document = {"items": {"@termsofuse": "https://boardgamegeek.com/xmlapi/termsofuse"}}
+        items = []
+        for bgg_id in ids:
+            if self.roll(self.drop_rate):
+                self.count("dropped")
+                continue
+            items.append(make_thing(bgg_id))
+        if items:
+            document["items"]["item"] = items
+        return xmltodict.unparse(document).encode()
+
+    def search(self, query: str) -> bytes:
+        """Antwort des search-Endpoints: bis zu fünf Brettspiele, abhängig vom Suchbegriff"""
+        rnd = random.Random(query)
+        ids = rnd.sample(range(1, self.boardgames + 1), min(5, self.boardgames))
+        items = [
+            {"@type": "boardgame", "@id": str(bgg_id), "name": {"@type": "primary", "@value": f"Brettspiel {bgg_id}"}}
+            for bgg_id in ids
+        ]
+        document = {"items": {"@total": str(len(items)), "item": items}}
+        return xmltodict.unparse(document).encode()
+
+
+class FakeBggHandler(BaseHTTPRequestHandler):
+    server: FakeBggServer
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        endpoint = url.path.rstrip("/").rsplit("/", 1)[-1]
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        if endpoint == "plays":
+            body = self.server.plays_page(int(params.get("page", 1)), params.get("mindate"))
+        elif endpoint == "thing":
+            ids = [int(id_) for id_ in params.get("id", "").split(",") if id_]
+            body = self.server.things(ids)
+        elif endpoint == "search":
+            body = self.server.search(params.get("query", ""))
+        else:
+            self.send_error(404, f"Unbekannter Endpoint {endpoint}")
+            return
+        self.server.count(endpoint)
+
+        if self.server.roll(self.server.accepted_rate):
+            self.server.count("accepted")
+            self._send(202, b"")
+        elif self.server.roll(self.server.throttle_rate):
+            self.server.count("throttled")
+            self._send(429, b"", {"Retry-After": str(self.server.retry_after)})
+        elif self.server.roll(self.server.truncate_rate):
+            self.server.count("truncated")
+            self._send(200, body[: len(body) // 2])
+        else:
+            self._send(200, body)
+
+    def _send(self, status: int, body: bytes, headers: dict = None):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/xml; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # kein Log pro Request
+        pass
+
+
+def start_server(**kwargs) -> FakeBggServer:
+    """Startet den Server in einem Hintergrund-Thread, Port 0 = freier Port"""
+    server = FakeBggServer(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--boardgames", type=int, default=200, help="Anzahl unterschiedlicher Brettspiele")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latenz pro Request in Sekunden")
+    parser.add_argument("--accepted-rate", type=float, default=0.0, help="Anteil der Antworten mit 202")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Anteil der Antworten mit 429")
+    parser.add_argument("--truncate-rate", type=float, default=0.0, help="Anteil abgeschnittener Antworten")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Anteil fehlender Brettspiele bei thing")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After bei 429 in Sekunden")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lokaler Ersatz für die BGG XML API2")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--plays", type=int, default=1000, help="Anzahl synthetischer Spiele")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    server = FakeBggServer(
+        ("127.0.0.1", args.port),
+        plays=args.plays,
+        boardgames=args.boardgames,
+        latency=args.latency,
+        accepted_rate=args.accepted_rate,
+        throttle_rate=args.throttle_rate,
+        truncate_rate=args.truncate_rate,
+        drop_rate=args.drop_rate,
+        retry_after=args.retry_after,
+    )
+    print(f"Fake BGG API unter {server.url} ({args.plays} Spiele), beenden mit Strg+C")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -0,0 +1,111 @@
+"""
+Benchmark: Ingest über die (lokale) BGG-API
+
+Startet benchmarks/fake_bgg.py im Hintergrund und führt gegen eine temporäre SQLite-Datenbank
+für jede Größe einen vollständigen und einen inkrementellen Sync aus. Gemessen werden:
+  - Durchsatz (Spiele pro Sekunde)
+  - maximaler Speicherbedarf (tracemalloc, verlangsamt den Lauf, abschaltbar mit --no-memory)
+  - Anzahl SQL-Statements
+  - BGG-Calls und Retries
+
+Verwendung:
+    uv run python benchmarks/ingest.py --plays 1000 10000 100000
+    uv run python benchmarks/ingest.py --plays 1000 --latency 0.05 --accepted-rate 0.05 --throttle-rate 0.02
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import tempfile
+import tracemalloc
+from time import perf_counter
+
+from sqlalchemy import create_engine
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bogan.config as cfg  # noqa: E402
+from benchmarks.fake_bgg import add_arguments, start_server  # noqa: E402
+
+
+def use_fake_bgg(url: str):
+    """Client und Cache auf den lokalen Server umstellen: kein Rate-Limit, kurzes Backoff, kein Cache"""
+    from bogan.db import bgg_cache, bgg_client
+
+    bgg_client._client = bgg_client.BggClient(base_url=url, token=None, requests_per_second=0, backoff_base=0.05)
+    bgg_client._client_pid = os.getpid()
+    bgg_cache._cache = bgg_cache.BggCache(path=os.path.join(tempfile.mkdtemp(prefix="bogan_cache_"), "c.db"), ttl={})
+
+
+def measure(func, memory: bool) -> tuple[float, float]:
+    """Führt func aus, gibt (Laufzeit in s, maximaler Speicher in MB) zurück"""
+    if memory:
+        tracemalloc.start()
+    t_start = perf_counter()
+    func()
+    duration = perf_counter() - t_start
+    peak = 0.0
+    if memory:
+        peak = tracemalloc.get_traced_memory()[1] / 1024**2
+        tracemalloc.stop()
+    return duration, peak
+
+
+def run(sizes: list[int], new_plays: int, memory: bool, server_args: dict):
+    from bogan.db.bgg_client import get_client
+    from bogan.utils import QueryCounter
+
+    update_db = importlib.import_module("bogan.db.update_db")
+
+    print(f"{'Spiele':>8} {'Szenario':<14} {'Zeit [s]':>9} {'Spiele/s':>9} {'Peak [MB]':>10} "
+          f"{'Statements':>11} {'BGG Calls':>10} {'Retries':>8}")
+    for size in sizes:
+        server = start_server(plays=size, **server_args)
+        use_fake_bgg(server.url)
+
+        # eigene Datenbank pro Größe
+        db_file = os.path.join(tempfile.mkdtemp(prefix="bogan_ingest_"), "ingest.db")
+        update_db.init_engine(create_engine(f"sqlite:///{db_file}"))
+
+        scenarios = [("vollständig", False, size), ("inkrementell", True, new_plays)]
+        for name, incremental, plays in scenarios:
+            if incremental:
+                server.add_plays(new_plays)
+            client = get_client()
+            client.reset_stats()
+            with QueryCounter(update_db.engine) as counter:
+                duration, peak = measure(
+                    lambda: update_db.update_db(from_api=True, incremental=incremental), memory
+                )
+            stats = client.stats
+            print(
+                f"{size:>8} {name:<14} {duration:>9.2f} {plays / duration:>9.0f} {peak:>10.1f} "
+                f"{counter.count:>11} {stats.calls:>10} {stats.retries:>8}"
+            )
+
+        print(f"{'':>8} Fake BGG: {server.requests}")
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest-Benchmark gegen einen lokalen BGG-Ersatz")
+    parser.add_argument("--plays", type=int, nargs="+", default=[1000], help="Anzahl Spiele, mehrere möglich")
+    parser.add_argument("--new", type=int, default=10, help="neue Spiele für den inkrementellen Sync")
+    parser.add_argument("--no-memory", action="store_true", help="ohne tracemalloc (schneller)")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    cfg.logger_cfg.log_in_file = False
+    cfg.logger_cfg.loglevel_stream = "warning"
+    server_args = {
+        "boardgames": args.boardgames,
+        "latency": args.latency,
+        "accepted_rate": args.accepted_rate,
+        "throttle_rate": args.throttle_rate,
+        "truncate_rate": args.truncate_rate,
+        "drop_rate": args.drop_rate,
+        "retry_after": args.retry_after,
+    }
+    run(args.plays, args.new, not args.no_memory, server_args)
@@ -0,0 +1,88 @@
+"""
+Benchmark: Auslesen der BGG-Datensätze
+
+Vergleicht für synthetische Spiele und Brettspiele die CPU-Zeit beim Auslesen aller Felder:
+  - nested_get: jeder Pfad wird pro Aufruf mit isinstance-Prüfungen abgelaufen
+  - Schema: übersetzte Extraktoren aus bogan/db/bgg_schema.py
+
+Verwendung:
+    uv run python benchmarks/parse.py --records 20000
+"""
+
+import argparse
+import os
+import sys
+from time import process_time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_play, make_thing  # noqa: E402
+from bogan.db.bgg_schema import PLAY, THING  # noqa: E402
+from bogan.utils import nested_get  # noqa: E402
+
+
+def play_with_nested_get(my_game: dict) -> tuple:
+    players = nested_get(my_game, ["players", "player"]) or []
+    if isinstance(players, dict):
+        players = [players]
+    return (
+        nested_get(my_game, ["@id"], int),
+        my_game.get("@date"),
+        nested_get(my_game, ["@length"], int),
+        my_game.get("@location"),
+        nested_get(my_game, ["item", "@objectid"], int),
+        [
+            (p.get("@name"), p.get("@username") or None, nested_get(p, ["@score"], float) or 0.0, p.get("@win") == "1")
+            for p in players
+        ],
+    )
+
+
+def thing_with_nested_get(thing: dict) -> tuple:
+    return (
+        nested_get(thing, ["@id"], int),
+        nested_get(thing, ["name", 0, "@value"], str),
+        nested_get(thing, ["image"], str),
+        nested_get(thing, ["thumbnail"], str),
+        nested_get(thing, ["yearpublished", "@value"], int),
+        nested_get(thing, ["minplayers", "@value"], int),
+        nested_get(thing, ["maxplayers", "@value"], int),
+        nested_get(thing, ["playingtime", "@value"], int),
+        nested_get(thing, ["statistics", "ratings", "average", "@value"], float),
+        nested_get(thing, ["statistics", "ratings", "averageweight", "@value"], float),
+        any(link.get("@value") == "Cooperative Game" for link in thing.get("link")),
+    )
+
+
+def measure(func, records: list[dict], repeat: int) -> float:
+    """Beste CPU-Zeit aus repeat Durchläufen in Sekunden"""
+    best = float("inf")
+    for _ in range(repeat):
+        t_start = process_time()
+        for record in records:
+            func(record)
+        best = min(best, process_time() - t_start)
+    return best
+
+
+def run(count: int, repeat: int):
+    plays = [make_play(index) for index in range(count)]
+    things = [make_thing(100 + index) for index in range(count)]
+
+    print(f"{count} Datensätze, beste von {repeat} Durchläufen (CPU-Zeit)")
+    print(f"{'Datensatz':<10} {'nested_get [s]':>15} {'Schema [s]':>11} {'Faktor':>7}")
+    for name, records, old, new in [
+        ("play", plays, play_with_nested_get, PLAY.extract),
+        ("thing", things, thing_with_nested_get, THING.extract),
+    ]:
+        t_old = measure(old, records, repeat)
+        t_new = measure(new, records, repeat)
+        print(f"{name:<10} {t_old:>15.3f} {t_new:>11.3f} {t_old / t_new:>7.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CPU-Zeit beim Auslesen der BGG-Datensätze")
+    parser.add_argument("--records", type=int, default=20000, help="Anzahl Spiele und Brettspiele")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.records, args.repeat)
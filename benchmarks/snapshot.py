@@ -0,0 +1,81 @@
+"""
+Benchmark: Speichern und Laden der Spieleliste
+
+Vergleicht für synthetische Spiele die JSON-Liste (eingerückt, Format älterer Versionen von
+`update_db(save_file=True)`) mit dem Snapshot (gzip-komprimiertes NDJSON, bogan/db/snapshot.py):
+  - Dateigröße
+  - Zeit zum Schreiben und Lesen
+  - maximaler Speicherbedarf beim Lesen (tracemalloc)
+
+Verwendung:
+    uv run python benchmarks/snapshot.py --plays 10000 100000
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_play  # noqa: E402
+from bogan.db.snapshot import read_snapshot, write_snapshot_stream  # noqa: E402
+
+
+def write_json(plays, path: str):
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(list(plays), file, indent=4, ensure_ascii=False)
+
+
+def read_json(path: str) -> int:
+    with open(path, "r", encoding="utf-8") as file:
+        return len(json.load(file))
+
+
+def write_ndjson_gz(plays, path: str):
+    for _ in write_snapshot_stream(plays, path, user="benchmark"):
+        pass
+
+
+def read_ndjson_gz(path: str) -> int:
+    return sum(1 for _ in read_snapshot(path))
+
+
+def measure(func, *args) -> tuple[float, float]:
+    """Führt func aus, gibt (Laufzeit in s, maximaler Speicher in MB) zurück"""
+    tracemalloc.start()
+    t_start = perf_counter()
+    func(*args)
+    duration = perf_counter() - t_start
+    peak = tracemalloc.get_traced_memory()[1] / 1024**2
+    tracemalloc.stop()
+    return duration, peak
+
+
+def run(sizes: list[int]):
+    directory = tempfile.mkdtemp(prefix="bogan_snapshot_")
+    print(f"{'Spiele':>8} {'Format':<12} {'Größe [MB]':>11} {'Schreiben [s]':>14} {'Lesen [s]':>10} {'Peak [MB]':>10}")
+    for size in sizes:
+        for name, suffix, write, read in [
+            ("JSON", "json", write_json, read_json),
+            ("NDJSON.gz", "ndjson.gz", write_ndjson_gz, read_ndjson_gz),
+        ]:
+            path = os.path.join(directory, f"plays_{size}.{suffix}")
+            t_write = perf_counter()
+            write((make_play(index) for index in range(size)), path)
+            t_write = perf_counter() - t_write
+            t_read, peak = measure(read, path)
+            print(
+                f"{size:>8} {name:<12} {os.path.getsize(path) / 1024**2:>11.2f} {t_write:>14.2f} "
+                f"{t_read:>10.2f} {peak:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Größe und Ladezeit der gespeicherten Spieleliste")
+    parser.add_argument("--plays", type=int, nargs="+", default=[10000], help="Anzahl Spiele, mehrere möglich")
+    args = parser.parse_args()
+    run(args.plays)
@@ -0,0 +1,71 @@
+"""
+Benchmark: Anzahl SQL-Statements pro Sync
+
+Führt `update_db` gegen eine temporäre SQLite-Datenbank mit synthetischen Spielen aus
+(BGG wird dabei nicht abgefragt) und zählt alle ausgeführten SQL-Statements für:
+  - initialer Sync (leere Datenbank)
+  - erneuter Sync ohne Änderungen
+  - inkrementeller Sync mit einem neuen Spiel
+
+Verwendung:
+    uv run python benchmarks/sync_queries.py --plays 1000
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import tempfile
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bogan.config as cfg  # noqa: E402
+from benchmarks.synthetic import make_play, make_plays, make_thing  # noqa: E402
+
+
+def run(plays_count: int):
+    db_file = os.path.join(tempfile.mkdtemp(prefix="bogan_bench_"), "bench.db")
+    cfg.DB2USE = f"sqlite:///{db_file}"
+
+    # erst nach dem Setzen der Datenbank importieren
+    from bogan.db.models import Boardgame
+    from bogan.utils import QueryCounter
+
+    update_db = importlib.import_module("bogan.db.update_db")
+    update_db.init_engine()
+
+    plays = make_plays(plays_count)
+    update_db.iter_plays = lambda user, mindate=None, start_page=1: iter(
+        [play for play in plays if not mindate or play["@date"] >= mindate]
+    )
+    update_db.ask_boardgame = lambda ids, names=None, **kwargs: [
+        Boardgame().from_bgg(make_thing(int(bgg_id))) for bgg_id in ids
+    ]
+
+    scenarios = [
+        ("initialer Sync", {"incremental": False}, None),
+        ("Sync ohne Änderungen", {"incremental": False}, None),
+        ("inkrementell, 1 neues Spiel", {"incremental": True}, make_play(plays_count)),
+    ]
+
+    print(f"{plays_count} Spiele, Datenbank: {db_file}")
+    print(f"{'Szenario':<30} {'Statements':>12} {'Zeit [s]':>10}")
+    for name, kwargs, new_play in scenarios:
+        if new_play:
+            plays.insert(0, new_play)
+        with QueryCounter(update_db.engine) as counter:
+            t_start = perf_counter()
+            update_db.update_db(from_api=True, **kwargs)
+            duration = perf_counter() - t_start
+        print(f"{name:<30} {counter.count:>12} {duration:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Zählt die SQL-Statements pro Sync")
+    parser.add_argument("--plays", type=int, default=1000, help="Anzahl synthetischer Spiele")
+    args = parser.parse_args()
+
+    cfg.logger_cfg.log_in_file = False
+    cfg.logger_cfg.loglevel_stream = "warning"
+    run(args.plays)
@@ -0,0 +1,81 @@
+"""
+Synthetische BGG-Daten für Benchmarks
+
+Erzeugt reproduzierbare Spiele (plays) und Brettspiele (thing) im Format von xmltodict,
+so wie sie von `bogan.db.ask_bgg` geliefert werden.
+"""
+
+import random
+from datetime import date, timedelta
+
+PLAYER_NAMES = ["Anna", "Ben", "Cleo", "Dirk", "Eva", "Finn", "Greta", "Hugo", "Ida", "Jonas", "Kira", "Lars"]
+LOCATIONS = ["Zuhause", "Spieletreff", "Cafe", "Solospiel", "Baiersbronn"]
+FIRST_PLAY_ID = 10_000_000
+FIRST_BGG_ID = 100
+
+
+def make_play(index: int, boardgames: int = 200, seed: int = 1) -> dict:
+    """Erzeugt ein einzelnes Spiel, der Inhalt hängt nur von index und seed ab"""
+    rnd = random.Random(seed * 1_000_003 + index)
+    players = rnd.sample(PLAYER_NAMES, rnd.randint(2, 5))
+    winner = rnd.randrange(len(players))
+    bgg_id = FIRST_BGG_ID + rnd.randrange(boardgames)
+
+    return {
+        "@id": str(FIRST_PLAY_ID + index),
+        "@date": (date(2015, 1, 1) + timedelta(days=index // 3)).isoformat(),
+        "@quantity": "1",
+        "@length": str(rnd.choice([0, 30, 45, 60, 90, 120])),
+        "@incomplete": "0",
+        "@nowinstats": "0",
+        "@location": rnd.choice(LOCATIONS),
+        "item": {"@name": f"Brettspiel {bgg_id}", "@objecttype": "thing", "@objectid": str(bgg_id)},
+        "players": {
+            "player": [
+                {
+                    "@username": "",
+                    "@userid": "0",
+                    "@name": name,
+                    "@startposition": str(pos + 1),
+                    "@color": "",
+                    "@score": str(rnd.randint(0, 120)),
+                    "@new": "0",
+                    "@rating": "0",
+                    "@win": "1" if pos == winner else "0",
+                }
+                for pos, name in enumerate(players)
+            ]
+        },
+    }
+
+
+def make_plays(count: int, boardgames: int = 200, seed: int = 1) -> list[dict]:
+    """Erzeugt count Spiele, neueste zuerst (wie die BGG-API)"""
+    return [make_play(index, boardgames, seed) for index in reversed(range(count))]
+
+
+def make_thing(bgg_id: int) -> dict:
+    """Erzeugt ein Brettspiel wie es der thing-Endpoint (stats=1) liefert"""
+    rnd = random.Random(bgg_id)
+    return {
+        "@type": "boardgame",
+        "@id": str(bgg_id),
+        "thumbnail": f"https://cf.geekdo-images.com/thumb/{bgg_id}.jpg",
+        "image": f"https://cf.geekdo-images.com/original/{bgg_id}.jpg",
+        "name": [{"@type": "primary", "@sortindex": "1", "@value": f"Brettspiel {bgg_id}"}],
+        "yearpublished": {"@value": str(rnd.randint(1990, 2025))},
+        "minplayers": {"@value": "1"},
+        "maxplayers": {"@value": str(rnd.randint(2, 6))},
+        "playingtime": {"@value": str(rnd.choice([30, 60, 90, 120]))},
+        "link": [
+            {"@type": "boardgamecategory", "@id": "1017", "@value": "Dice"},
+            {"@type": "boardgamemechanic", "@id": "2023", "@value": rnd.choice(["Cooperative Game", "Dice Rolling"])},
+        ],
+        "statistics": {
+            "@page": "1",
+            "ratings": {
+                "average": {"@value": f"{rnd.uniform(5, 9):.5f}"},
+                "averageweight": {"@value": f"{rnd.uniform(1, 4.5):.4f}"},
+            },
+        },
+    }
@@ -5,6 +5,8 @@ from flask_migrate import Migrate
 from bogan.db.models import db, User
 import bogan.config as cfg
 from bogan.utils import load_yaml, make_dir
+from bogan.db.images import image_url
+from bogan.db.replica import init_read_your_writes
 
 
 def create_app():
@@ -23,6 +25,7 @@ def create_app():
 
     # init Database
     db.init_app(app)
+    init_read_your_writes(app)
 
     # Add Login Manager
     login_manager = LoginManager()
@@ -50,6 +53,9 @@ def create_app():
         events_list.sort(key=lambda x: x['name'])
         return dict(events=events_list)
 
+    # Bild eines Boardgames, lokal gespiegelt oder von BGG: {{ boardgame | local_img("large") }}
+    app.add_template_filter(image_url, "local_img")
+
     # add all blueprints
     # Alle /templates Ordner aus Blueprints sind verfügbar. Bei gleichem Namen, wird der erste Import genommen
     from .main import main as main_bp
@@ -1,9 +1,9 @@
-from flask import Blueprint, render_template, redirect, url_for, request, flash
+from flask import Blueprint, render_template, redirect, url_for, request, flash, jsonify
 from flask_login import login_required, current_user
 from functools import wraps
-from sqlalchemy.orm import Session
-from bogan.db.models import User, Player, Game, Boardgame, Location
-from bogan.utils import Logger, load_yaml, save_yaml, get_db_engine
+from bogan.db.models import db, User, Player, Game, Boardgame, Location, SyncJob, SyncRun
+from bogan.jobs import queue as job_queue
+from bogan.utils import Logger, load_yaml, save_yaml, get_db_engine, pool_metrics
 import bogan.config as cfg
 from datetime import datetime
 
@@ -33,12 +33,12 @@ def admin_required(f):
 def admin_dashboard():
     """Admin Dashboard - Übersicht"""
     # Statistiken sammeln
-    with Session(get_db_engine()) as session:
-        user_count = session.query(User).count()
-        player_count = session.query(Player).count()
-        game_count = session.query(Game).count()
-        boardgame_count = session.query(Boardgame).count()
-        location_count = session.query(Location).count()
+    session = db.session
+    user_count = session.query(User).count()
+    player_count = session.query(Player).count()
+    game_count = session.query(Game).count()
+    boardgame_count = session.query(Boardgame).count()
+    location_count = session.query(Location).count()
     
     # Events aus YAML laden
     events = load_yaml(cfg.EVENT_YAML)
@@ -52,9 +52,12 @@ def admin_dashboard():
         'locations': location_count,
         'events': event_count
     }
+    # Connection-Pool dieses Prozesses (bei gunicorn pro Worker)
+    metrics = pool_metrics(get_db_engine())
+    pool = metrics.as_dict() if metrics else None
     
     logger.info(f"Admin Dashboard aufgerufen von {current_user.name}")
-    return render_template("admin_dashboard.html", stats=stats)
+    return render_template("admin_dashboard.html", stats=stats, pool=pool)
 
 @admin.route("/events")
 @login_required
@@ -64,8 +67,8 @@ def manage_events():
     events = load_yaml(cfg.EVENT_YAML) or {}
     
     # Lade verfügbare Locations aus der Datenbank
-    with Session(get_db_engine()) as session:
-        locations = session.query(Location).order_by(Location.name).all()
+    session = db.session
+    locations = session.query(Location).order_by(Location.name).all()
     
     return render_template("admin_events.html", events=events, locations=locations)
 
@@ -192,32 +195,32 @@ def manage_database():
     
     tables = {}
     
-    with Session(get_db_engine()) as session:
-        # Users mit Player info - eager loading
-        tables['users'] = session.query(User).options(joinedload(User.player)).all()
-        
-        # Players mit User info - eager loading
-        tables['players'] = session.query(Player).options(joinedload(Player.user)).all()
-        
-        # Games mit allen Beziehungen - eager loading
-        tables['games'] = session.query(Game).options(
-            joinedload(Game.boardgame),
-            joinedload(Game.location),
-            joinedload(Game.player_pos)
-        ).order_by(Game.datum.desc()).limit(100).all()
-        
-        # Boardgames
-        tables['boardgames'] = session.query(Boardgame).order_by(Boardgame.name_primary).all()
-        
-        # Locations - speziell behandeln
-        locations_query = session.query(Location).options(joinedload(Location.games)).all()
-        tables['locations'] = []
-        for location in locations_query:
-            # Games count innerhalb der Session berechnen
-            games_count = len(location.games)
-            # Location Objekt mit games_count erweitern
-            location.games_count = games_count
-            tables['locations'].append(location)
+    session = db.session
+    # Users mit Player info - eager loading
+    tables['users'] = session.query(User).options(joinedload(User.player)).all()
+    
+    # Players mit User info - eager loading
+    tables['players'] = session.query(Player).options(joinedload(Player.user)).all()
+    
+    # Games mit allen Beziehungen - eager loading
+    tables['games'] = session.query(Game).options(
+        joinedload(Game.boardgame),
+        joinedload(Game.location),
+        joinedload(Game.player_pos)
+    ).order_by(Game.datum.desc()).limit(100).all()
+    
+    # Boardgames
+    tables['boardgames'] = session.query(Boardgame).order_by(Boardgame.name_primary).all()
+    
+    # Locations - speziell behandeln
+    locations_query = session.query(Location).options(joinedload(Location.games)).all()
+    tables['locations'] = []
+    for location in locations_query:
+        # Games count innerhalb der Session berechnen
+        games_count = len(location.games)
+        # Location Objekt mit games_count erweitern
+        location.games_count = games_count
+        tables['locations'].append(location)
     
     return render_template("admin_database.html", tables=tables)
 
@@ -228,13 +231,8 @@ def manage_users():
     """Benutzer-Verwaltung"""
     from sqlalchemy.orm import joinedload
     
-    with Session(get_db_engine()) as session:
-        # Users mit eager loading der player Beziehung
-        users = session.query(User).options(joinedload(User.player)).all()
-        
-        # Session expunge all objects to detach them from session
-        for user in users:
-            session.expunge(user)
+    # Users mit eager loading der player Beziehung
+    users = db.session.query(User).options(joinedload(User.player)).all()
     
     return render_template("admin_users.html", users=users)
 
@@ -250,21 +248,22 @@ def change_user_role(user_id):
             flash("Ungültige Rolle.", "error")
             return redirect(url_for("admin.manage_users"))
         
-        with Session(get_db_engine()) as session:
-            user = session.query(User).filter(User.id == user_id).first()
-            
-            if not user:
-                flash("Benutzer nicht gefunden.", "error")
-                return redirect(url_for("admin.manage_users"))
-            
-            old_role = user.role
-            user.role = new_role
-            session.commit()
-            
-            flash(f"Rolle von '{user.name}' von '{old_role}' zu '{new_role}' geändert.", "success")
-            logger.info(f"Benutzerrolle geändert: {user.name} ({old_role} -> {new_role}) von {current_user.name}")
+        session = db.session
+        user = session.query(User).filter(User.id == user_id).first()
+        
+        if not user:
+            flash("Benutzer nicht gefunden.", "error")
+            return redirect(url_for("admin.manage_users"))
+        
+        old_role = user.role
+        user.role = new_role
+        session.commit()
+        
+        flash(f"Rolle von '{user.name}' von '{old_role}' zu '{new_role}' geändert.", "success")
+        logger.info(f"Benutzerrolle geändert: {user.name} ({old_role} -> {new_role}) von {current_user.name}")
             
     except Exception as e:
+        db.session.rollback()
         flash(f"Fehler beim Ändern der Benutzerrolle: {str(e)}", "error")
         logger.error(f"Fehler beim Ändern der Benutzerrolle: {str(e)}")
     
@@ -276,34 +275,154 @@ def change_user_role(user_id):
 def delete_user(user_id):
     """Benutzer löschen"""
     try:
-        with Session(get_db_engine()) as session:
-            user = session.query(User).filter(User.id == user_id).first()
-            
-            if not user:
-                flash("Benutzer nicht gefunden.", "error")
-                return redirect(url_for("admin.manage_users"))
-            
-            # Verhindere, dass sich der Admin selbst löscht
-            if user.id == current_user.id:
-                flash("Sie können sich nicht selbst löschen.", "error")
-                return redirect(url_for("admin.manage_users"))
-            
-            # Verhindere das Löschen des letzten Admin-Benutzers
-            admin_count = session.query(User).filter(User.role == 'admin').count()
-            if user.role == 'admin' and admin_count <= 1:
-                flash("Der letzte Admin-Benutzer kann nicht gelöscht werden.", "error")
-                return redirect(url_for("admin.manage_users"))
-            
-            username = user.name
-            user_role = user.role
-            session.delete(user)
-            session.commit()
-            
-            flash(f"Benutzer '{username}' wurde erfolgreich gelöscht.", "success")
-            logger.info(f"Benutzer gelöscht: {username} ({user_role}) von {current_user.name}")
+        session = db.session
+        user = session.query(User).filter(User.id == user_id).first()
+        
+        if not user:
+            flash("Benutzer nicht gefunden.", "error")
+            return redirect(url_for("admin.manage_users"))
+        
+        # Verhindere, dass sich der Admin selbst löscht
+        if user.id == current_user.id:
+            flash("Sie können sich nicht selbst löschen.", "error")
+            return redirect(url_for("admin.manage_users"))
+        
+        # Verhindere das Löschen des letzten Admin-Benutzers
+        admin_count = session.query(User).filter(User.role == 'admin').count()
+        if user.role == 'admin' and admin_count <= 1:
+            flash("Der letzte Admin-Benutzer kann nicht gelöscht werden.", "error")
+            return redirect(url_for("admin.manage_users"))
+        
+        username = user.name
+        user_role = user.role
+        session.delete(user)
+        session.commit()
+        
+        flash(f"Benutzer '{username}' wurde erfolgreich gelöscht.", "success")
+        logger.info(f"Benutzer gelöscht: {username} ({user_role}) von {current_user.name}")
             
     except Exception as e:
+        db.session.rollback()
         flash(f"Fehler beim Löschen des Benutzers: {str(e)}", "error")
         logger.error(f"Fehler beim Löschen des Benutzers: {str(e)}")
     
     return redirect(url_for("admin.manage_users"))
+
+@admin.route("/sync")
+@login_required
+@admin_required
+def manage_sync():
+    """Sync mit BGG: Jobs einreihen und Fortschritt anzeigen"""
+    jobs = [job.as_dict() for job in job_queue.recent_jobs(db.session)]
+
+    return render_template("admin_sync.html", jobs=jobs, job_kinds=job_queue.JOB_KINDS)
+
+@admin.route("/sync/start", methods=["POST"])
+@login_required
+@admin_required
+def start_sync():
+    """Sync einreihen, ausgeführt wird er vom Job-Worker (nicht im Request)"""
+    kind = request.form.get("kind", "sync_incremental")
+    if kind not in job_queue.JOB_KINDS:
+        flash("Unbekannter Job.", "error")
+        return redirect(url_for("admin.manage_sync"))
+
+    try:
+        job, created = job_queue.enqueue(db.session, kind, requested_by=current_user.name)
+        job_id, status = job.id, job.status
+    except Exception as e:
+        db.session.rollback()
+        flash(f"Fehler beim Einreihen des Jobs: {str(e)}", "error")
+        logger.error(f"Fehler beim Einreihen des Jobs {kind}: {str(e)}")
+        return redirect(url_for("admin.manage_sync"))
+
+    name = job_queue.JOB_KINDS[kind]
+    if created:
+        flash(f"'{name}' wurde eingereiht (Job {job_id}).", "success")
+        logger.info(f"Job '{kind}' eingereiht von {current_user.name}")
+    else:
+        flash(f"'{name}' ist bereits {'in Arbeit' if status == 'running' else 'eingereiht'} (Job {job_id}).", "warning")
+
+    return redirect(url_for("admin.manage_sync"))
+
+# Farben und Beschriftung der Phasen im Diagramm der Sync-Läufe
+PHASE_LABELS = {
+    "fetch_plays": ("Plays abfragen", "#3273dc"),
+    "fetch_boardgames": ("Boardgames abfragen", "#ffdd57"),
+    "locations": ("Locations/Spieler", "#48c774"),
+    "games": ("Games/PlayerPos", "#f14668"),
+    "delete": ("Löschen", "#b86bff"),
+    "commit": ("Commit", "#7a7a7a"),
+}
+
+def phase_chart(runs: list[SyncRun], height: int = 240, bar_width: int = 14, gap: int = 4) -> dict:
+    """Gestapelte Balken (SVG) mit der Laufzeit pro Phase, ein Balken pro Sync-Lauf (älteste links)"""
+    max_duration = max((sum(run.phase_durations().values()) for run in runs), default=0) or 1
+    bars = []
+    for i, run in enumerate(runs):
+        y = height
+        segments = []
+        for phase, duration in run.phase_durations().items():
+            h = duration / max_duration * height
+            y -= h
+            segments.append({
+                "y": round(y, 2),
+                "height": round(h, 2),
+                "color": PHASE_LABELS[phase][1],
+                "title": f"{PHASE_LABELS[phase][0]}: {duration:.2f}s",
+            })
+        bars.append({
+            "x": i * (bar_width + gap),
+            "segments": segments,
+            "title": f"#{run.id} {run.kind} {run.started_at:%d.%m.%Y %H:%M} ({run.duration:.1f}s)",
+        })
+
+    return {
+        "width": max(len(runs) * (bar_width + gap), 1),
+        "height": height,
+        "bar_width": bar_width,
+        "max_duration": round(max_duration, 2),
+        "bars": bars,
+    }
+
+@admin.route("/sync/runs")
+@login_required
+@admin_required
+def sync_runs():
+    """Messwerte der letzten Sync-Läufe: Laufzeit pro Phase im Zeitverlauf"""
+    limit = request.args.get("limit", 100, type=int)
+    kind = request.args.get("kind")
+
+    query = db.session.query(SyncRun)
+    if kind:
+        query = query.filter(SyncRun.kind == kind)
+    runs = query.order_by(SyncRun.started_at.desc()).limit(limit).all()
+    runs.reverse()
+
+    return render_template(
+        "admin_sync_runs.html",
+        runs=runs,
+        chart=phase_chart(runs),
+        phases=PHASE_LABELS,
+        kind=kind,
+        job_kinds=job_queue.JOB_KINDS,
+    )
+
+@admin.route("/sync/jobs")
+@login_required
+@admin_required
+def sync_jobs():
+    """Status der letzten Jobs als JSON (wird von der Sync-Seite abgefragt)"""
+    jobs = [job.as_dict() for job in job_queue.recent_jobs(db.session)]
+
+    return jsonify(jobs=jobs, active=any(job["status"] in job_queue.ACTIVE_STATUS for job in jobs))
+
+@admin.route("/sync/jobs/<int:job_id>")
+@login_required
+@admin_required
+def sync_job(job_id):
+    """Status eines Jobs als JSON"""
+    job = db.session.get(SyncJob, job_id)
+    if job is None:
+        return jsonify(error="Job nicht gefunden"), 404
+    return jsonify(job.as_dict())
@@ -55,6 +55,9 @@ FLASK_APP = env("FLASK_APP")
 FLASK_DEBUG = env("FLASK_DEBUG")
 FLASK_RUN_PORT = env("FLASK_RUN_PORT")
 FLASK_SECRET_KEY = env("FLASK_SECRET_KEY")
+# SQL-Statements pro Request einer Seite (0 = keine Prüfung), bei Überschreitung Warnung im Log bzw. Fehler (strict)
+QUERY_BUDGET = int(env("QUERY_BUDGET") or 10)
+QUERY_BUDGET_STRICT = (env("QUERY_BUDGET_STRICT") or "0") == "1"
 
 ### Authentication ###
 # Sign-up Secret - wird als Umgebungsvariable gesetzt
@@ -71,21 +74,112 @@ DB_MIGRATE_DIR = env("DB_MIGRATE_DIR")
 DB_BGG_BEARER_TOKEN= env("DB_BGG_BEARER_TOKEN")
 # Local Database
 DB_LOKAL = f"sqlite:///{os.path.join(INSTANCE_PATH, f'{DB_NAME}.db')}"
-# TODO Make this cleaner, maybe with a method
-if DB_PORT:
-    DB_SERVER = f"mysql+pymysql://{DB_USER}:{DB_PW}@{DB_URL}:{DB_PORT}/{DB_NAME}"
-else:
-    DB_SERVER = f"mysql+pymysql://{DB_USER}:{DB_PW}@{DB_URL}/{DB_NAME}"
+
+
+def server_url(host: str) -> str:
+    """URL der MySQL-Datenbank auf host, mit Zugangsdaten, Port und Name aus DB_*"""
+    port = f":{DB_PORT}" if DB_PORT else ""
+    return f"mysql+pymysql://{DB_USER}:{DB_PW}@{host}{port}/{DB_NAME}"
+
+
+DB_SERVER = server_url(DB_URL)
 
 DB2USE = DB_LOKAL if env("DB2USE") == "local" else DB_SERVER
+# optionale Read-Replica für die Statistik-Seiten: Host (gleiche Zugangsdaten wie DB_URL) oder vollständige URL.
+# Schreibzugriffe, Sync und Admin verwenden immer DB2USE.
+DB_REPLICA_URL = env("DB_REPLICA_URL")
+DB2USE_REPLICA = (DB_REPLICA_URL if "://" in DB_REPLICA_URL else server_url(DB_REPLICA_URL)) if DB_REPLICA_URL else None
+# Sekunden nach einer Änderung (POST, ...), in denen derselbe Browser auch auf Statistik-Seiten von DB2USE liest,
+# damit eigene Änderungen sichtbar sind, bevor die Replica sie hat (0 = aus)
+DB_READ_YOUR_WRITES = int(env("DB_READ_YOUR_WRITES") or 10)
+# Connection-Pool, eine Engine pro Prozess (utils.get_db_engine)
+DB_POOL_SIZE = int(env("DB_POOL_SIZE") or 5)
+DB_POOL_MAX_OVERFLOW = int(env("DB_POOL_MAX_OVERFLOW") or 10)
+DB_POOL_TIMEOUT = int(env("DB_POOL_TIMEOUT") or 30)
+# nur MySQL: Verbindung vor der Verwendung prüfen, nach x Sekunden erneuern (kleiner als wait_timeout des Servers)
+DB_POOL_PRE_PING = (env("DB_POOL_PRE_PING") or "1") == "1"
+DB_POOL_RECYCLE = int(env("DB_POOL_RECYCLE") or 1800)
+# nur SQLite: WAL-Modus und Wartezeit in ms, wenn die Datenbank von einer anderen Verbindung gesperrt ist
+DB_SQLITE_WAL = (env("DB_SQLITE_WAL") or "1") == "1"
+DB_SQLITE_BUSY_TIMEOUT = int(env("DB_SQLITE_BUSY_TIMEOUT") or 5000)
 
 # BGG API INFORMATION
-BGG_BASE_URL = "https://boardgamegeek.com/xmlapi2"
+# kann für Tests auf einen lokalen Server zeigen, z.B. benchmarks/fake_bgg.py
+BGG_BASE_URL = env("BGG_BASE_URL") or "https://boardgamegeek.com/xmlapi2"
 GAME_USER = "Kreijeck"
+# Parallele Abfragen an BGG, begrenzt durch max. Requests pro Sekunde (BGG Nutzungsbedingungen)
+BGG_MAX_WORKERS = int(env("BGG_MAX_WORKERS") or 4)
+BGG_REQUESTS_PER_SECOND = float(env("BGG_REQUESTS_PER_SECOND") or 2)
+BGG_PLAYS_PER_PAGE = 100
+# Wiederholungen mit exponentiellem Backoff (Sekunden), Retry-After von BGG hat Vorrang
+BGG_MAX_RETRIES = int(env("BGG_MAX_RETRIES") or 5)
+BGG_BACKOFF_BASE = float(env("BGG_BACKOFF_BASE") or 1)
+BGG_BACKOFF_MAX = float(env("BGG_BACKOFF_MAX") or 60)
+BGG_TIMEOUT = float(env("BGG_TIMEOUT") or 10)
+# Ids pro thing-Abfrage (BGG erlaubt max. 20): wächst bei schnellen Antworten um 1,
+# halbiert sich bei Fehlern oder Antworten langsamer als BGG_THING_TARGET_LATENCY (Sekunden)
+BGG_THING_CHUNK_MIN = int(env("BGG_THING_CHUNK_MIN") or 1)
+BGG_THING_CHUNK_MAX = int(env("BGG_THING_CHUNK_MAX") or 20)
+BGG_THING_TARGET_LATENCY = float(env("BGG_THING_TARGET_LATENCY") or 5)
+# einzeln isolierte Ids werden so oft mit Backoff (BGG_BACKOFF_BASE) erneut abgefragt, bevor sie als fehlend gelten
+BGG_THING_SINGLE_RETRIES = int(env("BGG_THING_SINGLE_RETRIES") or 1)
+# Persistenter Cache für BGG-Antworten, TTL in Sekunden pro Endpoint (0 = kein Cache)
+BGG_CACHE_PATH = os.path.join(INSTANCE_PATH, "bgg_cache.sqlite")
+BGG_CACHE_TTL = {
+    "thing": int(env("BGG_CACHE_TTL_THING") or 24 * 60 * 60),
+    "search": int(env("BGG_CACHE_TTL_SEARCH") or 60 * 60),
+}
+# maximale Anzahl Einträge pro Endpoint, die am längsten nicht genutzten werden verdrängt (LRU)
+BGG_CACHE_MAX_ENTRIES = {
+    "search": int(env("BGG_CACHE_MAX_SEARCH") or 500),
+}
 # additional xmltodict information
 TAG2LIST_BOARDGAME = ("name", "item")
 TAG2LIST_PLAY = "player"
 
+### Sync ###
+# Boardgames werden im Sync nur neu abgefragt, wenn sie neu sind oder ihre Daten älter als die TTL (in Tagen) sind.
+# Metadaten (Name, Bilder, Jahr, Spieleranzahl) ändern sich selten, Stats (rating, weight) häufiger.
+SYNC_BOARDGAME_METADATA_TTL_DAYS = int(env("SYNC_BOARDGAME_METADATA_TTL_DAYS") or 30)
+SYNC_BOARDGAME_STATS_TTL_DAYS = int(env("SYNC_BOARDGAME_STATS_TTL_DAYS") or 7)
+# Anzahl Spiele, die im Sync gemeinsam verarbeitet werden
+SYNC_BATCH_SIZE = int(env("SYNC_BATCH_SIZE") or 100)
+# Anzahl Zeilen pro Bulk-Upsert Statement
+SYNC_WRITE_BATCH_SIZE = int(env("SYNC_WRITE_BATCH_SIZE") or 500)
+# Anzahl Spiele pro Commit, danach wird ein Checkpoint gespeichert und ein abgebrochener Sync dort fortgesetzt
+# (0 = nur ein Commit am Ende, ohne Checkpoint)
+SYNC_COMMIT_EVERY = int(env("SYNC_COMMIT_EVERY") or 1000)
+# Fetch, prepare und Writer laufen parallel, zwischen den Stufen warten höchstens so viele Batches
+SYNC_PIPELINE_DEPTH = int(env("SYNC_PIPELINE_DEPTH") or 2)
+# Snapshot der Spiele (gzip-komprimiertes NDJSON), wird mit save_file geschrieben und im Offline-Sync gelesen
+SNAPSHOT_PATH = env("SNAPSHOT_PATH") or "data/example/example_plays.ndjson.gz"
+SNAPSHOT_COMPRESSLEVEL = int(env("SNAPSHOT_COMPRESSLEVEL") or 6)
+
+### Bilder ###
+# Lokaler Spiegel der Brettspielbilder, wird nach jedem Sync aktualisiert (0 = Bilder direkt von BGG laden)
+IMAGE_MIRROR = (env("IMAGE_MIRROR") or "1") == "1"
+IMAGE_MIRROR_PATH = env("IMAGE_MIRROR_PATH") or os.path.join(INSTANCE_PATH, "images")
+IMAGE_MIRROR_WORKERS = int(env("IMAGE_MIRROR_WORKERS") or 4)
+# Varianten: Name -> maximale Breite in Pixel (nur mit Pillow, sonst wird das Original für alle Varianten verwendet)
+IMAGE_VARIANTS = {"small": 200, "medium": 400, "large": 800}
+IMAGE_FORMAT = env("IMAGE_FORMAT") or "webp"
+IMAGE_QUALITY = int(env("IMAGE_QUALITY") or 85)
+# Dateinamen enthalten einen Hash des Inhalts, die Bilder dürfen daher lange gecacht werden (Sekunden)
+IMAGE_CACHE_MAX_AGE = 365 * 24 * 60 * 60
+
+### Jobs ###
+# Hintergrund-Worker (`python -m bogan.jobs`), wird von gunicorn über gunicorn.conf.py mitgestartet
+JOB_WORKER_WITH_GUNICORN = (env("JOB_WORKER_WITH_GUNICORN") or "1") == "1"
+# Sekunden zwischen zwei Abfragen der Job-Tabelle
+JOB_POLL_INTERVAL = int(env("JOB_POLL_INTERVAL") or 5)
+# Sekunden zwischen zwei Lebenszeichen eines laufenden Jobs, ohne Lebenszeichen gilt ein Job nach JOB_STALE_AFTER
+# Sekunden als abgebrochen (z.B. Worker beendet) und die Sperre wird freigegeben
+JOB_HEARTBEAT_INTERVAL = int(env("JOB_HEARTBEAT_INTERVAL") or 30)
+JOB_STALE_AFTER = int(env("JOB_STALE_AFTER") or 15 * 60)
+# Zeitplan: inkrementeller Sync alle x Sekunden (0 = aus), nächtliche Aktualisierung der Boardgames um x Uhr (-1 = aus)
+JOB_INCREMENTAL_SYNC_INTERVAL = int(env("JOB_INCREMENTAL_SYNC_INTERVAL") or 60 * 60)
+JOB_METADATA_REFRESH_HOUR = int(env("JOB_METADATA_REFRESH_HOUR") or 3)
+
 ### Pathinformation ###
 EVENT_YAML = "bogan/events.yaml"
 
@@ -103,10 +197,10 @@ IGNORED_PLAYERS = ["Bot",
 ### LOGGING ###
 @dataclass
 class LoggerConfig:
-    dir: str = "logs"
+    dir: str = env("LOG_DIR") or "logs"
     format: str = "%(asctime)s - %(filename)s L%(lineno)d - %(levelname)s - %(message)s"
     datefmt: str = "%d.%m.%y %H:%M:%S"
-    log_in_file: bool = True
+    log_in_file: bool = (env("LOG_IN_FILE") or "1") == "1"
     log_in_stream: bool = True
     loglevel_file: str = "info"
     loglevel_stream: str = "info"
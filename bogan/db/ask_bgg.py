@@ -1,9 +1,28 @@
-import xmltodict
-import requests
-from requests.exceptions import ChunkedEncodingError, RequestException
-from typing import Union
+import math
+import threading
 import time
-from bogan.config import BGG_BASE_URL, ENCODING, TAG2LIST_BOARDGAME, TAG2LIST_PLAY, DB_BGG_BEARER_TOKEN
+from collections import deque
+from itertools import islice
+import xmltodict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from xml.parsers.expat import ExpatError
+from typing import Iterable, Iterator, Optional, Union
+from bogan.config import (
+    BGG_BACKOFF_BASE,
+    BGG_BACKOFF_MAX,
+    BGG_MAX_WORKERS,
+    BGG_PLAYS_PER_PAGE,
+    BGG_THING_CHUNK_MAX,
+    BGG_THING_CHUNK_MIN,
+    BGG_THING_SINGLE_RETRIES,
+    BGG_THING_TARGET_LATENCY,
+    ENCODING,
+    TAG2LIST_BOARDGAME,
+    TAG2LIST_PLAY,
+)
+from bogan.db.bgg_cache import get_cache
+from bogan.db.bgg_client import BggApiError, get_client
+from bogan.db.bgg_schema import SchemaError
 from bogan.db.models import Boardgame
 from bogan.utils import nested_get, Logger
 
@@ -14,76 +33,283 @@ logger = Logger().setup_logger(__file__)
 def bgg_api_call_get(
     endpoint: str, parameter: dict, nested_paras: list = [], tag2list: tuple = {}, repeat: int = 3
 ) -> Union[dict, list[dict]]:
-    """Create specific api call on bgg and convert xml to dictionary"""
+    """Create specific api call on bgg and convert xml to dictionary
 
+    Der HTTP-Teil (Connection Pool, Backoff, 202-Polling) liegt im BggClient.
+    Hier wird nur bei unvollständig übertragenem XML erneut abgefragt.
+    """
+    client = get_client()
     raw_json = {}
-    
-    headers = {
-        'Authorization': f'Bearer {DB_BGG_BEARER_TOKEN}'
-    }
 
     for i in range(repeat):
-        resp = requests.get("/".join((BGG_BASE_URL, endpoint)), params=parameter, headers=headers, timeout=10)
-        # Fehlerbehandlung bei nicht vollständig übertragener Daten
+        content = client.get(endpoint, parameter)
+        if content is None:
+            break
         try:
-            if resp.ok:
-
-                tmp_convert = xmltodict.parse(resp.text, encoding=ENCODING, force_list=tag2list)
-                raw_json = nested_get(tmp_convert, nested_paras)
-
-                logger.info(f"BGG API Call on URL: {resp.url}, with parameter:{parameter}")
-                break
-            # on negative response
-            else:
-                time.sleep(1)
-                logger.info(f"Try {i+1}, Repeat API-call for URL: {resp.url}, Received status code: {resp.status_code}")
-        except ChunkedEncodingError as e:
-            time.sleep(1)
-            logger.info(f"Try {i+1}, ChunkedEncodingError for URL: {resp.url if resp in locals() else endpoint}, Error: {e}")
-        except RequestException as e:
-            time.sleep(1)
-            logger.info(f"Try {i+1}, RequestException for URL: {resp.url if resp in locals() else endpoint}, Error: {e}")
+            tmp_convert = xmltodict.parse(content, encoding=ENCODING, force_list=tag2list)
+        except ExpatError as e:
+            client.count_retry()
+            logger.info(f"Try {i+1}, unvollständiges XML für {endpoint} mit {parameter}, Error: {e}")
+            continue
+
+        raw_json = nested_get(tmp_convert, nested_paras)
+        logger.info(f"BGG API Call on endpoint: {endpoint}, with parameter:{parameter}")
+        break
 
     return raw_json
 
 
+def normalize_query(search: str) -> str:
+    """Suchbegriff für Cache und BGG: Kleinbuchstaben, einfache Leerzeichen"""
+    return " ".join((search or "").lower().split())
+
+
+def fetch_search(query: str) -> list[dict]:
+    """Suche nach Brettspielen über den search-Endpoint
+
+    Raises:
+        BggApiError: keine gültige Antwort erhalten
+    """
+    content = get_client().get("search", {"type": "boardgame", "query": query})
+    if content is None:
+        raise BggApiError(f"Suche nach {query} fehlgeschlagen")
+    try:
+        tmp_convert = xmltodict.parse(content, encoding=ENCODING, force_list=TAG2LIST_BOARDGAME)
+    except ExpatError as e:
+        raise BggApiError(f"Suche nach {query}: unvollständiges XML, Error: {e}") from e
+    return nested_get(tmp_convert, ["items", "item"]) or []
+
+
+def search_results(search: str) -> list[dict]:
+    """Treffer einer Suche als Liste von {"id", "name", "is_primary"}
+
+    Die Treffer werden pro normalisiertem Suchbegriff im BggCache gespeichert und von allen Workern geteilt.
+    Gleichzeitige Suchen nach demselben Begriff fragen BGG nur einmal ab, die Brettspiele werden dabei
+    schon geladen, die wartenden Suchen lesen sie anschließend aus dem thing-Cache.
+    """
+    query = normalize_query(search)
+    if not query:
+        return []
+
+    def load() -> Optional[list[dict]]:
+        try:
+            items = fetch_search(query)
+        except BggApiError as e:
+            logger.warning(f"{e}")
+            return None
+
+        results = []
+        for item in items:
+            results.append(
+                {
+                    "id": str(item.get("@id")),
+                    "name": nested_get(item, ["name", 0, "@value"]),
+                    "is_primary": nested_get(item, ["name", 0, "@type"]) == "primary",
+                }
+            )
+        ask_boardgame([result["id"] for result in results])
+        return results
+
+    return get_cache().get_or_load("search", {"type": "boardgame", "query": query}, load) or []
+
+
 def search_boardgame(search: str) -> list[Boardgame]:
-    endpoint = "search"
-    para = {"type": "boardgame", "query": search}
-    bg_infos_list: list[Boardgame] = []
-    # Check search not empty
-    if not search:
+    return boardgames_from_results(search_results(search))
+
+
+def boardgames_from_results(results: list[dict]) -> list[Boardgame]:
+    """Brettspiele zu den Treffern aus search_results, mit dem gefundenen Namen"""
+    if not results:
         return []
+    # get stats for boardgame
+    ids = [result["id"] for result in results]
+    names = [(result["name"], result["is_primary"]) for result in results]
+    return ask_boardgame(ids, names=names)
+
+
+class ChunkSizer:
+    """Anzahl Ids pro thing-Abfrage, angepasst nach AIMD (additive increase, multiplicative decrease)
+
+    Vollständige Antworten schneller als `target_latency` vergrößern den Chunk um 1,
+    Fehler oder langsame Antworten halbieren ihn. Threadsicher, gilt für alle Abfragen eines Prozesses.
+    """
 
-    raw_json = bgg_api_call_get(endpoint, para, tag2list=TAG2LIST_BOARDGAME, nested_paras=["items", "item"])
+    def __init__(
+        self,
+        minimum: int = BGG_THING_CHUNK_MIN,
+        maximum: int = BGG_THING_CHUNK_MAX,
+        target_latency: float = BGG_THING_TARGET_LATENCY,
+    ):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.target_latency = target_latency
+        self.size = self.maximum
+        self._lock = threading.Lock()
 
-    # if not empty or None
-    if raw_json:
-        # get ids
-        ids = []
-        names = []
-        for item in raw_json:
-            ids.append(str(item.get("@id")))
+    def success(self, duration: float):
+        """Vollständige Antwort nach `duration` Sekunden"""
+        if duration > self.target_latency:
+            self.failure()
+            return
+        with self._lock:
+            self.size = min(self.maximum, self.size + 1)
 
-            name = nested_get(item, ["name", 0, "@value"])
-            name_is_primary = True if nested_get(item, ["name", 0, "@value"]) == "primary" else False
-            names.append((name, name_is_primary))
+    def failure(self):
+        """Fehler oder zu langsame Antwort"""
+        with self._lock:
+            self.size = max(self.minimum, self.size // 2)
 
-        # convert ids to correct format
-        # ids_string = ",".join(ids)
 
-        # get stats for boardgame
-        bg_infos_list = ask_boardgame(ids, names=names)
+_chunk_sizer = ChunkSizer()
 
-    return bg_infos_list
 
+def fetch_things(ids: list[str], repeat: int = 2) -> tuple[list[dict], float]:
+    """Lade Brettspiele (mit Statistiken) über den thing-Endpoint
 
-def ask_boardgame(ids: Union[str, list[str]], names: list[tuple[str, bool]] = None) -> list[Boardgame]:
+    Args:
+        ids (list[str]): Ids der Brettspiele
+        repeat (int, optional): Versuche bei unvollständigem XML. Defaults to 2.
+
+    Returns:
+        tuple[list[dict], float]: (gefundene Brettspiele, Laufzeit inkl. Wiederholungen in Sekunden)
+
+    Raises:
+        BggApiError: keine gültige Antwort erhalten
+    """
+    client = get_client()
+    para = {"stats": 1, "id": ",".join(ids)}
+    t_start = time.perf_counter()
+
+    for i in range(repeat):
+        content = client.get("thing", para)
+        if content is None:
+            break
+        try:
+            tmp_convert = xmltodict.parse(content, encoding=ENCODING, force_list=TAG2LIST_BOARDGAME)
+        except ExpatError as e:
+            client.count_retry()
+            logger.info(f"Try {i+1}, unvollständiges XML für thing mit {len(ids)} Ids, Error: {e}")
+            continue
+        items = nested_get(tmp_convert, ["items", "item"]) or []
+        return items, time.perf_counter() - t_start
+
+    raise BggApiError(f"Brettspiele {para['id']} konnten nicht geladen werden")
+
+
+def fetch_thing_later(id_: str, delay: float) -> tuple[list[dict], float]:
+    """Wartet `delay` Sekunden und lädt dann ein einzelnes Brettspiel (erneuter Versuch mit Backoff)"""
+    time.sleep(delay)
+    return fetch_things([id_])
+
+
+def single_retry_delay(attempt: int) -> float:
+    """Backoff vor dem `attempt`. erneuten Versuch einer einzelnen Id"""
+    return min(BGG_BACKOFF_BASE * 2 ** (attempt - 1), BGG_BACKOFF_MAX)
+
+
+def bisect(ids: list[str]) -> list[list[str]]:
+    """Teilt ids in zwei Hälften, leere Hälften entfallen"""
+    middle = (len(ids) + 1) // 2
+    return [half for half in (ids[:middle], ids[middle:]) if half]
+
+
+def fetch_boardgames(ids: list[str], sizer: ChunkSizer = None) -> dict[str, dict]:
+    """Lade Brettspiele parallel in Chunks, deren Größe sich an Latenz und Fehlerrate anpasst
+
+    Die Chunks werden von BGG_MAX_WORKERS Threads abgefragt, das Rate-Limit setzt der BggClient durch.
+    Fehlen in einer Antwort Ids oder schlägt ein Chunk fehl, wird der betroffene Teil halbiert und
+    erneut abgefragt, bis die fehlerhaften Ids einzeln isoliert sind. Die übrigen Ids gehen so nicht verloren.
+    Einzelne Ids werden noch BGG_THING_SINGLE_RETRIES mal mit Backoff abgefragt, bevor sie als fehlend gelten.
+
+    Args:
+        ids (list[str]): Ids der Brettspiele
+        sizer (ChunkSizer, optional): Chunkgröße, Standard ist die des Prozesses. Defaults to None.
+
+    Returns:
+        dict[str, dict]: Id -> Brettspiel im Format von xmltodict
+    """
+    sizer = sizer or _chunk_sizer
+    items = {}
+    pending = deque(ids)
+    # halbierte Chunks haben Vorrang vor neuen Ids
+    retry = deque()
+    not_found = []
+    failed = []
+    # Id -> Anzahl erneuter Versuche als einzelne Id
+    attempts = {}
+
+    def retry_single(id_: str) -> bool:
+        """Reiht eine einzelne Id erneut ein, False wenn keine Versuche mehr übrig sind"""
+        attempts[id_] = attempts.get(id_, 0) + 1
+        if attempts[id_] > BGG_THING_SINGLE_RETRIES:
+            return False
+        retry.append([id_])
+        return True
+
+    with ThreadPoolExecutor(max_workers=BGG_MAX_WORKERS) as executor:
+        running = {}
+        while pending or retry or running:
+            while len(running) < BGG_MAX_WORKERS and (pending or retry):
+                if retry:
+                    chunk = retry.popleft()
+                else:
+                    chunk = [pending.popleft() for _ in range(min(sizer.size, len(pending)))]
+                if len(chunk) == 1 and chunk[0] in attempts:
+                    future = executor.submit(fetch_thing_later, chunk[0], single_retry_delay(attempts[chunk[0]]))
+                else:
+                    future = executor.submit(fetch_things, chunk)
+                running[future] = chunk
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk = running.pop(future)
+                try:
+                    things, duration = future.result()
+                except BggApiError as e:
+                    sizer.failure()
+                    if len(chunk) > 1:
+                        retry.extend(bisect(chunk))
+                    elif not retry_single(chunk[0]):
+                        logger.warning(f"{e}")
+                        failed.extend(chunk)
+                    continue
+
+                for thing in things:
+                    items[str(thing.get("@id"))] = thing
+
+                missing = [id_ for id_ in chunk if id_ not in items]
+                if not missing:
+                    sizer.success(duration)
+                elif len(chunk) > 1:
+                    retry.extend(bisect(missing))
+                elif not retry_single(chunk[0]):
+                    not_found.extend(missing)
+
+    if not_found:
+        logger.info(
+            f"Es konnte nicht für alle Ids {not_found} ein Eintrag gefunden werden, bitte überprüfe die Ids!"
+        )
+    if failed:
+        logger.warning(f"{len(failed)} Brettspiele konnten nicht von BGG geladen werden: {failed}")
+    logger.debug(f"thing-Abfragen mit {sizer.size} Ids pro Chunk")
+
+    return items
+
+
+def ask_boardgame(
+    ids: Union[str, list[str]], names: list[tuple[str, bool]] = None, refresh: Union[bool, Iterable] = False
+) -> list[Boardgame]:
     """Get stats from specific boardgame
 
+    Bereits bekannte Antworten werden aus dem BggCache gelesen, nur fehlende oder abgelaufene Ids
+    werden bei BGG abgefragt.
+
     Args:
         id (str, list):     all boardgame ids as list
                             or one id a str
+        names (list, optional): (alternative name, is_primary_name) pro Id, gleiche Reihenfolge wie ids
+        refresh (bool, Iterable, optional): True für alle Ids oder eine Auswahl an Ids,
+                            die ohne Cache neu abgefragt werden. Defaults to False.
 
     Returns:
         list[Boardgame]:    Boardgame object, with values.
@@ -91,82 +317,168 @@ def ask_boardgame(ids: Union[str, list[str]], names: list[tuple[str, bool]] = No
                             https://boardgamegeek.com/xmlapi2/thing?id=251247&stats=1 (items/item will be removed)
     """
 
-    def split_list(input_list, chunk_size=15):
-        """
-        Teilt eine Liste in mehrere Listen mit maximal 'chunk_size' Einträgen.
-
-        :param input_list: Die Liste, die aufgeteilt werden soll.
-        :param chunk_size: Die maximale Anzahl der Einträge pro Liste (Standard: 20).
-        :return: Eine Liste von Listen mit jeweils maximal 'chunk_size' Einträgen.
-        """
-        # Erzeuge Teil-Listen mit der angegebenen Größe
-        return [input_list[i : i + chunk_size] for i in range(0, len(input_list), chunk_size)]
-
     # Convert all types into a list with length 1 and as str
     if not isinstance(ids, list):
         ids = [str(ids)]
     else:
         ids = [str(id_) for id_ in ids]
 
-    # Split the ids list into chunks of 20
-    chunked_ids = split_list(ids, chunk_size=20)
+    if names is not None and len(ids) != len(names):
+        raise ValueError("Names muss None sein oder die gleiche Länge wie Ids haben")
+    names_by_id = dict(zip(ids, names)) if names else {}
+
+    if refresh is True:
+        refresh_ids = set(ids)
+    else:
+        refresh_ids = {str(id_) for id_ in refresh or []}
 
     endpoint = "thing"
+    cache = get_cache()
+    hits_before, misses_before = cache.hits, cache.misses
+    items = {}
+
+    # Zuerst im Cache nachsehen
+    for id_ in ids:
+        if id_ in refresh_ids:
+            continue
+        item = cache.get(endpoint, {"stats": 1, "id": id_})
+        if item is not None:
+            items[id_] = item
+
+    # Fehlende Ids parallel und in adaptiven Chunks abfragen
+    missing_ids = [id_ for id_ in ids if id_ not in items]
+    if missing_ids:
+        for id_, bg_stat in fetch_boardgames(missing_ids).items():
+            items[id_] = bg_stat
+            cache.set(endpoint, {"stats": 1, "id": id_}, bg_stat)
+
+    hits, misses = cache.hits - hits_before, cache.misses - misses_before
+    if hits + misses:
+        logger.info(
+            f"BGG-Cache ({endpoint}): {hits} Treffer, {misses} Fehlversuche, Trefferquote {hits / (hits + misses):.0%}"
+        )
+
+    # Create Boardgame List in der Reihenfolge der ids
     bg_results = []
+    for id_ in ids:
+        if id_ not in items:
+            continue
+        try:
+            bg_results.append(Boardgame().from_bgg(items[id_], name=names_by_id.get(id_)))
+        except SchemaError as e:
+            logger.warning(f"Boardgame {id_} übersprungen, Antwort von BGG passt nicht zum Schema: {e}")
 
-    # Process each chunk of ids
-    for chunk in chunked_ids:
-        # Convert list to comma separated string
-        ids_chunk = ",".join(chunk)
-        len_chunk = len(chunk)
+    return bg_results
 
-        para = {"stats": 1, "id": ids_chunk}
 
-        # Get Request as json
-        raw_json = bgg_api_call_get(endpoint, para, nested_paras=["items", "item"], tag2list=TAG2LIST_BOARDGAME)
+def parse_plays_page(content: bytes) -> tuple[int, list[dict]]:
+    """Parst eine Seite des plays-Endpoints inkrementell, Spiel für Spiel
 
-        # Check that for all Ids games are found; otherwise, set names to None
-        if len_chunk != len(raw_json):
-            logger.info(
-                f"Es konnte nicht für alle Ids {ids_chunk} ein Eintrag gefunden werden, bitte überprüfe die Ids! -> names=None"
-            )
-            names = None
-
-        if raw_json:
-            # Validate that raw_json list is the same length as the names list
-            if names is not None and len_chunk != len(names):
-                raise ValueError("Names muss None sein oder die gleiche Länge wie Ids haben")
-
-            # Create Boardgame List
-            for i, bg_stat in enumerate(raw_json):
-                # Name anpassen, wenn gesetzt
-                if names:
-                    bg_results.append(Boardgame().from_bgg(bg_stat, name=names[i]))
-                else:
-                    bg_results.append(Boardgame().from_bgg(bg_stat))
+    Es wird kein Dictionary für das ganze Dokument aufgebaut, jedes <play> wird direkt
+    nach dem Lesen als eigenes Dictionary abgelegt.
 
-    return bg_results
+    Args:
+        content (bytes): XML-Antwort von BGG
 
+    Returns:
+        tuple[int, list[dict]]: (Gesamtanzahl laut `@total`, Spiele dieser Seite)
+    """
+    header = {}
+    plays = []
 
-def ask_games_from(user: str, _page: int = 1, _tmp_games: list = []) -> list:
-    """Erhalte Spiele eines Users aus Boargamegeek
+    def on_play(path, play) -> bool:
+        header.update(path[0][1] or {})
+        plays.append(play)
+        return True
+
+    xmltodict.parse(content, encoding=ENCODING, force_list=TAG2LIST_PLAY, item_depth=2, item_callback=on_play)
+
+    if not header:
+        # Seite ohne Spiele: Kopfzeile trotzdem auslesen
+        header = xmltodict.parse(content, encoding=ENCODING).get("plays") or {}
+
+    return int(header.get("@total", header.get("total", 0)) or 0), plays
+
+
+def fetch_plays_page(user: str, page: int, mindate: str = None, repeat: int = 3) -> tuple[int, list[dict]]:
+    """Lade und parse eine Seite des plays-Endpoints
 
     Args:
         user (str): Username in BGG
-        _page (int, optional): wird für Rekursion benötigt, pro Seite maximal 100 Einträge. Defaults to 1.
-        _tmp_games(dict, optional): wird für Rekursion benötigt, speichert aktuelle Ergebnisse
+        page (int): Seite (1-basiert, max. 100 Spiele pro Seite)
+        mindate (str, optional): nur Spiele ab diesem Datum (YYYY-MM-DD, inklusive). Defaults to None.
+        repeat (int, optional): Versuche bei unvollständigem XML. Defaults to 3.
 
     Returns:
-        dict: json-Datei mit allen Spielen
+        tuple[int, list[dict]]: (Gesamtanzahl, Spiele dieser Seite)
+
+    Raises:
+        BggApiError: Seite konnte nicht geladen werden. Eine fehlende Seite darf nicht als
+                     "keine Spiele" interpretiert werden, sonst würden beim Sync Spiele gelöscht.
+    """
+    client = get_client()
+    para = {"username": user, "page": page}
+    if mindate:
+        para["mindate"] = mindate
+
+    for i in range(repeat):
+        content = client.get("plays", para)
+        if content is None:
+            break
+        try:
+            return parse_plays_page(content)
+        except ExpatError as e:
+            client.count_retry()
+            logger.info(f"Try {i+1}, unvollständiges XML für plays mit {para}, Error: {e}")
+
+    raise BggApiError(f"Seite {page} der Spiele von {user} konnte nicht geladen werden")
+
+
+def iter_plays(user: str, mindate: str = None, start_page: int = 1) -> Iterator[dict]:
+    """Liefert die Spiele eines Users aus Boardgamegeek einzeln, sobald die jeweilige Seite geladen ist
+
+    Die erste abgefragte Seite liefert die Gesamtanzahl (`@total`), daraus wird die Anzahl der Seiten berechnet.
+    Die weiteren Seiten werden parallel abgefragt (begrenzt durch BGG_MAX_WORKERS und den RateLimiter),
+    dabei werden nur so viele Seiten vorgeladen, wie Worker vorhanden sind. Der Speicherbedarf
+    bleibt so unabhängig von der Anzahl der Spiele. Die Reihenfolge der Seiten bleibt erhalten.
+
+    Args:
+        user (str): Username in BGG
+        mindate (str, optional): nur Spiele ab diesem Datum (YYYY-MM-DD, inklusive). Defaults to None.
+        start_page (int, optional): erste Seite, z.B. beim Fortsetzen eines Syncs. Defaults to 1.
+
+    Yields:
+        dict: ein Spiel im Format von xmltodict
     """
-    endpoint = "plays"
-    para = {"username": user, "page": _page}
+    total, plays = fetch_plays_page(user, start_page, mindate)
+    pages = math.ceil(total / BGG_PLAYS_PER_PAGE)
+    logger.info(f"{total} Spiele auf {pages} Seiten für User {user} gefunden, ab Seite {start_page}")
+
+    yield from plays
 
-    response = bgg_api_call_get(endpoint, para, nested_paras=["plays", "play"], tag2list=TAG2LIST_PLAY)
+    if pages <= start_page:
+        return
 
-    # Solange Daten erhalten werden sind, wird die nächste Seite aufgerufen
-    while response:
-        _tmp_games.extend(response)
-        return ask_games_from(user, _page + 1, _tmp_games)
+    with ThreadPoolExecutor(max_workers=BGG_MAX_WORKERS) as executor:
+        next_pages = iter(range(start_page + 1, pages + 1))
+        pending = deque(
+            executor.submit(fetch_plays_page, user, page, mindate) for page in islice(next_pages, BGG_MAX_WORKERS)
+        )
+        while pending:
+            _, plays = pending.popleft().result()
+            for page in islice(next_pages, 1):
+                pending.append(executor.submit(fetch_plays_page, user, page, mindate))
+            yield from plays
+
+
+def ask_games_from(user: str, mindate: str = None) -> list:
+    """Erhalte Spiele eines Users aus Boargamegeek
 
-    return _tmp_games
+    Args:
+        user (str): Username in BGG
+        mindate (str, optional): nur Spiele ab diesem Datum (YYYY-MM-DD, inklusive). Defaults to None.
+
+    Returns:
+        list: json-Liste mit allen Spielen
+    """
+    return list(iter_plays(user, mindate))
@@ -0,0 +1,221 @@
+"""
+BGG Response Cache
+
+Persistenter Cache für BGG-Antworten im Instance-Ordner (SQLite-Datei, von allen Prozessen nutzbar).
+Schlüssel ist der Endpoint mit den normalisierten Parametern, die Gültigkeit (TTL) wird pro Endpoint
+in `BGG_CACHE_TTL` festgelegt. Ein Endpoint ohne TTL wird nicht gecacht.
+Für Endpoints in `BGG_CACHE_MAX_ENTRIES` werden die am längsten nicht genutzten Einträge verdrängt (LRU).
+`get_or_load` lädt einen fehlenden Wert nur einmal, auch wenn mehrere Threads oder Prozesse gleichzeitig fragen.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+from urllib.parse import urlencode
+
+from bogan.config import BGG_CACHE_MAX_ENTRIES, BGG_CACHE_PATH, BGG_CACHE_TTL
+from bogan.utils import Logger, make_dir
+
+# Add Logging
+logger = Logger().setup_logger(__file__)
+
+
+def cache_key(endpoint: str, params: dict) -> str:
+    """Normalisierter Schlüssel, z.B. `thing?id=13&stats=1`"""
+    normalized = sorted((str(key).lower(), str(value).strip()) for key, value in params.items())
+    return f"{endpoint}?{urlencode(normalized)}"
+
+
+class BggCache:
+    """Key-Value Cache mit TTL und optionaler maximaler Größe pro Endpoint"""
+
+    # Wartezeit zwischen zwei Blicken in den Cache, während ein anderer Prozess lädt
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, path: str = BGG_CACHE_PATH, ttl: dict = None, max_entries: dict = None):
+        self.path = path
+        self.ttl = BGG_CACHE_TTL if ttl is None else ttl
+        self.max_entries = BGG_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # laufende Ladevorgänge: Schlüssel -> (Lock, Anzahl wartender Threads)
+        self._flights: dict[str, tuple[threading.Lock, int]] = {}
+
+        make_dir(os.path.dirname(path))
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS bgg_cache ("
+                "key TEXT PRIMARY KEY, endpoint TEXT NOT NULL, value TEXT NOT NULL, fetched_at REAL NOT NULL, "
+                "last_used REAL)"
+            )
+            # Cache-Dateien älterer Versionen ergänzen
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(bgg_cache)")}
+            if "last_used" not in columns:
+                conn.execute("ALTER TABLE bgg_cache ADD COLUMN last_used REAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS bgg_cache_lease (key TEXT PRIMARY KEY, expires_at REAL NOT NULL)")
+
+    @contextmanager
+    def _connect(self):
+        """Kurzlebige Verbindung pro Zugriff, damit Threads und Prozesse sich nichts teilen"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def enabled(self, endpoint: str) -> bool:
+        return bool(self.ttl.get(endpoint))
+
+    def get(self, endpoint: str, params: dict) -> Optional[Any]:
+        """Gibt den gecachten Wert zurück, wenn er noch gültig ist, sonst None"""
+        if not self.enabled(endpoint):
+            return None
+
+        value = self._read(endpoint, cache_key(endpoint, params))
+        with self._lock:
+            if value is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        return value
+
+    def _read(self, endpoint: str, key: str) -> Optional[Any]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, fetched_at FROM bgg_cache WHERE key = ?", (key,)).fetchone()
+            if row is None or time.time() - row[1] >= self.ttl[endpoint]:
+                return None
+            # Zugriff nur für begrenzte Endpoints merken, sonst wird jeder Lesezugriff zum Schreibzugriff
+            if endpoint in self.max_entries:
+                conn.execute("UPDATE bgg_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def set(self, endpoint: str, params: dict, value: Any):
+        if not self.enabled(endpoint):
+            return
+
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO bgg_cache (key, endpoint, value, fetched_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (cache_key(endpoint, params), endpoint, json.dumps(value, ensure_ascii=False), now, now),
+            )
+            if endpoint in self.max_entries:
+                conn.execute(
+                    "DELETE FROM bgg_cache WHERE endpoint = ? AND key NOT IN "
+                    "(SELECT key FROM bgg_cache WHERE endpoint = ? ORDER BY last_used DESC LIMIT ?)",
+                    (endpoint, endpoint, self.max_entries[endpoint]),
+                )
+
+    def get_or_load(self, endpoint: str, params: dict, loader: Callable[[], Any], lease: float = 60) -> Any:
+        """Gibt den gecachten Wert zurück oder lädt ihn genau einmal (single-flight)
+
+        Gleichzeitige Anfragen nach demselben Schlüssel warten auf den ersten Aufruf von `loader`:
+        im selben Prozess über einen Lock, zwischen Prozessen über eine Lease in der Cache-Datei.
+        Ist der Endpoint nicht gecacht, wird `loader` direkt aufgerufen.
+
+        Args:
+            endpoint (str): Endpoint, bestimmt TTL und maximale Größe
+            params (dict): Parameter, bilden mit dem Endpoint den Schlüssel
+            loader (Callable): lädt den Wert, bei None wird nichts gespeichert
+            lease (float, optional): max. Sekunden, die andere Prozesse auf den Ladevorgang warten. Defaults to 60.
+
+        Returns:
+            Any: Wert aus dem Cache oder von `loader`
+        """
+        if not self.enabled(endpoint):
+            return loader()
+
+        value = self.get(endpoint, params)
+        if value is not None:
+            return value
+
+        key = cache_key(endpoint, params)
+        with self._flight(key):
+            # warten, bis der Wert im Cache liegt oder die Lease frei wird
+            while True:
+                value = self._read(endpoint, key)
+                if value is not None:
+                    return value
+                if self._acquire_lease(key, lease):
+                    break
+                time.sleep(self.POLL_INTERVAL)
+
+            try:
+                value = loader()
+                if value is not None:
+                    self.set(endpoint, params, value)
+            finally:
+                with self._connect() as conn:
+                    conn.execute("DELETE FROM bgg_cache_lease WHERE key = ?", (key,))
+        return value
+
+    @contextmanager
+    def _flight(self, key: str):
+        """Lock pro Schlüssel für die Threads dieses Prozesses"""
+        with self._lock:
+            lock, waiting = self._flights.get(key, (threading.Lock(), 0))
+            self._flights[key] = (lock, waiting + 1)
+        try:
+            with lock:
+                yield
+        finally:
+            with self._lock:
+                lock, waiting = self._flights[key]
+                if waiting > 1:
+                    self._flights[key] = (lock, waiting - 1)
+                else:
+                    del self._flights[key]
+
+    def _acquire_lease(self, key: str, seconds: float) -> bool:
+        """Lease für den Ladevorgang eines Schlüssels, abgelaufene Leases (abgestürzter Prozess) verfallen"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM bgg_cache_lease WHERE key = ? AND expires_at < ?", (key, now))
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO bgg_cache_lease (key, expires_at) VALUES (?, ?)", (key, now + seconds)
+            )
+        return cursor.rowcount == 1
+
+    def invalidate(self, endpoint: str, params: dict):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM bgg_cache WHERE key = ?", (cache_key(endpoint, params),))
+
+    def purge_expired(self) -> int:
+        """Löscht alle abgelaufenen Einträge, gibt die Anzahl gelöschter Einträge zurück"""
+        deleted = 0
+        with self._connect() as conn:
+            for endpoint, ttl in self.ttl.items():
+                cursor = conn.execute(
+                    "DELETE FROM bgg_cache WHERE endpoint = ? AND fetched_at < ?", (endpoint, time.time() - ttl)
+                )
+                deleted += cursor.rowcount
+        return deleted
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "hit_ratio": round(self.hit_ratio, 3)}
+
+
+_cache: Optional[BggCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> BggCache:
+    """Gibt den BggCache des aktuellen Prozesses zurück"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = BggCache()
+        return _cache
@@ -0,0 +1,255 @@
+"""
+BGG HTTP Client
+
+Wiederverwendbarer Client für die BGG XML API2:
+  - eine keep-alive `requests.Session` pro Prozess (Connection Pool statt neuem TLS-Handshake pro Call)
+  - RateLimiter für alle Threads eines Prozesses
+  - exponentielles Backoff mit Jitter, `Retry-After` wird beachtet (429, 5xx)
+  - `202 Accepted` (BGG hat die Anfrage in die Warteschlange gestellt) wird erneut abgefragt
+  - Zähler für Calls, Retries, Bytes und Laufzeit pro Call
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+
+from bogan.config import (
+    BGG_BASE_URL,
+    BGG_BACKOFF_BASE,
+    BGG_BACKOFF_MAX,
+    BGG_MAX_RETRIES,
+    BGG_MAX_WORKERS,
+    BGG_REQUESTS_PER_SECOND,
+    BGG_TIMEOUT,
+    DB_BGG_BEARER_TOKEN,
+)
+from bogan.utils import Logger
+
+# Add Logging
+logger = Logger().setup_logger(__file__)
+
+# Statuscodes, bei denen ein erneuter Versuch sinnvoll ist
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+class BggApiError(Exception):
+    """BGG hat nach allen Wiederholungen keine gültige Antwort geliefert"""
+
+
+class RateLimiter:
+    """Begrenzt die Anzahl an Requests pro Sekunde, threadsicher über alle Worker hinweg"""
+
+    def __init__(self, requests_per_second: float):
+        self.interval = 1 / requests_per_second if requests_per_second > 0 else 0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Blockiert, bis der nächste freie Zeitslot erreicht ist"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+@dataclass
+class CallRecord:
+    """Messwerte eines einzelnen API-Calls (inkl. aller Wiederholungen)"""
+
+    endpoint: str
+    status: Optional[int]
+    duration: float
+    retries: int
+    polls: int
+    bytes: int
+
+
+@dataclass
+class ClientStats:
+    """Aufsummierte Messwerte des Clients"""
+
+    calls: int = 0
+    retries: int = 0
+    polls: int = 0
+    failures: int = 0
+    bytes: int = 0
+    duration: float = 0.0
+    recent: deque = field(default_factory=lambda: deque(maxlen=100))
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        data["recent"] = [asdict(record) for record in self.recent]
+        return data
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Wertet den `Retry-After` Header aus (Sekunden oder HTTP-Datum)
+
+    Args:
+        value (str): Wert des Headers
+
+    Returns:
+        float: Wartezeit in Sekunden oder None
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class BggClient:
+    """HTTP-Client für die BGG XML API2"""
+
+    def __init__(
+        self,
+        base_url: str = BGG_BASE_URL,
+        token: Optional[str] = DB_BGG_BEARER_TOKEN,
+        requests_per_second: float = BGG_REQUESTS_PER_SECOND,
+        max_retries: int = BGG_MAX_RETRIES,
+        backoff_base: float = BGG_BACKOFF_BASE,
+        backoff_max: float = BGG_BACKOFF_MAX,
+        timeout: float = BGG_TIMEOUT,
+        pool_size: int = BGG_MAX_WORKERS,
+    ):
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self.stats = ClientStats()
+        self._stats_lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Wartezeit vor dem nächsten Versuch: exponentiell mit Jitter, Retry-After hat Vorrang"""
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max) + random.uniform(0, self.backoff_base)
+        delay = min(self.backoff_max, self.backoff_base * 2**attempt)
+        return random.uniform(delay / 2, delay)
+
+    def get(self, endpoint: str, params: dict, max_retries: Optional[int] = None) -> Optional[bytes]:
+        """GET auf einen BGG-Endpoint
+
+        Args:
+            endpoint (str): z.B. "thing", "plays", "search"
+            params (dict): Query-Parameter
+            max_retries (int, optional): überschreibt die Anzahl erneuter Versuche. Defaults to None.
+
+        Returns:
+            bytes: Antwort als XML oder None, wenn keine gültige Antwort erhalten wurde
+        """
+        max_retries = self.max_retries if max_retries is None else max_retries
+        url = "/".join((self.base_url, endpoint))
+        retries = 0
+        polls = 0
+        status = None
+        content = None
+        t_start = time.perf_counter()
+
+        while True:
+            self.rate_limiter.wait()
+            retry_after = None
+            try:
+                resp = self.session.get(url, params=params, timeout=self.timeout)
+                status = resp.status_code
+                if status == 200:
+                    content = resp.content
+                    break
+                retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                if status == 202:
+                    # BGG bereitet die Antwort vor -> später erneut abfragen
+                    polls += 1
+                    logger.info(f"BGG hat Anfrage {resp.url} angenommen (202), frage erneut ab")
+                elif status not in RETRY_STATUS:
+                    logger.warning(f"BGG API Call {resp.url} fehlgeschlagen, Statuscode: {status}")
+                    break
+                else:
+                    logger.info(
+                        f"Try {retries + 1}, Repeat API-call for URL: {resp.url}, Received status code: {status}"
+                    )
+            except RequestException as e:
+                logger.info(f"Try {retries + 1}, {type(e).__name__} for URL: {url}, Error: {e}")
+
+            if retries >= max_retries:
+                logger.error(f"BGG API Call {url} mit {params} nach {retries} Wiederholungen abgebrochen")
+                break
+            delay = self.backoff(retries, retry_after)
+            retries += 1
+            time.sleep(delay)
+
+        record = CallRecord(
+            endpoint=endpoint,
+            status=status,
+            duration=round(time.perf_counter() - t_start, 4),
+            retries=retries,
+            polls=polls,
+            bytes=len(content) if content else 0,
+        )
+        self._record(record, failed=content is None)
+        logger.debug(f"BGG API Call {endpoint} {params}: {record}")
+
+        return content
+
+    def count_retry(self):
+        """Zählt einen Retry, der außerhalb des Clients ausgelöst wurde (z.B. unvollständiges XML)"""
+        with self._stats_lock:
+            self.stats.retries += 1
+
+    def reset_stats(self) -> ClientStats:
+        """Setzt die Zähler zurück und gibt die bisherigen Werte zurück"""
+        with self._stats_lock:
+            stats, self.stats = self.stats, ClientStats()
+        return stats
+
+    def _record(self, record: CallRecord, failed: bool):
+        with self._stats_lock:
+            self.stats.calls += 1
+            self.stats.retries += record.retries
+            self.stats.polls += record.polls
+            self.stats.failures += int(failed)
+            self.stats.bytes += record.bytes
+            self.stats.duration += record.duration
+            self.stats.recent.append(record)
+
+
+_client: Optional[BggClient] = None
+_client_pid: Optional[int] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> BggClient:
+    """Gibt den BggClient des aktuellen Prozesses zurück (wird nach einem fork neu erstellt)"""
+    global _client, _client_pid
+    with _client_lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = BggClient()
+            _client_pid = os.getpid()
+        return _client
@@ -0,0 +1,229 @@
+"""
+Schemas für BGG-Datensätze (xmltodict)
+
+Ein Schema beschreibt pro Feld den Pfad im Datensatz, den Typ und einen Default. Es wird einmal in eine
+Python-Funktion übersetzt, die jeden Pfad direkt per Index liest, statt ihn wie `nested_get` bei jedem Aufruf
+mit isinstance-Prüfungen abzulaufen. Das Ergebnis ist ein dict mit den Feldnamen des Schemas.
+
+Fehlt ein optionales Feld oder ist es leer, wird der Default verwendet. Ein Datensatz passt nicht zum Schema
+(SchemaError), wenn
+  - ein Pflichtfeld fehlt,
+  - ein Wert nicht in den Typ des Feldes umgewandelt werden kann,
+  - ein Pfad auf einen Wert mit anderer Struktur trifft (z.B. Text statt Element).
+Ändert BGG das XML, fällt das so auf, statt dass die Werte stillschweigend None werden.
+
+Beispiel:
+    play = PLAY.extract(my_game)
+    play["id"], play["date"], play["players"][0]["score"]
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable, Optional
+
+# Ausnahmen beim direkten Zugriff, die "Feld fehlt" bedeuten
+_MISSING = (KeyError, IndexError)
+
+
+class SchemaError(ValueError):
+    """Ein Datensatz passt nicht zum Schema, problems enthält alle gefundenen Abweichungen"""
+
+    def __init__(self, schema: str, problems: list[str], record_id: Any = None):
+        self.schema = schema
+        self.problems = problems
+        self.record_id = record_id
+        super().__init__(f"{schema} {record_id}: {'; '.join(problems)}")
+
+
+def flag(value: str) -> bool:
+    """BGG-Flag "1"/"0" als bool"""
+    return value == "1"
+
+
+@dataclass(frozen=True)
+class Field:
+    """Feld eines Schemas
+
+    Args:
+        path (tuple): Schlüssel bzw. Listenindex pro Ebene, z.B. ("statistics", "ratings", "average", "@value")
+        cast (Callable, optional): Umwandlung des Werts, z.B. int, float, flag. Defaults to None (unverändert).
+        default (Any, optional): Wert bei fehlendem oder leerem Feld, muss zum Typ passen. Defaults to None.
+        required (bool, optional): fehlendes Feld ist ein Fehler. Defaults to False.
+        schema (Schema, optional): Unterschema für Elemente, die mehrfach vorkommen können (Liste von Datensätzen,
+            ein einzelnes Element liefert xmltodict als dict). Defaults to None.
+    """
+
+    path: tuple
+    cast: Optional[Callable[[Any], Any]] = None
+    default: Any = None
+    required: bool = False
+    schema: Optional["Schema"] = None
+
+
+# Typ des Defaults pro Umwandlung (typisierte Defaults, wird beim Übersetzen geprüft)
+_DEFAULT_TYPES = {int: int, float: (int, float), str: str, flag: bool, date.fromisoformat: date}
+
+
+class Schema:
+    """Deklaratives Schema, wird beim Anlegen in die Funktion `extract` übersetzt"""
+
+    def __init__(self, name: str, fields: dict[str, Field]):
+        self.name = name
+        self.fields = fields
+        self.source = self._generate()
+        namespace = {"_MISSING": _MISSING, "_walk": _walk, "_record_id": _record_id, "SchemaError": SchemaError}
+        for index, field in enumerate(fields.values()):
+            namespace[f"cast_{index}"] = field.cast
+            namespace[f"default_{index}"] = field.default
+            namespace[f"path_{index}"] = field.path
+            namespace[f"schema_{index}"] = field.schema
+        exec(compile(self.source, f"<schema {name}>", "exec"), namespace)
+        self.extract: Callable[[dict], dict] = namespace["extract"]
+
+    def __repr__(self) -> str:
+        return f"Schema({self.name}, fields={list(self.fields)})"
+
+    def _generate(self) -> str:
+        """Quelltext der Funktion extract(record) -> dict"""
+        lines = ["def extract(record):", "    problems = None"]
+        for index, (name, field) in enumerate(self.fields.items()):
+            self._check_default(name, field)
+            lines += self._generate_field(index, name, field)
+        names = ", ".join(f"{name!r}: v_{index}" for index, name in enumerate(self.fields))
+        lines += [
+            "    if problems:",
+            f"        raise SchemaError({self.name!r}, problems, _record_id(record))",
+            f"    return {{{names}}}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def _check_default(self, name: str, field: Field):
+        expected = _DEFAULT_TYPES.get(field.cast)
+        if field.default is not None and expected and not isinstance(field.default, expected):
+            raise TypeError(f"Schema {self.name}: Default von {name} passt nicht zum Typ ({field.default!r})")
+        if field.schema is not None and (field.cast is not None or field.default is not None):
+            raise TypeError(f"Schema {self.name}: {name} mit Unterschema darf weder cast noch default haben")
+
+    @staticmethod
+    def _generate_field(index: int, name: str, field: Field) -> list[str]:
+        access = "record" + "".join(f"[{key!r}]" for key in field.path)
+        lines = [
+            "    try:",
+            f"        value = {access}",
+            "    except _MISSING:",
+            "        value = None",
+            "    except TypeError:",
+            # Struktur weicht ab oder ein Element ist leer (None), das unterscheidet erst der langsame Weg
+            f"        value = _walk(record, path_{index}, {name!r})",
+            "        if isinstance(value, Exception):",
+            "            problems = (problems or []) + [str(value)]",
+            "            value = None",
+        ]
+
+        if field.schema is not None:
+            return lines + [
+                "    if not value:",
+                f"        v_{index} = []",
+                "    else:",
+                "        if isinstance(value, dict):",
+                "            value = [value]",
+                f"        v_{index} = []",
+                "        try:",
+                "            for item in value:",
+                f"                v_{index}.append(schema_{index}.extract(item))",
+                "        except SchemaError as e:",
+                f"            problems = (problems or []) + [f'{name}: {{p}}' for p in e.problems]",
+                "        except (TypeError, AttributeError):",
+                f"            problems = (problems or []) + [f'{name}: keine Liste von Elementen ({{value!r:.40}})']",
+            ]
+
+        lines += ["    if not value:", f"        v_{index} = default_{index}"]
+        if field.required:
+            lines.append(f"        problems = (problems or []) + ['{name} fehlt']")
+        if field.cast is None:
+            return lines + ["    else:", f"        v_{index} = value"]
+        return lines + [
+            "    else:",
+            "        try:",
+            f"            v_{index} = cast_{index}(value)",
+            "        except (TypeError, ValueError):",
+            f"            v_{index} = default_{index}",
+            f"            problems = (problems or []) + [f'{name}: ungültiger Wert {{value!r:.40}}']",
+        ]
+
+
+def _record_id(record: Any) -> Any:
+    """Id des Datensatzes für die Fehlermeldung"""
+    return record.get("@id") if isinstance(record, dict) else None
+
+
+def _walk(record: Any, path: tuple, name: str) -> Any:
+    """Langsamer Weg für Pfade, die nicht direkt gelesen werden konnten
+
+    Returns:
+        Any: Wert, None bei leerem/fehlendem Element oder ein ValueError bei abweichender Struktur
+    """
+    value = record
+    for key in path:
+        if value is None:
+            return None
+        if isinstance(value, dict) or (isinstance(value, list) and isinstance(key, int)):
+            try:
+                value = value[key]
+            except _MISSING:
+                return None
+        else:
+            return ValueError(f"{name}: Struktur abweichend bei {key!r} ({type(value).__name__})")
+    return value
+
+
+# Verweis eines Brettspiels, z.B. Kategorie oder Mechanik ("Cooperative Game")
+LINK = Schema(
+    "link",
+    {
+        "type": Field(("@type",), str, default=""),
+        "value": Field(("@value",), str, default=""),
+    },
+)
+
+# Brettspiel aus dem thing-Endpoint (stats=1)
+THING = Schema(
+    "thing",
+    {
+        "bgg_id": Field(("@id",), int, required=True),
+        "name": Field(("name", 0, "@value"), str, required=True),
+        "img": Field(("image",), str, default=""),
+        "img_small": Field(("thumbnail",), str, default=""),
+        "yearpublished": Field(("yearpublished", "@value"), int),
+        "minplayers": Field(("minplayers", "@value"), int),
+        "maxplayers": Field(("maxplayers", "@value"), int),
+        "playtime": Field(("playingtime", "@value"), int),
+        "rating": Field(("statistics", "ratings", "average", "@value"), float),
+        "weight": Field(("statistics", "ratings", "averageweight", "@value"), float),
+        "links": Field(("link",), schema=LINK),
+    },
+)
+
+# Spieler eines Spiels
+PLAYER = Schema(
+    "player",
+    {
+        "name": Field(("@name",), str, default=""),
+        "username": Field(("@username",), str),
+        "score": Field(("@score",), float, default=0.0),
+        "win": Field(("@win",), flag, default=False),
+    },
+)
+
+# Spiel aus dem plays-Endpoint
+PLAY = Schema(
+    "play",
+    {
+        "id": Field(("@id",), int, required=True),
+        "date": Field(("@date",), date.fromisoformat),
+        "length": Field(("@length",), int),
+        "location": Field(("@location",), str, default=""),
+        "bgg_id": Field(("item", "@objectid"), int, required=True),
+        "players": Field(("players", "player"), schema=PLAYER),
+    },
+)
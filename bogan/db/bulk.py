@@ -0,0 +1,69 @@
+"""
+Bulk Upsert
+
+Schreibt viele Zeilen mit wenigen Statements über SQLAlchemy Core:
+  - MySQL/MariaDB: INSERT ... ON DUPLICATE KEY UPDATE
+  - SQLite/PostgreSQL: INSERT ... ON CONFLICT (...) DO UPDATE
+Die Zeilen werden in Batches mit max. batch_size Einträgen geschrieben.
+"""
+
+from typing import Iterable
+from sqlalchemy import delete
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from bogan.config import SYNC_WRITE_BATCH_SIZE
+from bogan.utils import chunked
+
+
+def upsert_stmt(dialect_name: str, table, rows: list[dict], index_elements: list[str], update_columns: list[str]):
+    """Erzeugt das dialektspezifische Upsert-Statement für rows"""
+    if dialect_name in ("mysql", "mariadb"):
+        stmt = mysql.insert(table).values(rows)
+        return stmt.on_duplicate_key_update({column: stmt.inserted[column] for column in update_columns})
+
+    if dialect_name in ("sqlite", "postgresql"):
+        insert = sqlite.insert if dialect_name == "sqlite" else postgresql.insert
+        stmt = insert(table).values(rows)
+        return stmt.on_conflict_do_update(
+            index_elements=index_elements, set_={column: stmt.excluded[column] for column in update_columns}
+        )
+
+    raise ValueError(f"Bulk Upsert wird für die Datenbank {dialect_name} nicht unterstützt")
+
+
+def bulk_upsert(
+    session: Session,
+    model,
+    rows: Iterable[dict],
+    index_elements: list[str],
+    update_columns: list[str],
+    batch_size: int = SYNC_WRITE_BATCH_SIZE,
+) -> int:
+    """Fügt rows ein oder aktualisiert sie, wenn der eindeutige Schlüssel index_elements bereits existiert
+
+    Args:
+        session (Session): aktuelle Session, die Statements laufen in deren Transaktion
+        model: ORM-Modell, z.B. Game
+        rows (Iterable[dict]): Zeilen als Dictionary (Spaltenname -> Wert), alle mit denselben Spalten
+        index_elements (list[str]): Spalten des eindeutigen Schlüssels
+        update_columns (list[str]): Spalten, die bei einem Konflikt überschrieben werden
+        batch_size (int, optional): max. Zeilen pro Statement. Defaults to SYNC_WRITE_BATCH_SIZE.
+
+    Returns:
+        int: Anzahl geschriebener Zeilen
+    """
+    dialect_name = session.get_bind().dialect.name
+    count = 0
+    for batch in chunked(rows, batch_size):
+        session.execute(upsert_stmt(dialect_name, model.__table__, batch, index_elements, update_columns))
+        count += len(batch)
+    return count
+
+
+def bulk_delete(session: Session, model, ids: Iterable[int], batch_size: int = SYNC_WRITE_BATCH_SIZE) -> int:
+    """Löscht alle Zeilen mit den angegebenen Primärschlüsseln, gibt die Anzahl gelöschter Zeilen zurück"""
+    count = 0
+    for batch in chunked(ids, batch_size):
+        count += session.execute(delete(model).where(model.id.in_(batch))).rowcount
+    return count
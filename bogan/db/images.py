@@ -0,0 +1,264 @@
+"""
+Lokaler Spiegel der Brettspielbilder
+
+Nach dem Sync werden die Bilder aller Boardgames (`img`, ersatzweise `img_small`) von BGG geladen und im Ordner
+IMAGE_MIRROR_PATH in mehreren Breiten gespeichert (IMAGE_VARIANTS). Der Dateiname enthält einen Hash des Inhalts:
+ein geändertes Bild bekommt einen neuen Namen, die Dateien können deshalb vom Browser lange gecacht werden
+(Route `main.mirrored_image`). In den Templates liefert der Filter `local_img` die lokale Variante oder,
+solange es sie nicht gibt, die URL von BGG.
+
+Die Varianten erzeugt Pillow (Abhängigkeit in pyproject.toml). Fehlt Pillow trotzdem, z.B. bei einer Installation
+ohne Abhängigkeiten, werden die Originale von BGG gespeichert: für die große Variante das Bild, für die kleine und
+mittlere das Thumbnail (`img_small`), wie bei den URLs von BGG (BGG_FALLBACK).
+
+Verwendung:
+    uv run python -m bogan.db.images
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Callable, Iterator, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.exceptions import RequestException
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from bogan.config import (
+    BGG_TIMEOUT,
+    IMAGE_FORMAT,
+    IMAGE_MIRROR_PATH,
+    IMAGE_MIRROR_WORKERS,
+    IMAGE_QUALITY,
+    IMAGE_VARIANTS,
+)
+from bogan.db.models import Boardgame
+from bogan.utils import Logger, get_db_engine
+
+try:
+    from PIL import Image
+except ImportError:  # Installation ohne Abhängigkeiten: es wird nur das Original gespiegelt
+    Image = None
+
+# Add Logging
+logger = Logger().setup_logger(__file__)
+
+# Fallback auf die BGG-URL, solange ein Bild nicht gespiegelt ist: kleine Varianten nutzen das Thumbnail
+BGG_FALLBACK = {"small": "img_small", "medium": "img_small", "large": "img"}
+
+
+@dataclass
+class MirroredImage:
+    """Ergebnis eines Downloads: Boardgame, gespiegelte URL und Dateiname pro Variante"""
+
+    bgg_id: int
+    source: str
+    files: dict[str, str]
+
+
+def image_source(boardgame: Boardgame) -> Optional[str]:
+    """URL des Bildes, das gespiegelt wird (großes Bild, ersatzweise das Thumbnail)"""
+    return boardgame.img or boardgame.img_small or None
+
+
+def image_url(boardgame: Boardgame, variant: str = "small") -> Optional[str]:
+    """URL der lokalen Bildvariante für Templates, ohne lokales Bild die URL von BGG"""
+    from flask import url_for
+
+    filename = boardgame.image_file(variant)
+    if filename:
+        return url_for("main.mirrored_image", filename=filename)
+    return getattr(boardgame, BGG_FALLBACK.get(variant, "img"))
+
+
+def needs_mirror(boardgame: Boardgame, path: str = IMAGE_MIRROR_PATH) -> bool:
+    """Bild wurde noch nicht gespiegelt, hat sich bei BGG geändert oder eine Datei fehlt"""
+    source = image_source(boardgame)
+    if not source:
+        return False
+    if boardgame.img_source != source or not boardgame.img_files:
+        return True
+    files = json.loads(boardgame.img_files)
+    if set(files) != set(IMAGE_VARIANTS):
+        return True
+    # Breite oder Format geändert, oder bisher nur das Original gespiegelt (Pillow nachträglich installiert)
+    if Image is not None and not all(files[variant].endswith(variant_suffix(variant)) for variant in files):
+        return True
+    # ohne Pillow: kleine Varianten noch als großes Bild gespiegelt, obwohl es ein eigenes Thumbnail gibt
+    if Image is None and thumbnail_source(boardgame) and files["small"] == files["large"]:
+        return True
+    return not all(os.path.exists(os.path.join(path, filename)) for filename in files.values())
+
+
+def thumbnail_source(boardgame: Boardgame) -> Optional[str]:
+    """Ohne Pillow: URL des Thumbnails für die kleinen Varianten, None wenn es kein eigenes Thumbnail gibt"""
+    if Image is not None or not boardgame.img_small or boardgame.img_small == image_source(boardgame):
+        return None
+    return boardgame.img_small
+
+
+def variant_suffix(variant: str) -> str:
+    """Ende des Dateinamens einer mit Pillow erzeugten Variante: -<Breite>.<Format>"""
+    return f"-{IMAGE_VARIANTS[variant]}.{IMAGE_FORMAT.lower()}"
+
+
+def render_variants(bgg_id: int, content: bytes, source: str, path: str = IMAGE_MIRROR_PATH) -> dict[str, str]:
+    """Speichert die Varianten eines Bildes und gibt die Dateinamen pro Variante zurück
+
+    Dateiname: <bgg_id>-<Hash des Originals>-<Breite>.<Format>, ohne Pillow <bgg_id>-<Hash>.<Endung des Originals>
+
+    Raises:
+        OSError: Bild kann nicht gelesen oder gespeichert werden
+    """
+    if Image is None:
+        filename = save_original(bgg_id, content, source, path)
+        return {variant: filename for variant in IMAGE_VARIANTS}
+
+    digest = hashlib.sha256(content).hexdigest()[:16]
+    files = {}
+    with Image.open(BytesIO(content)) as original:
+        original.load()
+        mode = "RGBA" if "A" in original.getbands() and IMAGE_FORMAT.lower() in ("webp", "png") else "RGB"
+        original = original.convert(mode)
+        for variant, width in IMAGE_VARIANTS.items():
+            filename = f"{bgg_id}-{digest}{variant_suffix(variant)}"
+            files[variant] = filename
+            if os.path.exists(os.path.join(path, filename)):
+                continue
+            image = original
+            if original.width > width:
+                height = max(1, round(original.height * width / original.width))
+                image = original.resize((width, height), Image.Resampling.LANCZOS)
+            buffer = BytesIO()
+            image.save(buffer, format=IMAGE_FORMAT, quality=IMAGE_QUALITY)
+            _write(os.path.join(path, filename), buffer.getvalue())
+    return files
+
+
+def save_original(bgg_id: int, content: bytes, source: str, path: str = IMAGE_MIRROR_PATH) -> str:
+    """Speichert ein Bild unverändert als <bgg_id>-<Hash>.<Endung des Originals> und gibt den Dateinamen zurück"""
+    digest = hashlib.sha256(content).hexdigest()[:16]
+    extension = os.path.splitext(urlparse(source).path)[1].lower() or ".jpg"
+    filename = f"{bgg_id}-{digest}{extension}"
+    _write(os.path.join(path, filename), content)
+    return filename
+
+
+def _write(filepath: str, content: bytes):
+    """Schreibt atomar, ein abgebrochener Download hinterlässt keine halbe Datei unter dem endgültigen Namen"""
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(content)
+    os.replace(tmp_path, filepath)
+
+
+def remove_stale_files(bgg_id: int, keep: set[str], path: str = IMAGE_MIRROR_PATH) -> int:
+    """Löscht alte Dateien eines Boardgames (z.B. nach einem neuen Bild bei BGG)"""
+    removed = 0
+    prefix = f"{bgg_id}-"
+    for filename in os.listdir(path):
+        if filename.startswith(prefix) and filename not in keep:
+            os.remove(os.path.join(path, filename))
+            removed += 1
+    return removed
+
+
+class ImageMirror:
+    """Lädt Bilder parallel herunter und speichert ihre Varianten"""
+
+    def __init__(self, path: str = IMAGE_MIRROR_PATH, workers: int = IMAGE_MIRROR_WORKERS):
+        self.path = path
+        self.workers = workers
+        self.http = requests.Session()
+        os.makedirs(path, exist_ok=True)
+
+    def download(self, url: str) -> bytes:
+        response = self.http.get(url, timeout=BGG_TIMEOUT)
+        response.raise_for_status()
+        return response.content
+
+    def fetch(self, bgg_id: int, source: str, thumbnail: str = None) -> MirroredImage:
+        """Lädt ein Bild und speichert seine Varianten
+
+        Args:
+            bgg_id (int): Boardgame
+            source (str): URL des Bildes
+            thumbnail (str, optional): ohne Pillow die URL für die kleinen Varianten (BGG_FALLBACK). Defaults to None.
+
+        Raises:
+            RequestException: Download fehlgeschlagen
+            OSError: Bild kann nicht gelesen oder gespeichert werden
+        """
+        files = render_variants(bgg_id, self.download(source), source, self.path)
+        if thumbnail:
+            small = save_original(bgg_id, self.download(thumbnail), thumbnail, self.path)
+            files.update({variant: small for variant, field in BGG_FALLBACK.items() if field == "img_small"})
+        return MirroredImage(bgg_id, source, files)
+
+    def run(self, sources: dict[int, str], thumbnails: dict[int, str] = None) -> Iterator:
+        """Lädt alle Bilder (bgg_id -> URL), liefert die Ergebnisse in der Reihenfolge ihrer Fertigstellung
+
+        Ohne Pillow werden die kleinen Varianten aus thumbnails (bgg_id -> URL) geladen, sofern angegeben.
+        """
+        thumbnails = thumbnails or {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(self.fetch, bgg_id, source, thumbnails.get(bgg_id)): bgg_id
+                for bgg_id, source in sources.items()
+            }
+            for future in as_completed(futures):
+                try:
+                    yield future.result()
+                except (RequestException, OSError) as e:
+                    logger.warning(f"[Bilder] Boardgame {futures[future]} nicht gespiegelt: {type(e).__name__}: {e}")
+
+
+def mirror_images(
+    engine: Engine = None, progress: Callable[[int, str], None] = None, path: str = IMAGE_MIRROR_PATH
+) -> int:
+    """Spiegelt die Bilder aller Boardgames, die neu sind, sich geändert haben oder deren Dateien fehlen.
+    Gibt die Anzahl gespiegelter Bilder zurück.
+
+    """
+    engine = engine or get_db_engine()
+    if Image is None:
+        logger.warning("[Bilder] Pillow fehlt (uv sync), es werden nur Bild und Thumbnail von BGG gespiegelt")
+
+    # expire_on_commit=False: nach jedem Commit keine erneute Abfrage pro Boardgame
+    with Session(engine, expire_on_commit=False) as session:
+        boardgames = {boardgame.bgg_id: boardgame for boardgame in session.scalars(select(Boardgame))}
+        sources = {
+            bgg_id: image_source(boardgame)
+            for bgg_id, boardgame in boardgames.items()
+            if needs_mirror(boardgame, path)
+        }
+        if not sources:
+            logger.info("[Bilder] alle Bilder sind aktuell")
+            return 0
+        logger.info(f"[Bilder] spiegle {len(sources)} von {len(boardgames)} Bildern")
+        thumbnails = {bgg_id: thumbnail_source(boardgames[bgg_id]) for bgg_id in sources}
+
+        mirrored = 0
+        for image in ImageMirror(path).run(sources, thumbnails):
+            boardgame = boardgames[image.bgg_id]
+            boardgame.img_source = image.source
+            boardgame.img_files = json.dumps(image.files, sort_keys=True)
+            # Dateien zuerst in der Datenbank eintragen, erst danach die alten löschen
+            session.commit()
+            remove_stale_files(image.bgg_id, set(image.files.values()), path)
+            mirrored += 1
+            if progress:
+                progress(mirrored, f"{mirrored}/{len(sources)} Bilder gespiegelt")
+
+    logger.info(f"[Bilder] {mirrored} von {len(sources)} Bildern gespiegelt")
+    return mirrored
+
+
+if __name__ == "__main__":
+    mirror_images()
@@ -0,0 +1,318 @@
+"""
+Import von Spielen aus Exporten anderer Anwendungen
+
+Liest große Spiel-Exporte als Stream (die Datei wird nie komplett geladen) und schreibt sie über denselben Weg
+wie der Sync in die Datenbank (write_batches in update_db.py: Schema PLAY, Boardgames von BGG, Spieler und
+Locations über die SyncIdentityMap, Bulk Upsert). Unterstützte Formate, optional gzip-komprimiert (.gz):
+  - ndjson: ein Spiel pro Zeile, flach (siehe to_bgg_play) oder im Format der BGG-API, auch Snapshots
+    (snapshot.py, die Kopfzeilen werden übersprungen)
+  - csv: eine Zeile pro Spieler (Spalten siehe CSV_COLUMNS), die Zeilen eines Spiels stehen direkt untereinander
+  - bgg: JSON-Liste im Format der BGG-API, z.B. von älteren Versionen mit `update_db(save_file=True)` gespeichert
+
+Importierte Spiele bekommen eine negative, stabile Id (aus Quelle und Id im Export bzw. dem Inhalt des Spiels).
+Ein erneuter Import derselben Datei aktualisiert die Spiele, statt sie doppelt anzulegen, und der vollständige
+Sync mit BGG löscht sie nicht. Mit --keep-ids werden die Ids aus der Datei übernommen (eigene BGG-Plays),
+diese Spiele werden danach vom Sync verwaltet.
+
+Verwendung:
+    uv run python -m bogan.db.importer plays.ndjson --source bgstats
+    uv run python -m bogan.db.importer plays.csv.gz
+    uv run python -m bogan.db.importer data/example/example_plays.json --format bgg --keep-ids
+"""
+
+import csv
+import gzip
+import hashlib
+import json
+from itertools import groupby
+from typing import Callable, Iterable, Iterator, TextIO
+
+from sqlalchemy.orm import Session
+
+from bogan.config import ENCODING, SYNC_BATCH_SIZE, SYNC_COMMIT_EVERY
+from bogan.db import update_db
+from bogan.db.snapshot import is_header
+from bogan.utils import Logger
+
+# Add Logging
+logger = Logger().setup_logger(__file__)
+
+FORMATS = ("ndjson", "csv", "bgg")
+# Dateiendung -> Format
+EXTENSIONS = {".ndjson": "ndjson", ".jsonl": "ndjson", ".csv": "csv", ".json": "bgg"}
+# Spalten im CSV-Export, eine Zeile pro Spieler. play_id ist optional
+CSV_COLUMNS = ("play_id", "date", "bgg_id", "length", "location", "player", "username", "score", "win")
+# Werte, die im CSV/NDJSON als Sieg gelten
+WIN_VALUES = ("1", "true", "yes", "ja", "x")
+# Zeichen pro Lesevorgang beim Stream-Parser für JSON-Listen
+JSON_CHUNK_SIZE = 64 * 1024
+
+
+def detect_format(path: str) -> str:
+    """Format anhand der Dateiendung (.gz wird ignoriert)
+
+    Raises:
+        ValueError: unbekannte Dateiendung
+    """
+    name = path.lower().removesuffix(".gz")
+    for extension, file_format in EXTENSIONS.items():
+        if name.endswith(extension):
+            return file_format
+    raise ValueError(f"Format von {path} unbekannt, bitte --format angeben ({', '.join(FORMATS)})")
+
+
+def open_text(path: str) -> TextIO:
+    """Öffnet die Datei als Text, .gz wird beim Lesen entpackt"""
+    if path.lower().endswith(".gz"):
+        return gzip.open(path, "rt", encoding=ENCODING, newline="")
+    return open(path, "r", encoding=ENCODING, newline="")
+
+
+def is_win(value) -> bool:
+    return value is True or str(value).strip().lower() in WIN_VALUES
+
+
+def to_bgg_play(record: dict) -> dict:
+    """Wandelt ein flaches Spiel in das Format der BGG-API (xmltodict) um, das der Sync erwartet
+
+    Flaches Format:
+        {"id": "a1", "date": "2019-05-01", "bgg_id": 13, "length": 60, "location": "Cafe",
+         "players": [{"name": "Anna", "username": "", "score": 12, "win": true}]}
+    """
+    if "@id" in record or "item" in record:
+        # bereits im Format der BGG-API
+        return record
+
+    def text(value) -> str:
+        return "" if value is None else str(value)
+
+    return {
+        "@id": text(record.get("id")),
+        "@date": text(record.get("date")),
+        "@length": text(record.get("length")),
+        "@location": text(record.get("location")),
+        "item": {"@objectid": text(record.get("bgg_id"))},
+        "players": {
+            "player": [
+                {
+                    "@name": text(player.get("name")),
+                    "@username": text(player.get("username")),
+                    "@score": text(player.get("score")),
+                    "@win": "1" if is_win(player.get("win")) else "0",
+                }
+                for player in record.get("players") or []
+            ]
+        },
+    }
+
+
+def read_ndjson(file: TextIO) -> Iterator[dict]:
+    """Ein Spiel pro Zeile, leere Zeilen und Kopfzeilen von Snapshots werden übersprungen"""
+    for line_number, line in enumerate(file, start=1):
+        line = line.strip()
+        if not line or is_header(line):
+            continue
+        try:
+            yield to_bgg_play(json.loads(line))
+        except (json.JSONDecodeError, AttributeError) as e:
+            logger.warning(f"[Import] Zeile {line_number} übersprungen: {e}")
+
+
+def read_csv(file: TextIO) -> Iterator[dict]:
+    """Eine Zeile pro Spieler, aufeinanderfolgende Zeilen mit derselben play_id (bzw. demselben Datum, Spiel und
+    Ort, wenn es keine play_id gibt) bilden ein Spiel
+
+    Raises:
+        ValueError: Pflichtspalten fehlen
+    """
+    reader = csv.DictReader(file)
+    missing = {"date", "bgg_id", "player"} - set(reader.fieldnames or [])
+    if missing:
+        raise ValueError(f"CSV ohne Spalten {sorted(missing)}, erwartet: {', '.join(CSV_COLUMNS)}")
+
+    def play_key(row: dict) -> tuple:
+        return (row.get("play_id") or "", row.get("date"), row.get("bgg_id"), row.get("location") or "")
+
+    for _, rows in groupby(reader, key=play_key):
+        rows = list(rows)
+        first = rows[0]
+        yield to_bgg_play(
+            {
+                "id": first.get("play_id"),
+                "date": first.get("date"),
+                "bgg_id": first.get("bgg_id"),
+                "length": first.get("length"),
+                "location": first.get("location"),
+                "players": [
+                    {"name": row.get("player"), "username": row.get("username"), "score": row.get("score"),
+                     "win": row.get("win")}
+                    for row in rows
+                ],
+            }
+        )
+
+
+def read_json_array(file: TextIO, chunk_size: int = JSON_CHUNK_SIZE) -> Iterator[dict]:
+    """Liest eine JSON-Liste Element für Element, ohne die ganze Liste zu laden
+
+    Raises:
+        ValueError: die Datei enthält keine JSON-Liste oder ist unvollständig
+    """
+    decoder = json.JSONDecoder()
+    buffer = file.read(chunk_size).lstrip()
+    if not buffer.startswith("["):
+        raise ValueError("JSON-Datei enthält keine Liste")
+    position = 1
+    eof = False
+    while True:
+        # Trennzeichen zwischen den Elementen überspringen
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer) or eof:
+                break
+            buffer, position = file.read(chunk_size), 0
+            eof = not buffer
+        if position >= len(buffer):
+            raise ValueError("JSON-Liste ist unvollständig")
+        if buffer[position] == "]":
+            return
+
+        try:
+            element, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise ValueError("JSON-Liste ist unvollständig")
+            # Element reicht über das Ende des Puffers hinaus: nachladen
+            chunk = file.read(chunk_size)
+            eof = not chunk
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+        yield element
+        position = end
+
+
+def read_bgg_json(file: TextIO) -> Iterator[dict]:
+    for element in read_json_array(file):
+        yield to_bgg_play(element)
+
+
+READERS: dict[str, Callable[[TextIO], Iterator[dict]]] = {
+    "ndjson": read_ndjson,
+    "csv": read_csv,
+    "bgg": read_bgg_json,
+}
+
+
+def import_id(source: str, my_game: dict) -> int:
+    """Negative, stabile Id eines importierten Spiels (63 Bit)
+
+    Aus Quelle und Id im Export, ohne Id aus dem Inhalt (Datum, Spiel, Ort, Spieler). Ohne Id werden identische
+    Spiele am selben Tag daher zu einem Spiel zusammengefasst.
+    """
+    record_id = my_game.get("@id")
+    if record_id:
+        key = f"{source}:{record_id}"
+    else:
+        players = my_game.get("players") or {}
+        key = json.dumps(
+            [source, my_game.get("@date"), my_game.get("item"), my_game.get("@location"), players],
+            sort_keys=True,
+        )
+    value = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big") & (2**63 - 1)
+    return -(value or 1)
+
+
+def assign_ids(my_games: Iterable[dict], source: str) -> Iterator[dict]:
+    for my_game in my_games:
+        my_game["@id"] = str(import_id(source, my_game))
+        yield my_game
+
+
+def import_plays(
+    path: str,
+    file_format: str = None,
+    source: str = "import",
+    keep_ids: bool = False,
+    batch_size: int = SYNC_BATCH_SIZE,
+    commit_every: int = SYNC_COMMIT_EVERY,
+    progress: Callable[[int, str], None] = None,
+) -> dict[str, int]:
+    """Importiert alle Spiele aus path. Gibt die Zähler des Laufs zurück (neu, geändert, unverändert, ungültig).
+
+    Alle commit_every Spiele wird committet, ein abgebrochener Import kann einfach erneut gestartet werden:
+    bereits importierte Spiele sind unverändert und werden übersprungen.
+
+    """
+    file_format = file_format or detect_format(path)
+    engine = update_db.init_engine()
+    telemetry = update_db.SyncTelemetry("import")
+    timer = telemetry.timer
+    counts = telemetry.counts
+
+    logger.info(f"[Import] {path} ({file_format}), Quelle {source}")
+    with open_text(path) as file, Session(engine) as session:
+        try:
+            my_games = READERS[file_format](file)
+            if not keep_ids:
+                my_games = assign_ids(my_games, source)
+
+            processed = since_commit = 0
+            for prepared in update_db.write_batches(session, my_games, timer, counts, batch_size):
+                processed += prepared.size
+                since_commit += prepared.size
+                telemetry.run.plays = processed
+                if commit_every and since_commit >= commit_every:
+                    with timer.phase("commit"):
+                        update_db.commit_batch(session)
+                    since_commit = 0
+                if progress:
+                    progress(processed, f"{processed} Spiele importiert")
+
+            with timer.phase("commit"):
+                session.commit()
+        except BaseException as e:
+            session.rollback()
+            telemetry.finish(error=f"{type(e).__name__}: {e}")
+            raise
+    run = telemetry.finish()
+
+    logger.info(
+        f"[Import] abgeschlossen: {processed} Spiele in {run.duration}s, "
+        f"{counts['game_inserted']} neu / {counts['game_updated']} geändert / "
+        f"{counts['game_unchanged']} unverändert / {counts['play_invalid']} ungültig"
+    )
+    return dict(counts)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Importiert Spiele aus einem Export (NDJSON, CSV, BGG-JSON)")
+    parser.add_argument("path", help="Datei, optional gzip-komprimiert (.gz)")
+    parser.add_argument("--format", choices=FORMATS, help="Format der Datei, Standard: anhand der Dateiendung")
+    parser.add_argument("--source", default="import", help="Name der Quelle, Teil der Ids importierter Spiele")
+    parser.add_argument("--keep-ids", action="store_true", help="Ids aus der Datei übernehmen (eigene BGG-Plays)")
+    parser.add_argument("--batch-size", type=int, default=SYNC_BATCH_SIZE)
+    parser.add_argument("--commit-every", type=int, default=SYNC_COMMIT_EVERY)
+    args = parser.parse_args()
+
+    from bogan.jobs.queue import JobLocked
+    from bogan.jobs.worker import Worker
+
+    # als Job mit der Sperre der Job-Queue, damit nicht gleichzeitig ein Sync läuft
+    try:
+        Worker(update_db.init_engine(), schedule=False).run_now(
+            "import",
+            lambda progress: import_plays(
+                args.path,
+                file_format=args.format,
+                source=args.source,
+                keep_ids=args.keep_ids,
+                batch_size=args.batch_size,
+                commit_every=args.commit_every,
+                progress=progress,
+            ),
+        )
+    except JobLocked as e:
+        parser.exit(1, f"{e}, Import nicht gestartet\n")
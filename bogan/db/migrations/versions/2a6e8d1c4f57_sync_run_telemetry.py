@@ -0,0 +1,53 @@
+"""sync run telemetry with per-phase timings
+
+Revision ID: 2a6e8d1c4f57
+Revises: f19c3b7d2e84
+Create Date: 2026-10-18 18:02:36.118420
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2a6e8d1c4f57'
+down_revision = 'f19c3b7d2e84'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('sync_run',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=32), nullable=False),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('duration', sa.Float(), nullable=False),
+        sa.Column('plays', sa.Integer(), nullable=False),
+        sa.Column('t_fetch_plays', sa.Float(), nullable=False),
+        sa.Column('t_fetch_boardgames', sa.Float(), nullable=False),
+        sa.Column('t_locations', sa.Float(), nullable=False),
+        sa.Column('t_games', sa.Float(), nullable=False),
+        sa.Column('t_delete', sa.Float(), nullable=False),
+        sa.Column('t_commit', sa.Float(), nullable=False),
+        sa.Column('bgg_calls', sa.Integer(), nullable=False),
+        sa.Column('bgg_retries', sa.Integer(), nullable=False),
+        sa.Column('bgg_bytes', sa.Integer(), nullable=False),
+        sa.Column('rows_inserted', sa.Integer(), nullable=False),
+        sa.Column('rows_updated', sa.Integer(), nullable=False),
+        sa.Column('rows_deleted', sa.Integer(), nullable=False),
+        sa.Column('rows_unchanged', sa.Integer(), nullable=False),
+        sa.Column('counts', sa.Text(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('sync_run', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_sync_run_started_at'), ['started_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('sync_run', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_sync_run_started_at'))
+
+    op.drop_table('sync_run')
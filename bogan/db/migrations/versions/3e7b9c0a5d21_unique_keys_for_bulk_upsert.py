@@ -0,0 +1,75 @@
+"""unique keys for bulk upsert of game and player_pos
+
+Revision ID: 3e7b9c0a5d21
+Revises: 8c1f3a2d9e47
+Create Date: 2026-10-18 11:02:17.540916
+
+"""
+import logging
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3e7b9c0a5d21'
+down_revision = '8c1f3a2d9e47'
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+# Ältester Eintrag (MIN(id)) pro Schlüssel, als abgeleitete Tabelle: MySQL erlaubt in DELETE/UPDATE keine
+# Unterabfrage auf dieselbe Tabelle
+KEEP_GAME = "SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM game GROUP BY game_bgg_id) AS keep"
+KEEP_PLAYER_POS = "SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM player_pos GROUP BY game_id, player_id) AS keep"
+
+DUPLICATE_GAMES = f"SELECT COUNT(*) FROM game WHERE id NOT IN ({KEEP_GAME})"
+DUPLICATE_PLAYER_POS = f"SELECT COUNT(*) FROM player_pos WHERE id NOT IN ({KEEP_PLAYER_POS})"
+
+# Merge der Duplikate (nur mit -x merge_duplicates=1):
+# 1. PlayerPos doppelter Games auf das älteste Game mit derselben game_bgg_id umhängen
+MOVE_PLAYER_POS = (
+    "UPDATE player_pos SET game_id = ("
+    "SELECT MIN(kept.id) FROM game AS kept JOIN game AS duplicate ON kept.game_bgg_id = duplicate.game_bgg_id "
+    f"WHERE duplicate.id = player_pos.game_id) "
+    f"WHERE game_id NOT IN ({KEEP_GAME}) AND game_id IN (SELECT id FROM game)"
+)
+# 2. danach doppelte PlayerPos (game_id, player_id) löschen, der älteste Eintrag bleibt erhalten
+DELETE_PLAYER_POS = f"DELETE FROM player_pos WHERE id NOT IN ({KEEP_PLAYER_POS})"
+# 3. doppelte Games löschen, sie haben keine PlayerPos mehr
+DELETE_GAMES = f"DELETE FROM game WHERE id NOT IN ({KEEP_GAME})"
+
+
+def upgrade():
+    bind = op.get_bind()
+    games = bind.execute(sa.text(DUPLICATE_GAMES)).scalar()
+    player_pos = bind.execute(sa.text(DUPLICATE_PLAYER_POS)).scalar()
+    if games or player_pos:
+        if context.get_x_argument(as_dictionary=True).get('merge_duplicates') != '1':
+            raise RuntimeError(
+                f"Eindeutige Schlüssel können nicht angelegt werden: {games} doppelte game (game_bgg_id) und "
+                f"{player_pos} doppelte player_pos (game_id, player_id). Duplikate selbst bereinigen oder mit "
+                "'flask db upgrade -x merge_duplicates=1' zusammenführen: PlayerPos doppelter Games werden auf "
+                "das älteste Game umgehängt, danach bleibt jeweils der älteste Eintrag erhalten."
+            )
+        for message, statement in (
+            ("PlayerPos auf das älteste Game umgehängt", MOVE_PLAYER_POS),
+            ("doppelte PlayerPos gelöscht", DELETE_PLAYER_POS),
+            ("doppelte Games gelöscht", DELETE_GAMES),
+        ):
+            logger.warning(f"{bind.execute(sa.text(statement)).rowcount} {message}")
+
+    with op.batch_alter_table('game', schema=None) as batch_op:
+        batch_op.create_unique_constraint('game_bgg_id', ['game_bgg_id'])
+
+    with op.batch_alter_table('player_pos', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_player_pos_game_player', ['game_id', 'player_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('player_pos', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_player_pos_game_player', type_='unique')
+
+    with op.batch_alter_table('game', schema=None) as batch_op:
+        batch_op.drop_constraint('game_bgg_id', type_='unique')
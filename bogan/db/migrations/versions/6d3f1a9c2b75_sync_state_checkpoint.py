@@ -0,0 +1,36 @@
+"""sync state checkpoint for resumable syncs
+
+Revision ID: 6d3f1a9c2b75
+Revises: 2a6e8d1c4f57
+Create Date: 2026-10-18 18:04:12.517839
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6d3f1a9c2b75'
+down_revision = '2a6e8d1c4f57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('sync_state', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('checkpoint_kind', sa.String(length=32), nullable=True))
+        batch_op.add_column(sa.Column('checkpoint_mindate', sa.Date(), nullable=True))
+        batch_op.add_column(sa.Column('checkpoint_page', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('checkpoint_play_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('checkpoint_plays', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('checkpoint_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('sync_state', schema=None) as batch_op:
+        batch_op.drop_column('checkpoint_at')
+        batch_op.drop_column('checkpoint_plays')
+        batch_op.drop_column('checkpoint_play_id')
+        batch_op.drop_column('checkpoint_page')
+        batch_op.drop_column('checkpoint_mindate')
+        batch_op.drop_column('checkpoint_kind')
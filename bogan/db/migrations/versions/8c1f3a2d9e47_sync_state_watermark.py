@@ -0,0 +1,32 @@
+"""sync state watermark for incremental sync
+
+Revision ID: 8c1f3a2d9e47
+Revises: 5ca20de4a159
+Create Date: 2026-10-18 09:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c1f3a2d9e47'
+down_revision = '5ca20de4a159'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('sync_state',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('bgg_user', sa.String(length=128), nullable=False),
+        sa.Column('last_play_date', sa.Date(), nullable=True),
+        sa.Column('last_play_id', sa.Integer(), nullable=True),
+        sa.Column('synced_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('bgg_user')
+    )
+
+
+def downgrade():
+    op.drop_table('sync_state')
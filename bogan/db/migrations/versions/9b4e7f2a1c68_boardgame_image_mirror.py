@@ -0,0 +1,28 @@
+"""boardgame image mirror
+
+Revision ID: 9b4e7f2a1c68
+Revises: 6d3f1a9c2b75
+Create Date: 2026-10-18 19:12:40.283615
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b4e7f2a1c68'
+down_revision = '6d3f1a9c2b75'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('boardgame', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('img_source', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('img_files', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('boardgame', schema=None) as batch_op:
+        batch_op.drop_column('img_files')
+        batch_op.drop_column('img_source')
@@ -0,0 +1,28 @@
+"""newest play of an unfinished sync in the sync state checkpoint
+
+Revision ID: a1d7e3c90b42
+Revises: f2c9a4e7b1d5
+Create Date: 2026-10-18 23:41:27.604915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1d7e3c90b42'
+down_revision = 'f2c9a4e7b1d5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('sync_state', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('checkpoint_newest_date', sa.Date(), nullable=True))
+        batch_op.add_column(sa.Column('checkpoint_newest_id', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('sync_state', schema=None) as batch_op:
+        batch_op.drop_column('checkpoint_newest_id')
+        batch_op.drop_column('checkpoint_newest_date')
@@ -0,0 +1,28 @@
+"""boardgame fetched_at and stats_fetched_at for staleness-aware refresh
+
+Revision ID: b41d6e2f8a13
+Revises: 3e7b9c0a5d21
+Create Date: 2026-10-18 15:48:03.527190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b41d6e2f8a13'
+down_revision = '3e7b9c0a5d21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('boardgame', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('fetched_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('stats_fetched_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('boardgame', schema=None) as batch_op:
+        batch_op.drop_column('stats_fetched_at')
+        batch_op.drop_column('fetched_at')
@@ -0,0 +1,30 @@
+"""last search per user in the vote tool
+
+Revision ID: b6e2f8d41c97
+Revises: a1d7e3c90b42
+Create Date: 2026-10-18 18:12:40.118342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e2f8d41c97'
+down_revision = 'a1d7e3c90b42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('vote_search',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('results', sa.Text(), nullable=False),
+        sa.Column('searched_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade():
+    op.drop_table('vote_search')
@@ -0,0 +1,30 @@
+"""game_bgg_id as bigint for imported plays
+
+Revision ID: c7a2e5f91d36
+Revises: 9b4e7f2a1c68
+Create Date: 2026-10-18 20:03:51.904127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7a2e5f91d36'
+down_revision = '9b4e7f2a1c68'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('game', schema=None) as batch_op:
+        batch_op.alter_column(
+            'game_bgg_id', existing_type=sa.Integer(), type_=sa.BigInteger(), existing_nullable=False, nullable=False
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('game', schema=None) as batch_op:
+        batch_op.alter_column(
+            'game_bgg_id', existing_type=sa.BigInteger(), type_=sa.Integer(), existing_nullable=False, nullable=False
+        )
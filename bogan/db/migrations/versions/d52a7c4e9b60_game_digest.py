@@ -0,0 +1,26 @@
+"""game digest for content-hash change detection
+
+Revision ID: d52a7c4e9b60
+Revises: b41d6e2f8a13
+Create Date: 2026-10-18 16:21:47.093315
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd52a7c4e9b60'
+down_revision = 'b41d6e2f8a13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('game', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('digest', sa.String(length=32), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('game', schema=None) as batch_op:
+        batch_op.drop_column('digest')
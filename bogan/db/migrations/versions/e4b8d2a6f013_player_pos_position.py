@@ -0,0 +1,77 @@
+"""materialized finishing position on player_pos
+
+Revision ID: e4b8d2a6f013
+Revises: c7a2e5f91d36
+Create Date: 2026-10-18 21:14:08.327561
+
+"""
+from itertools import groupby
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b8d2a6f013'
+down_revision = 'c7a2e5f91d36'
+branch_labels = None
+depends_on = None
+
+# Zeilen pro UPDATE beim Befüllen
+BATCH_SIZE = 1000
+
+
+def _positions(results):
+    """Platzierungen wie models.finishing_positions (Stand dieser Migration)"""
+    keys = [(bool(win), points if points is not None else 0.0) for win, points in results]
+    order = sorted(range(len(keys)), key=lambda index: keys[index], reverse=True)
+    positions = [0] * len(keys)
+    for rank, index in enumerate(order):
+        previous = order[rank - 1] if rank else None
+        if previous is not None and keys[previous] == keys[index]:
+            positions[index] = positions[previous]
+        else:
+            positions[index] = rank + 1
+    return positions
+
+
+def upgrade():
+    with op.batch_alter_table('player_pos', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('position', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_player_pos_position'), ['position'], unique=False)
+
+    # Platzierungen aller vorhandenen Partien berechnen
+    bind = op.get_bind()
+    player_pos = sa.table(
+        'player_pos',
+        sa.column('id', sa.Integer),
+        sa.column('game_id', sa.Integer),
+        sa.column('points', sa.Float),
+        sa.column('win', sa.Boolean),
+        sa.column('position', sa.Integer),
+    )
+    rows = bind.execute(
+        sa.select(player_pos.c.id, player_pos.c.game_id, player_pos.c.win, player_pos.c.points)
+        .order_by(player_pos.c.game_id, player_pos.c.id)
+    ).all()
+    update = (
+        sa.update(player_pos)
+        .where(player_pos.c.id == sa.bindparam('pos_id'))
+        .values(position=sa.bindparam('pos_position'))
+    )
+    pending = []
+    for _, game_rows in groupby(rows, key=lambda row: row.game_id):
+        game_rows = list(game_rows)
+        for row, position in zip(game_rows, _positions((row.win, row.points) for row in game_rows)):
+            pending.append({'pos_id': row.id, 'pos_position': position})
+        if len(pending) >= BATCH_SIZE:
+            bind.execute(update, pending)
+            pending = []
+    if pending:
+        bind.execute(update, pending)
+
+
+def downgrade():
+    with op.batch_alter_table('player_pos', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_player_pos_position'))
+        batch_op.drop_column('position')
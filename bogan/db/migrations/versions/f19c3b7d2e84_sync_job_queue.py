@@ -0,0 +1,44 @@
+"""sync job queue for the background worker
+
+Revision ID: f19c3b7d2e84
+Revises: d52a7c4e9b60
+Create Date: 2026-10-18 17:05:12.640981
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f19c3b7d2e84'
+down_revision = 'd52a7c4e9b60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('sync_job',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=32), nullable=False),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('running_lock', sa.String(length=32), nullable=True),
+        sa.Column('requested_by', sa.String(length=128), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+        sa.Column('progress', sa.Integer(), nullable=False),
+        sa.Column('message', sa.String(length=255), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('running_lock')
+    )
+    with op.batch_alter_table('sync_job', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_sync_job_status'), ['status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('sync_job', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_sync_job_status'))
+
+    op.drop_table('sync_job')
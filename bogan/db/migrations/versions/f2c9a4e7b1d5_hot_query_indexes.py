@@ -0,0 +1,43 @@
+"""indexes for the hot queries of game and player_pos
+
+Revision ID: f2c9a4e7b1d5
+Revises: e4b8d2a6f013
+Create Date: 2026-10-18 22:05:36.118402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c9a4e7b1d5'
+down_revision = 'e4b8d2a6f013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('game', schema=None) as batch_op:
+        batch_op.create_index('ix_game_datum', ['datum'], unique=False)
+        batch_op.create_index('ix_game_location_datum', ['location_id', 'datum'], unique=False)
+        batch_op.create_index('ix_game_boardgame_datum', ['boardgame_id', 'datum'], unique=False)
+
+    with op.batch_alter_table('player_pos', schema=None) as batch_op:
+        batch_op.create_index('ix_player_pos_player_game', ['player_id', 'game_id'], unique=False)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'mysql':
+        # MySQL entfernt den automatisch angelegten Index eines Fremdschlüssels, wenn ein anderer Index ihn abdeckt.
+        # Ohne eigenen Index kann der zusammengesetzte Index dann nicht gelöscht werden.
+        op.create_index('ix_game_location_id', 'game', ['location_id'], unique=False)
+        op.create_index('ix_game_boardgame_id', 'game', ['boardgame_id'], unique=False)
+        op.create_index('ix_player_pos_player_id', 'player_pos', ['player_id'], unique=False)
+
+    with op.batch_alter_table('player_pos', schema=None) as batch_op:
+        batch_op.drop_index('ix_player_pos_player_game')
+
+    with op.batch_alter_table('game', schema=None) as batch_op:
+        batch_op.drop_index('ix_game_boardgame_datum')
+        batch_op.drop_index('ix_game_location_datum')
+        batch_op.drop_index('ix_game_datum')
@@ -1,8 +1,12 @@
-from typing import List
-from datetime import date
-from sqlalchemy import String, ForeignKey, Float, Integer, Date, Boolean
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
-from bogan.utils import nested_get
+import json
+from typing import Iterable, List, Optional
+from datetime import date, datetime, timedelta
+from sqlalchemy import (
+    BigInteger, String, Text, ForeignKey, Float, Integer, Date, DateTime, Boolean, Index, UniqueConstraint, event
+)
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column, relationship
+from bogan.db.bgg_schema import THING
+from bogan.db.replica import ReplicaSession
 from flask_login import UserMixin
 from flask_sqlalchemy import SQLAlchemy
 
@@ -11,7 +15,40 @@ class Base(DeclarativeBase):
     pass
 
 
-db = SQLAlchemy(model_class=Base)
+class BoganSQLAlchemy(SQLAlchemy):
+    """Flask-SQLAlchemy mit der Engine aus get_db_engine, db.session nutzt denselben Pool wie der Rest der App"""
+
+    def _make_engine(self, bind_key, options, app):
+        from bogan.utils import get_db_engine
+
+        # konfigurierte URL statt options["url"], dort ergänzt Flask-SQLAlchemy z.B. charset=utf8mb4 (MySQL),
+        # das wäre eine andere URL und damit eine zweite Engine
+        url = app.config["SQLALCHEMY_DATABASE_URI"] if bind_key is None else options["url"]
+        return get_db_engine(url)
+
+
+# db.session liest in Routen mit @use_replica von der Read-Replica (siehe replica.py)
+db = BoganSQLAlchemy(model_class=Base, session_options={"class_": ReplicaSession})
+
+
+def finishing_positions(results: Iterable[tuple[bool, Optional[float]]]) -> list[int]:
+    """
+    Berechnet die Platzierungen einer Partie, in derselben Reihenfolge wie results (win, points):
+      - win=True -> bevorzugt (oben)
+      - Punkte (höher = besser, keine Punkte zählen als 0)
+      - Bei Gleichstand teilen sich die Spieler die Position,
+        und die nächste wird entsprechend übersprungen (1, 1, 3).
+    """
+    keys = [(bool(win), points if points is not None else 0.0) for win, points in results]
+    order = sorted(range(len(keys)), key=lambda index: keys[index], reverse=True)
+    positions = [0] * len(keys)
+    for rank, index in enumerate(order):
+        previous = order[rank - 1] if rank else None
+        if previous is not None and keys[previous] == keys[index]:
+            positions[index] = positions[previous]
+        else:
+            positions[index] = rank + 1
+    return positions
 
 
 class User(UserMixin, db.Model):
@@ -45,91 +82,46 @@ class Player(db.Model):
 
 
 class PlayerPos(db.Model):
+    __table_args__ = (
+        # ein Spieler hat pro Partie genau einen Eintrag (Schlüssel für den Bulk Upsert im Sync),
+        # dient auch als Index für die Spieler einer Partie (game_id)
+        UniqueConstraint("game_id", "player_id", name="uq_player_pos_game_player"),
+        # Partien eines Spielers (Spielerstatistik)
+        Index("ix_player_pos_player_game", "player_id", "game_id"),
+    )
+
     id: Mapped[int] = mapped_column(primary_key=True)
     points: Mapped[float] = mapped_column(Float, nullable=True, default=None)
     win: Mapped[bool] = mapped_column(Boolean)
     game_id: Mapped[int] = mapped_column(ForeignKey("game.id"))
     player_id: Mapped[int] = mapped_column(ForeignKey("player.id"))
+    # Platzierung in der Partie (finishing_positions), wird beim Schreiben berechnet:
+    # im Sync in update_player_positions, bei Änderungen über das ORM vor dem Flush (_update_positions)
+    position: Mapped[int] = mapped_column(Integer, nullable=True, index=True)
     # Relationship
     game: Mapped["Game"] = relationship("Game", back_populates="player_pos")
     player: Mapped["Player"] = relationship("Player", back_populates="player_pos")
 
-    @property
-    def position(self) -> int:
-        """
-        Berechnet den Rang des Spielers in diesem Spiel anhand:
-          - win=True -> bevorzugt (oben)
-          - Punkte (höher = besser)
-          - Bei Gleichstand teilen sich die Spieler die Position,
-            und die nächste wird entsprechend übersprungen.
-        """
-        # Alle PlayerPos für das gleiche Spiel holen und sortieren
-        all_positions = sorted(
-            self.game.player_pos,
-            key=lambda p: (p.win, p.points if p.points is not None else 0.0),
-            reverse=True
-        )
-        
-        # Position basierend auf der sortierten Liste berechnen
-        current_rank = 1
-        for i, player_pos in enumerate(all_positions):
-            if player_pos.id == self.id:
-                return current_rank
-            
-            # Prüfen, ob der nächste Spieler eine andere Punktzahl hat
-            if i + 1 < len(all_positions):
-                current_player = (player_pos.win, player_pos.points)
-                next_player = (all_positions[i + 1].win, all_positions[i + 1].points)
-                
-                # Wenn sich die Werte unterscheiden, erhöhe den Rang für den nächsten Spieler
-                if current_player != next_player:
-                    current_rank = i + 2  # i+2 weil wir 1-basiert zählen
-        
-        return current_rank  # Fallback, sollte nie erreicht werden
-    
+    @staticmethod
+    def assign_positions(player_positions: List["PlayerPos"]):
+        """Setzt die Platzierungen aller PlayerPos einer Partie (siehe finishing_positions)"""
+        positions = finishing_positions((player_pos.win, player_pos.points) for player_pos in player_positions)
+        for player_pos, position in zip(player_positions, positions):
+            player_pos.position = position
+
     @classmethod
     def get_game_rankings(cls, game_id: int) -> dict[str, int]:
         """
-        Berechnet die Rankings für alle Spieler in einem Spiel auf einmal.
-        Effizienter als einzelne position-Aufrufe.
-        
+        Liest die Rankings für alle Spieler in einem Spiel auf einmal.
+
         Args:
             game_id: ID des Spiels
-            
+
         Returns:
             Dictionary mit player_name -> position Mapping
         """
-        from sqlalchemy.orm import Session
-        from bogan.utils import get_db_engine
-        
-        engine = get_db_engine()
-        with Session(engine) as session:
-            player_positions = session.query(cls).filter_by(game_id=game_id).all()
-            
-            # Sortieren nach win (absteigend), dann nach points (absteigend)
-            sorted_positions = sorted(
-                player_positions,
-                key=lambda p: (p.win, p.points if p.points is not None else 0.0),
-                reverse=True
-            )
-            
-            # Rankings berechnen
-            rankings = {}
-            current_rank = 1
-            
-            for i, player_pos in enumerate(sorted_positions):
-                rankings[player_pos.player.name] = current_rank
-                
-                # Prüfen, ob der nächste Spieler eine andere Punktzahl hat
-                if i + 1 < len(sorted_positions):
-                    current_player = (player_pos.win, player_pos.points)
-                    next_player = (sorted_positions[i + 1].win, sorted_positions[i + 1].points)
-                    
-                    # Wenn sich die Werte unterscheiden, erhöhe den Rang für den nächsten Spieler
-                    if current_player != next_player:
-                        current_rank = i + 2
-            
-            return rankings
+        rows = db.session.query(Player.name, cls.position).join(cls.player).filter(cls.game_id == game_id).all()
+        return dict(rows)
 
     def __repr__(self) -> str:
         return f"PlayerPos(id={self.id}, name={self.player.name}, punktzahl={self.points}, partie={self.game.boardgame.name})"
@@ -179,12 +171,25 @@ class Location(db.Model):
 
 
 class Game(db.Model):
+    # Indizes für die häufigen Abfragen, geprüft mit `python -m bogan.db.query_plans`
+    __table_args__ = (
+        # neueste Partien (Startseite, Übersicht)
+        Index("ix_game_datum", "datum"),
+        # Partien eines Events (Ort und Zeitraum)
+        Index("ix_game_location_datum", "location_id", "datum"),
+        # Partien eines Brettspiels, nach Datum sortiert
+        Index("ix_game_boardgame_datum", "boardgame_id", "datum"),
+    )
+
     id: Mapped[int] = mapped_column(primary_key=True)
-    game_bgg_id: Mapped[int] = mapped_column(Integer)
+    # Id des Plays bei BGG, importierte Spiele haben eine negative Id (siehe bogan/db/importer.py)
+    game_bgg_id: Mapped[int] = mapped_column(BigInteger, unique=True)
     datum: Mapped[date] = mapped_column(Date, nullable=True)
     playtime: Mapped[int] = mapped_column(Integer, nullable=True)
     boardgame_id: Mapped[int] = mapped_column(ForeignKey("boardgame.id"))
     location_id: Mapped[int] = mapped_column(ForeignKey("location.id"))
+    # Hash über den normalisierten Inhalt des Plays bei BGG, unveränderte Plays werden im Sync übersprungen
+    digest: Mapped[str] = mapped_column(String(32), nullable=True)
     # Relationship
     boardgame: Mapped["Boardgame"] = relationship(back_populates="games")
     location: Mapped["Location"] = relationship(back_populates="games")
@@ -194,35 +199,12 @@ class Game(db.Model):
 
     def get_player_rankings(self) -> dict[str, int]:
         """
-        Berechnet die Rankings für alle Spieler in diesem Spiel.
-        
+        Liefert die Rankings für alle Spieler in diesem Spiel.
+
         Returns:
             Dictionary mit player_name -> position Mapping
         """
-        # Sortieren nach win (absteigend), dann nach points (absteigend)
-        sorted_positions = sorted(
-            self.player_pos,
-            key=lambda p: (p.win, p.points if p.points is not None else 0.0),
-            reverse=True
-        )
-        
-        # Rankings berechnen
-        rankings = {}
-        current_rank = 1
-        
-        for i, player_pos in enumerate(sorted_positions):
-            rankings[player_pos.player.name] = current_rank
-            
-            # Prüfen, ob der nächste Spieler eine andere Punktzahl hat
-            if i + 1 < len(sorted_positions):
-                current_player = (player_pos.win, player_pos.points)
-                next_player = (sorted_positions[i + 1].win, sorted_positions[i + 1].points)
-                
-                # Wenn sich die Werte unterscheiden, erhöhe den Rang für den nächsten Spieler
-                if current_player != next_player:
-                    current_rank = i + 2
-        
-        return rankings
+        return {player_pos.player.name: player_pos.position for player_pos in self.player_pos}
 
     def get_sorted_players(self) -> List[dict]:
         """
@@ -232,14 +214,12 @@ class Game(db.Model):
         Returns:
             Liste von Dictionaries mit player-Daten inklusive Position
         """
-        rankings = self.get_player_rankings()
-        
         players = []
         for player_pos in self.player_pos:
             players.append({
                 "name": player_pos.player.name,
                 "punkte": player_pos.points,
-                "position": rankings[player_pos.player.name],
+                "position": player_pos.position,
                 "win": player_pos.win
             })
         
@@ -302,6 +282,12 @@ class Boardgame(db.Model):
     koop: Mapped[bool] = mapped_column(Boolean, nullable=True, default=False)
     rating: Mapped[float] = mapped_column(Float)
     weight: Mapped[float] = mapped_column(Float)
+    # letzte Abfrage bei BGG: Metadaten (Name, Bilder, Jahr, Spieleranzahl, ...) und Stats (rating, weight)
+    fetched_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    stats_fetched_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    # lokaler Bildspiegel (bogan/db/images.py): gespiegelte URL und Dateien pro Variante als JSON
+    img_source: Mapped[str] = mapped_column(String(255), nullable=True)
+    img_files: Mapped[str] = mapped_column(Text, nullable=True)
     # Relationship
     games: Mapped[List["Game"]] = relationship(back_populates="boardgame", cascade="all, delete-orphan")
 
@@ -312,11 +298,28 @@ class Boardgame(db.Model):
             f"playtime = {self.playtime}, rating={self.rating}, weight= {self.weight}, koop={self.koop}"
         )
 
-    def update(self, other) -> bool:
+    def metadata_expired(self, max_age: timedelta, now: datetime = None) -> bool:
+        """Metadaten wurden noch nie oder vor mehr als max_age abgefragt"""
+        now = now or datetime.now()
+        return self.fetched_at is None or now - self.fetched_at > max_age
+
+    def stats_expired(self, max_age: timedelta, now: datetime = None) -> bool:
+        """Stats (rating, weight) wurden noch nie oder vor mehr als max_age abgefragt"""
+        now = now or datetime.now()
+        return self.stats_fetched_at is None or now - self.stats_fetched_at > max_age
+
+    def image_file(self, variant: str) -> Optional[str]:
+        """Dateiname der lokalen Bildvariante, None wenn das Bild (noch) nicht gespiegelt wurde"""
+        if not self.img_files:
+            return None
+        return json.loads(self.img_files).get(variant)
+
+    def update(self, other, stats_only: bool = False) -> bool:
         """Update Boardgame mit aktuellen Werten
 
         Args:
             other (boardgame): neues "Boardgame"-Objekt
+            stats_only (bool, optional): nur rating und weight übernehmen. Defaults to False.
 
         Raises:
             TypeError: ungültiges Objekt übergeben
@@ -328,6 +331,15 @@ class Boardgame(db.Model):
             raise TypeError("Update nicht möglich, es handelt sich um kein boardgame-model")
         changed = False
 
+        if self.rating != other.rating:
+            self.rating = other.rating
+            changed = True
+        if self.weight != other.weight:
+            self.weight = other.weight
+            changed = True
+        if stats_only:
+            return changed
+
         if self.bgg_id != other.bgg_id:
             self.bgg_id = other.bgg_id
             changed = True
@@ -352,12 +364,6 @@ class Boardgame(db.Model):
         if self.playtime != other.playtime:
             self.playtime = other.playtime
             changed = True
-        if self.rating != other.rating:
-            self.rating = other.rating
-            changed = True
-        if self.weight != other.weight:
-            self.weight = other.weight
-            changed = True
         if self.koop != other.koop:
             self.koop = other.koop
             changed = True
@@ -371,52 +377,227 @@ class Boardgame(db.Model):
             json_file (dict): JSON file from BGG
             name (tuple[str, bool], optional): (alternative name, is_primary_name). Defaults to None.
 
+        Raises:
+            SchemaError: json_file passt nicht zum Schema THING (z.B. Id oder Name fehlen)
+
         Returns:
             self: self with updated parameters
         """
-        ### Helper Functions ###
-
-        def create_names(name: tuple[str, bool]):
-            """
-            self.name and self.name_primary are calculated here
-
-            Args:
-                name (tuple[str,bool]): (alternative name, is_primary_name) or None
-
-            Returns:
-                tuple: (self.name, self.name_primary)
-            """
-            default_name = nested_get(json_file, ["name", 0, "@value"], str)
-            # if name not None
-            if name:
-                if name[1]:
-                    return (name[0], name[0])
-                else:
-                    return (name[0], default_name)
-            # both values get the primary name
-            else:
-                return (default_name, default_name)
-
-        def is_koop() -> bool:
-            koop = False
-            for link in json_file.get("link"):
-                if link.get("@value") == "Cooperative Game":
-                    koop = True
-            return koop
-
-        ########################
+        thing = THING.extract(json_file)
+
+        # Alternativer Name aus der Suche, sonst für beide der primäre Name
+        default_name = thing["name"]
+        if name:
+            self.name, self.name_primary = name[0], name[0] if name[1] else default_name
+        else:
+            self.name, self.name_primary = default_name, default_name
 
         # Add all data available in bgg
-        self.bgg_id = nested_get(json_file, ["@id"], int)
-        self.name, self.name_primary = create_names(name)
-        self.img = nested_get(json_file, ["image"], str)
-        self.img_small = nested_get(json_file, ["thumbnail"], str)
-        self.yearpublished = nested_get(json_file, ["yearpublished", "@value"], int)
-        self.minplayers = nested_get(json_file, ["minplayers", "@value"], int)
-        self.maxplayers = nested_get(json_file, ["maxplayers", "@value"], int)
-        self.playtime = nested_get(json_file, ["playingtime", "@value"], int)
-        self.rating = nested_get(json_file, ["statistics", "ratings", "average", "@value"], float)
-        self.weight = nested_get(json_file, ["statistics", "ratings", "averageweight", "@value"], float)
-        self.koop = is_koop()
+        self.bgg_id = thing["bgg_id"]
+        self.img = thing["img"]
+        self.img_small = thing["img_small"]
+        self.yearpublished = thing["yearpublished"]
+        self.minplayers = thing["minplayers"]
+        self.maxplayers = thing["maxplayers"]
+        self.playtime = thing["playtime"]
+        self.rating = thing["rating"]
+        self.weight = thing["weight"]
+        self.koop = any(link["value"] == "Cooperative Game" for link in thing["links"])
 
         return self
+
+
+class VoteSearch(db.Model):
+    """Letzte Suche eines Users im Abstimmungstool, aus ihren Treffern wird beim Hinzufügen das Spiel gewählt.
+
+    results: JSON-Liste von {"id", "name", "is_primary"} (siehe ask_bgg.search_results)
+    """
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("user.id", ondelete="CASCADE"), primary_key=True)
+    results: Mapped[str] = mapped_column(Text)
+    searched_at: Mapped[datetime] = mapped_column(DateTime)
+
+    def get_results(self) -> list[dict]:
+        return json.loads(self.results)
+
+    def set_results(self, results: list[dict]):
+        self.results = json.dumps(results)
+        self.searched_at = datetime.now()
+
+
+class SyncState(db.Model):
+    """Wasserzeichen der letzten erfolgreichen Synchronisation eines BGG-Users.
+    Wird für den inkrementellen Sync benötigt (BGG-Parameter `mindate`).
+
+    Während eines Syncs wird nach jedem Zwischencommit ein Checkpoint gespeichert (Art des Syncs, Seite,
+    letztes Spiel, Anzahl verarbeiteter Spiele, bisher neuestes Spiel). Ein abgebrochener Sync derselben Art
+    setzt dort fort und übernimmt das neueste Spiel für das Wasserzeichen.
+    """
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    bgg_user: Mapped[str] = mapped_column(String(128), unique=True)
+    last_play_date: Mapped[date] = mapped_column(Date, nullable=True)
+    last_play_id: Mapped[int] = mapped_column(Integer, nullable=True)
+    synced_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    checkpoint_kind: Mapped[str] = mapped_column(String(32), nullable=True)
+    checkpoint_mindate: Mapped[date] = mapped_column(Date, nullable=True)
+    checkpoint_page: Mapped[int] = mapped_column(Integer, nullable=True)
+    checkpoint_play_id: Mapped[int] = mapped_column(Integer, nullable=True)
+    checkpoint_plays: Mapped[int] = mapped_column(Integer, nullable=True)
+    checkpoint_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    checkpoint_newest_date: Mapped[date] = mapped_column(Date, nullable=True)
+    checkpoint_newest_id: Mapped[int] = mapped_column(Integer, nullable=True)
+
+    def set_checkpoint(
+        self,
+        kind: str,
+        mindate: Optional[date],
+        page: int,
+        play_id: Optional[int],
+        plays: int,
+        newest: tuple[Optional[date], Optional[int]] = (None, None),
+    ):
+        self.checkpoint_kind = kind
+        self.checkpoint_mindate = mindate
+        self.checkpoint_page = page
+        self.checkpoint_play_id = play_id
+        self.checkpoint_plays = plays
+        self.checkpoint_newest_date, self.checkpoint_newest_id = newest
+        self.checkpoint_at = datetime.now()
+
+    def checkpoint_newest(self) -> tuple[Optional[date], Optional[int]]:
+        """Neuestes Spiel (Datum, ID) bis zum Checkpoint, ohne Angabe das Wasserzeichen des letzten Syncs"""
+        if self.checkpoint_newest_date is None:
+            return self.last_play_date, self.last_play_id
+        return self.checkpoint_newest_date, self.checkpoint_newest_id
+
+    def clear_checkpoint(self):
+        self.checkpoint_kind = None
+        self.checkpoint_mindate = None
+        self.checkpoint_page = None
+        self.checkpoint_play_id = None
+        self.checkpoint_plays = None
+        self.checkpoint_newest_date = None
+        self.checkpoint_newest_id = None
+        self.checkpoint_at = None
+
+    def __repr__(self) -> str:
+        return (
+            f"SyncState(bgg_user={self.bgg_user}, last_play_date={self.last_play_date}, "
+            f"last_play_id={self.last_play_id}, synced_at={self.synced_at}, checkpoint_kind={self.checkpoint_kind}, "
+            f"checkpoint_page={self.checkpoint_page}, checkpoint_plays={self.checkpoint_plays})"
+        )
+
+
+class SyncJob(db.Model):
+    """Hintergrund-Job (z.B. Sync mit BGG), wird vom Worker (`python -m bogan.jobs`) abgearbeitet.
+
+    status: queued -> running -> done | failed
+    Laufende Jobs setzen `running_lock`. Die Spalte ist eindeutig, daher kann immer nur ein Job gleichzeitig laufen.
+    """
+
+    __tablename__ = "sync_job"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    kind: Mapped[str] = mapped_column(String(32))
+    status: Mapped[str] = mapped_column(String(16), default="queued", index=True)
+    running_lock: Mapped[str] = mapped_column(String(32), unique=True, nullable=True)
+    requested_by: Mapped[str] = mapped_column(String(128), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime)
+    started_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    heartbeat_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    progress: Mapped[int] = mapped_column(Integer, default=0)
+    message: Mapped[str] = mapped_column(String(255), nullable=True)
+    error: Mapped[str] = mapped_column(Text, nullable=True)
+
+    def as_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "requested_by": self.requested_by,
+            "created_at": self.created_at.isoformat(timespec="seconds") if self.created_at else None,
+            "started_at": self.started_at.isoformat(timespec="seconds") if self.started_at else None,
+            "finished_at": self.finished_at.isoformat(timespec="seconds") if self.finished_at else None,
+            "progress": self.progress,
+            "message": self.message,
+            "error": self.error,
+        }
+
+    def __repr__(self) -> str:
+        return f"SyncJob(id={self.id}, kind={self.kind}, status={self.status}, progress={self.progress})"
+
+
+class SyncRun(db.Model):
+    """Messwerte eines Sync-Laufs: Laufzeit pro Phase (in Sekunden), BGG-Calls und geänderte Zeilen"""
+
+    __tablename__ = "sync_run"
+
+    # Phasen des Syncs, die Laufzeit steht in der Spalte t_<phase>
+    PHASES = ("fetch_plays", "fetch_boardgames", "locations", "games", "delete", "commit")
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    kind: Mapped[str] = mapped_column(String(32))
+    status: Mapped[str] = mapped_column(String(16))
+    started_at: Mapped[datetime] = mapped_column(DateTime, index=True)
+    finished_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    duration: Mapped[float] = mapped_column(Float, default=0.0)
+    plays: Mapped[int] = mapped_column(Integer, default=0)
+    # Laufzeit pro Phase
+    t_fetch_plays: Mapped[float] = mapped_column(Float, default=0.0)
+    t_fetch_boardgames: Mapped[float] = mapped_column(Float, default=0.0)
+    t_locations: Mapped[float] = mapped_column(Float, default=0.0)
+    t_games: Mapped[float] = mapped_column(Float, default=0.0)
+    t_delete: Mapped[float] = mapped_column(Float, default=0.0)
+    t_commit: Mapped[float] = mapped_column(Float, default=0.0)
+    # BGG API
+    bgg_calls: Mapped[int] = mapped_column(Integer, default=0)
+    bgg_retries: Mapped[int] = mapped_column(Integer, default=0)
+    bgg_bytes: Mapped[int] = mapped_column(Integer, default=0)
+    # Zeilen (Game, PlayerPos, Boardgame, ...)
+    rows_inserted: Mapped[int] = mapped_column(Integer, default=0)
+    rows_updated: Mapped[int] = mapped_column(Integer, default=0)
+    rows_deleted: Mapped[int] = mapped_column(Integer, default=0)
+    rows_unchanged: Mapped[int] = mapped_column(Integer, default=0)
+    # alle Zähler als JSON, z.B. {"game_inserted": 3, "player_pos_updated": 1}
+    counts: Mapped[str] = mapped_column(Text, nullable=True)
+    error: Mapped[str] = mapped_column(Text, nullable=True)
+
+    def phase_durations(self) -> dict[str, float]:
+        return {phase: getattr(self, f"t_{phase}") or 0.0 for phase in self.PHASES}
+
+    def __repr__(self) -> str:
+        return f"SyncRun(id={self.id}, kind={self.kind}, status={self.status}, duration={self.duration})"
+
+
+@event.listens_for(Session, "before_flush")
+def _update_positions(session: Session, flush_context, instances):
+    """
+    Berechnet die Platzierungen der Partien neu, deren PlayerPos über das ORM angelegt, geändert oder gelöscht
+    wurden (z.B. manuelle Eingabe). Der Sync schreibt per Bulk Upsert und setzt die Platzierungen selbst.
+
+    """
+    changed = [
+        obj for obj in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(obj, PlayerPos)
+        and (obj in session.new or obj in session.deleted or session.is_modified(obj, include_collections=False))
+    ]
+    if not changed:
+        return
+
+    deleted = {obj for obj in session.deleted if isinstance(obj, PlayerPos)}
+    with session.no_autoflush:
+        # geänderte PlayerPos pro Partie
+        games = {}
+        for player_pos in changed:
+            game = player_pos.game
+            if game is None and player_pos.game_id is not None:
+                game = session.get(Game, player_pos.game_id)
+            if game is not None:
+                games.setdefault(id(game), (game, []))[1].append(player_pos)
+        for game, rows in games.values():
+            # nur mit game_id angelegte PlayerPos fehlen in einer bereits geladenen Collection game.player_pos
+            siblings = list(game.player_pos)
+            siblings += [player_pos for player_pos in rows if player_pos not in siblings]
+            PlayerPos.assign_positions([player_pos for player_pos in siblings if player_pos not in deleted])
@@ -0,0 +1,141 @@
+"""
+Pipeline mit begrenzten Queues
+
+Jede Stufe läuft in einem eigenen Thread und reicht ihre Ergebnisse über eine Queue mit fester Größe
+an die nächste Stufe weiter. Ist eine Queue voll, wartet die vorherige Stufe (Backpressure), der
+Speicherbedarf bleibt so begrenzt. Die letzte Stufe läuft im aufrufenden Thread (`results`).
+
+Tritt in einer Stufe ein Fehler auf, verarbeiten die folgenden Stufen noch die bereits fertigen Elemente,
+danach wird der Fehler in `results` erneut ausgelöst. Beim Verlassen des with-Blocks werden alle Threads
+beendet, auch wenn die letzte Stufe selbst einen Fehler auslöst.
+"""
+
+import queue
+import threading
+from typing import Any, Callable, Iterable, Iterator
+
+from bogan.utils import Logger
+
+# Add Logging
+logger = Logger().setup_logger(__file__)
+
+# Ende einer Queue
+_DONE = object()
+
+
+class PipelineStopped(Exception):
+    """Die Pipeline wurde angehalten (with-Block verlassen)"""
+
+
+class Pipeline:
+    """Stufen in eigenen Threads, verbunden über begrenzte Queues
+
+    Beispiel:
+        with Pipeline(maxsize=2) as pipeline:
+            pages = pipeline.source("fetch", iter_pages())
+            batches = pipeline.stage("prepare", prepare, pages)
+            for batch in pipeline.results(batches):
+                write(batch)
+    """
+
+    # Sekunden, nach denen blockierte Stufen prüfen, ob die Pipeline angehalten wurde
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, maxsize: int = 2):
+        self.maxsize = maxsize
+        self.stop_event = threading.Event()
+        self.error: BaseException = None
+        self._threads: list[threading.Thread] = []
+
+    def __enter__(self) -> "Pipeline":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def source(self, name: str, iterable: Iterable) -> queue.Queue:
+        """Erste Stufe: liest iterable in einem eigenen Thread und gibt die Queue der Elemente zurück"""
+        outbox = queue.Queue(maxsize=self.maxsize)
+        self._start(name, outbox, self._run_source, iterable)
+        return outbox
+
+    def stage(self, name: str, func: Callable[[Any], Any], inbox: queue.Queue) -> queue.Queue:
+        """Weitere Stufe: wendet func in einem eigenen Thread auf jedes Element aus inbox an"""
+        outbox = queue.Queue(maxsize=self.maxsize)
+        self._start(name, outbox, self._run_stage, func, inbox)
+        return outbox
+
+    def results(self, inbox: queue.Queue) -> Iterator:
+        """Letzte Stufe im aufrufenden Thread, löst den Fehler einer anderen Stufe erneut aus"""
+        while True:
+            item = self._get(inbox)
+            if item is _DONE:
+                break
+            yield item
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        """Hält alle Stufen an und wartet auf ihre Threads"""
+        self.stop_event.set()
+        for thread in self._threads:
+            thread.join()
+
+    def _start(self, name: str, outbox: queue.Queue, target: Callable, *args):
+        thread = threading.Thread(
+            target=self._guard, args=(name, outbox, target, *args), name=f"pipeline-{name}", daemon=True
+        )
+        self._threads.append(thread)
+        thread.start()
+
+    def _guard(self, name: str, outbox: queue.Queue, target: Callable, *args):
+        try:
+            target(outbox, *args)
+        except PipelineStopped:
+            return
+        except BaseException as e:
+            logger.error(f"[Pipeline] Stufe {name} abgebrochen: {type(e).__name__}: {e}")
+            if self.error is None:
+                self.error = e
+        # Ende weitergeben, auch nach einem Fehler: die folgenden Stufen arbeiten die fertigen Elemente ab
+        try:
+            self._put(outbox, _DONE)
+        except PipelineStopped:
+            pass
+
+    def _run_source(self, outbox: queue.Queue, iterable: Iterable):
+        iterator = iter(iterable)
+        try:
+            for item in iterator:
+                self._put(outbox, item)
+        finally:
+            # Generatoren schließen, damit z.B. ihre Thread-Pools beendet werden
+            close = getattr(iterator, "close", None)
+            if close:
+                close()
+
+    def _run_stage(self, outbox: queue.Queue, func: Callable[[Any], Any], inbox: queue.Queue):
+        while True:
+            item = self._get(inbox)
+            if item is _DONE:
+                return
+            self._put(outbox, func(item))
+
+    def _put(self, outbox: queue.Queue, item: Any):
+        while True:
+            if self.stop_event.is_set():
+                raise PipelineStopped()
+            try:
+                outbox.put(item, timeout=self.POLL_INTERVAL)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, inbox: queue.Queue) -> Any:
+        while True:
+            if self.stop_event.is_set():
+                raise PipelineStopped()
+            try:
+                return inbox.get(timeout=self.POLL_INTERVAL)
+            except queue.Empty:
+                continue
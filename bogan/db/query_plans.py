@@ -0,0 +1,246 @@
+"""
+Prüfung der Query-Pläne für die häufigen Abfragen
+
+Führt jede Abfrage aus HOT_QUERIES über dieselben Funktionen aus, die auch die Routen und der Sync verwenden
+(fetch_db.select_*, get_games_by, get_player_stats, SyncIdentityMap, ...), und zeichnet dabei alle Statements auf,
+auch die der Ladeoptionen (z.B. selectinload für die Spieler). Für jedes Statement wird mit seinen Parametern ein
+EXPLAIN ausgeführt (SQLite: EXPLAIN QUERY PLAN, MySQL: EXPLAIN).
+
+Gemeldet wird jeder Full Scan der Tabellen mit Indizes für diese Abfragen (CHECKED_TABLES):
+  - SQLite: SCAN der Tabelle, MySQL: type ALL
+  - Lesen über einen ganzen Index (SQLite: SCAN ... USING INDEX, MySQL: type index), außer die Abfrage gibt die
+    Zeilen in der Reihenfolge des Index aus (index_scan, z.B. die neuesten Partien nach Datum)
+So fällt auf, wenn ein Index fehlt oder eine geänderte Abfrage ihn nicht mehr nutzen kann.
+
+Die Abfragen werden mit Werten aus der Datenbank ausgeführt (sample_values), die Statements der Ladeoptionen
+entstehen nur, wenn es passende Zeilen gibt. Bei MySQL wählt der Optimizer anhand der Datenmenge, auf fast leeren
+Tabellen ist ein Full Scan günstiger: geprüft wird deshalb mit einer Datenbank mit realistischen Daten.
+
+Verwendung:
+    uv run python -m bogan.db.query_plans
+    uv run python -m bogan.db.query_plans --url sqlite:///instance/bogan.db
+"""
+
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Callable, Iterator
+
+from sqlalchemy import event, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from bogan.db.models import Boardgame, Game, Location, Player
+from bogan.db.update_db import SyncIdentityMap, select_bgg_games
+from bogan.main.lib.fetch_db import get_games_by, select_event_games, select_game, select_latest_games
+from bogan.main.lib.player_stats import get_games_by_player, get_player_stats
+from bogan.utils import Logger, get_db_engine
+
+# Add Logging
+logger = Logger().setup_logger(__file__)
+
+# Tabellen mit Indizes für die häufigen Abfragen, ein Full Scan ist hier ein Fehler
+CHECKED_TABLES = ("game", "player_pos")
+# Zeile im Plan von SQLite, die eine Tabelle komplett liest, z.B. "SCAN game" oder "SCAN game USING INDEX ix_..."
+SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(.*)$")
+# Alias einer Tabelle in Joins der Ladeoptionen, z.B. player_pos_1
+TABLE_ALIAS = re.compile(r"_\d+$")
+
+
+@dataclass(frozen=True)
+class HotQuery:
+    """Häufige Abfrage
+
+    Args:
+        name (str): Name in der Ausgabe
+        source (str): wo die Abfrage verwendet wird
+        run (Callable): führt die Abfrage mit (session, sample_values) so aus wie die Route bzw. der Sync
+        index_scan (tuple, optional): Tabellen, die in der Reihenfolge eines Index gelesen werden dürfen
+            (sortierte Ausgabe, bei LIMIT nur die ersten Zeilen). Defaults to ().
+    """
+
+    name: str
+    source: str
+    run: Callable[[Session, dict], Any]
+    index_scan: tuple[str, ...] = ()
+
+
+HOT_QUERIES = [
+    HotQuery(
+        "latest_games",
+        "main.index",
+        lambda session, sample: session.scalars(select_latest_games(limit=10)).all(),
+        index_scan=("game",),
+    ),
+    HotQuery(
+        "all_games",
+        "main.show_all_games",
+        lambda session, sample: session.scalars(select_latest_games()).all(),
+        index_scan=("game",),
+    ),
+    HotQuery(
+        "boardgame_games",
+        "main.boardgame_stats (fetch_db.get_games_by)",
+        lambda session, sample: get_games_by(sample["bgg_id"], session),
+    ),
+    HotQuery(
+        "event_games",
+        "event_analysis.get_game_list",
+        lambda session, sample: session.scalars(
+            select_event_games(sample["datum"], sample["datum"] + timedelta(days=2), sample["location"])
+        ).all(),
+    ),
+    HotQuery(
+        "player_games",
+        "main.player_detail (player_stats.get_player_stats)",
+        lambda session, sample: get_player_stats(sample["player"], session),
+    ),
+    HotQuery(
+        "games_by_player",
+        "main.players (player_stats.get_games_by_player)",
+        lambda session, sample: get_games_by_player(session),
+        index_scan=("game",),
+    ),
+    HotQuery(
+        "game_detail",
+        "main.game_detail",
+        lambda session, sample: session.scalars(select_game(sample["game_id"])).first(),
+    ),
+    HotQuery(
+        "sync_games",
+        "update_db.SyncIdentityMap.load_games",
+        # abweichender Digest: lädt Games und ihre PlayerPos
+        lambda session, sample: SyncIdentityMap(session).load_games({sample["game_bgg_id"]: ""}),
+    ),
+    HotQuery(
+        "sync_missing_games",
+        "update_db.delete_missing_games",
+        lambda session, sample: session.execute(select_bgg_games()).all(),
+    ),
+]
+
+
+def sample_values(session: Session) -> dict:
+    """Werte für die Parameter der Abfragen aus der Datenbank (Platzhalter, wenn die Tabellen leer sind)"""
+
+    def first(column, default):
+        value = session.scalars(select(column).order_by(column).limit(1)).first()
+        return default if value is None else value
+
+    return {
+        "bgg_id": first(Boardgame.bgg_id, 13),
+        "player": first(Player.name, "Anna"),
+        "location": first(Location.name, "Cafe"),
+        "datum": first(Game.datum, date(2024, 1, 1)),
+        "game_id": first(Game.id, 1),
+        "game_bgg_id": first(Game.game_bgg_id, 1),
+    }
+
+
+@contextmanager
+def record_statements(connection: Connection) -> Iterator[list[tuple[str, Any]]]:
+    """Zeichnet alle Statements (SQL und Parameter) auf, die über die Verbindung ausgeführt werden"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            statements.append((statement, parameters))
+
+    event.listen(connection, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(connection, "before_cursor_execute", record)
+
+
+def query_statements(connection: Connection, query: HotQuery, sample: dict = None) -> list[tuple[str, Any]]:
+    """Führt die Abfrage aus und gibt alle dabei ausgeführten Statements zurück (ohne etwas zu ändern)"""
+    with Session(bind=connection) as session:
+        sample = sample if sample is not None else sample_values(session)
+        with record_statements(connection) as statements:
+            query.run(session, sample)
+        session.rollback()
+    return statements
+
+
+def explain(connection: Connection, statement: str, parameters: Any = None) -> list[dict]:
+    """Plan des Statements, eine Zeile pro Schritt (SQLite: detail, MySQL: Spalten von EXPLAIN)
+
+    Raises:
+        NotImplementedError: Datenbank wird nicht unterstützt
+    """
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters or ())
+        return [{"detail": row[3]} for row in rows]
+    if dialect == "mysql":
+        return [dict(row) for row in connection.exec_driver_sql(f"EXPLAIN {statement}", parameters or ()).mappings()]
+    raise NotImplementedError(f"EXPLAIN für {dialect} wird nicht unterstützt")
+
+
+def plan_text(plan: list[dict]) -> str:
+    return "; ".join(
+        row["detail"] if "detail" in row else
+        f"{row['table']}: type={row['type']} possible_keys={row['possible_keys']} key={row['key']} "
+        f"rows={row['rows']} extra={row['Extra']}"
+        for row in plan
+    )
+
+
+def full_scans(plan: list[dict], index_scan: tuple[str, ...] = ()) -> list[str]:
+    """Tabellen aus CHECKED_TABLES, die vollständig gelesen werden: ohne Index oder über einen Index, ohne in
+    index_scan zu stehen"""
+    tables = []
+    for row in plan:
+        if "detail" in row:
+            match = SQLITE_SCAN.match(row["detail"])
+            if not match:
+                continue
+            table, by_index = match.group(1), "INDEX" in match.group(2)
+        elif row["type"] in ("ALL", "index"):
+            table, by_index = row["table"], row["type"] == "index"
+        else:
+            continue
+        table = TABLE_ALIAS.sub("", table)
+        if table in CHECKED_TABLES and (not by_index or table not in index_scan):
+            tables.append(table)
+    return tables
+
+
+def check_query_plans(engine: Engine = None, queries: list[HotQuery] = None) -> dict[str, list[str]]:
+    """Prüft die Pläne aller Statements der Abfragen, gibt für Abfragen mit Full Scan die betroffenen Tabellen zurück"""
+    engine = engine or get_db_engine()
+    problems = {}
+    with engine.connect() as connection:
+        with Session(bind=connection) as session:
+            sample = sample_values(session)
+        for query in queries or HOT_QUERIES:
+            for statement, parameters in query_statements(connection, query, sample):
+                plan = explain(connection, statement, parameters)
+                scans = full_scans(plan, query.index_scan)
+                if scans:
+                    problems.setdefault(query.name, []).extend(scans)
+                    logger.warning(
+                        f"[QueryPlan] {query.name} ({query.source}): Full Scan auf {scans}, Plan: {plan_text(plan)}"
+                    )
+                else:
+                    logger.info(f"[QueryPlan] {query.name}: {plan_text(plan)}")
+    return problems
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    from sqlalchemy import create_engine
+
+    parser = argparse.ArgumentParser(description="Prüft die Query-Pläne der häufigen Abfragen (EXPLAIN)")
+    parser.add_argument("--url", help="Datenbank-URL, Standard: DB2USE")
+    args = parser.parse_args()
+
+    found = check_query_plans(create_engine(args.url) if args.url else None)
+    if found:
+        print(f"{len(found)} von {len(HOT_QUERIES)} Abfragen ohne passenden Index: {', '.join(found)}")
+        sys.exit(1)
+    print(f"alle {len(HOT_QUERIES)} Abfragen nutzen einen Index")
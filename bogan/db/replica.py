@@ -0,0 +1,66 @@
+"""
+Lesezugriffe über eine Read-Replica
+
+Ist DB2USE_REPLICA gesetzt (DB_REPLICA_URL), lesen Routen mit @use_replica über db.session von der Replica.
+Alles andere bleibt auf DB2USE:
+  - Schreibzugriffe: Flush der Session sowie INSERT/UPDATE/DELETE, auch innerhalb einer Route mit @use_replica.
+    Danach liest auch der restliche Request von DB2USE.
+  - Routen ohne @use_replica (Profil, Login, Admin, Tools) und alle Sessions mit eigener Engine (Sync, Jobs)
+
+Read your own writes: nach einem Request, der etwas ändern kann (POST, PUT, PATCH, DELETE), lesen die nächsten
+Requests desselben Browsers DB_READ_YOUR_WRITES Sekunden lang auch mit @use_replica von DB2USE. So sind eigene
+Änderungen sofort sichtbar, auch wenn die Replica sie noch nicht hat. Der Zeitpunkt steht in der Flask-Session.
+"""
+
+from functools import wraps
+from time import time
+
+from flask import Flask, Response, g, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+import bogan.config as cfg
+from bogan.utils import get_db_engine
+
+# Schlüssel in der Flask-Session: bis zu diesem Zeitpunkt (Unix-Zeit) wird nicht von der Replica gelesen
+PRIMARY_UNTIL_KEY = "db_primary_until"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def reads_from_replica() -> bool:
+    """True, wenn der aktuelle Request von der Replica lesen darf (siehe use_replica)"""
+    return has_request_context() and g.get("db_read_replica", False)
+
+
+def use_replica(view):
+    """Route liest über db.session von der Replica, sofern eine konfiguriert ist und kein eigener Schreibzugriff
+    innerhalb von DB_READ_YOUR_WRITES Sekunden erfolgt ist"""
+
+    @wraps(view)
+    def decorated_view(*args, **kwargs):
+        g.db_read_replica = cfg.DB2USE_REPLICA is not None and session.get(PRIMARY_UNTIL_KEY, 0) <= time()
+        return view(*args, **kwargs)
+
+    return decorated_view
+
+
+class ReplicaSession(Session):
+    """Session für db.session, wählt für Lesezugriffe in Routen mit @use_replica die Engine der Replica"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and reads_from_replica():
+            if not self._flushing and not isinstance(clause, UpdateBase):
+                return get_db_engine(cfg.DB2USE_REPLICA)
+            # nach einem Schreibzugriff liest der restliche Request von DB2USE, sonst fehlt die eigene Änderung
+            g.db_read_replica = False
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def init_read_your_writes(app: Flask):
+    """Merkt sich nach ändernden Requests in der Flask-Session, dass vorerst nicht von der Replica gelesen wird"""
+
+    @app.after_request
+    def remember_write(response: Response) -> Response:
+        if cfg.DB2USE_REPLICA and cfg.DB_READ_YOUR_WRITES and request.method not in SAFE_METHODS:
+            session[PRIMARY_UNTIL_KEY] = time() + cfg.DB_READ_YOUR_WRITES
+        return response
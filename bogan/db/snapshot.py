@@ -0,0 +1,222 @@
+"""
+Snapshots der Spiele im Format der BGG-API als gzip-komprimiertes NDJSON
+
+Ein Snapshot besteht aus Segmenten, jedes Segment ist ein eigener gzip-Member: eine Kopfzeile (SnapshotHeader)
+und danach ein Spiel pro Zeile. Ein vollständiger Sync schreibt den Snapshot neu (Segment "full"), ein
+inkrementeller Sync hängt seine Spiele als Segment "delta" an. Beim Lesen wird nur die neueste Version eines
+Spiels geliefert, d.h. Spiele aus älteren Segmenten werden übersprungen, wenn ein späteres Delta sie enthält.
+
+Geschrieben und gelesen wird als Stream, die Spieleliste wird nie komplett im Speicher gehalten. Ein neues Segment
+wird erst in eine temporäre Datei geschrieben und am Ende atomar übernommen, ein abgebrochener Sync hinterlässt
+daher keinen halben Snapshot.
+
+Verwendung:
+    uv run python -m bogan.db.snapshot info
+    uv run python -m bogan.db.snapshot compact
+    uv run python -m bogan.db.snapshot convert data/example/example_plays.json
+"""
+
+import gzip
+import json
+import os
+import shutil
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from bogan.config import ENCODING, GAME_USER, SNAPSHOT_COMPRESSLEVEL, SNAPSHOT_PATH
+from bogan.utils import Logger
+
+# Add Logging
+logger = Logger().setup_logger(__file__)
+
+SNAPSHOT_VERSION = 1
+# Kopfzeilen beginnen immer mit diesem Schlüssel, Spiele mit "@id"
+HEADER_PREFIX = '{"@snapshot":'
+
+
+@dataclass
+class SnapshotHeader:
+    """Kopfzeile eines Segments
+
+    Args:
+        kind (str): "full" (vollständige Liste) oder "delta" (angehängte Spiele eines inkrementellen Syncs)
+        user (str): BGG-User, dessen Spiele gespeichert sind
+        fetched_at (str): Zeitpunkt der Abfrage bei BGG (ISO)
+        count (int): Anzahl Spiele im Segment
+        mindate (str, optional): Startdatum der Abfrage (nur delta). Defaults to None.
+    """
+
+    kind: str
+    user: str
+    fetched_at: str
+    count: int
+    mindate: Optional[str] = None
+
+    def to_line(self) -> str:
+        return json.dumps({"@snapshot": SNAPSHOT_VERSION, **asdict(self)}, ensure_ascii=False) + "\n"
+
+    @classmethod
+    def from_line(cls, line: str) -> "SnapshotHeader":
+        """
+        Raises:
+            ValueError: unbekannte Version des Snapshots
+        """
+        data = json.loads(line)
+        version = data.pop("@snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Snapshot-Version {version} wird nicht unterstützt (erwartet {SNAPSHOT_VERSION})")
+        return cls(**data)
+
+
+def is_header(line: str) -> bool:
+    return line.startswith(HEADER_PREFIX)
+
+
+def open_snapshot(path: str):
+    """Öffnet den Snapshot als Text, alle Segmente (gzip-Member) werden nacheinander gelesen"""
+    return gzip.open(path, "rt", encoding=ENCODING)
+
+
+def read_headers(path: str = SNAPSHOT_PATH) -> list[SnapshotHeader]:
+    """Kopfzeilen aller Segmente in der Reihenfolge der Datei"""
+    with open_snapshot(path) as file:
+        return [SnapshotHeader.from_line(line) for line in file if is_header(line)]
+
+
+def _latest_segments(path: str) -> dict[str, int]:
+    """Spiel-Id -> Index des letzten Segments, das das Spiel enthält (nur Spiele aus Deltas)"""
+    latest = {}
+    segment = -1
+    with open_snapshot(path) as file:
+        for line in file:
+            if is_header(line):
+                segment += 1
+            elif segment > 0:
+                latest[json.loads(line).get("@id")] = segment
+    return latest
+
+
+def read_snapshot(path: str = SNAPSHOT_PATH) -> Iterator[dict]:
+    """
+    Liefert alle Spiele des Snapshots, von Spielen in mehreren Segmenten nur die neueste Version.
+    Die Datei wird zweimal gelesen: zuerst werden die Ids der Deltas gesammelt, danach die Spiele geliefert.
+
+    Raises:
+        ValueError: Datei ist kein Snapshot (keine Kopfzeile am Anfang)
+    """
+    latest = _latest_segments(path)
+    segment = -1
+    header = None
+    count = 0
+    with open_snapshot(path) as file:
+        for line in file:
+            if is_header(line):
+                _check_count(header, count)
+                header = SnapshotHeader.from_line(line)
+                segment += 1
+                count = 0
+                continue
+            if header is None:
+                raise ValueError(f"{path} ist kein Snapshot, die erste Zeile ist keine Kopfzeile")
+            count += 1
+            my_game = json.loads(line)
+            if latest.get(my_game.get("@id"), segment) > segment:
+                continue
+            yield my_game
+    _check_count(header, count)
+
+
+def _check_count(header: Optional[SnapshotHeader], count: int):
+    if header is not None and header.count != count:
+        logger.warning(f"[Snapshot] Segment vom {header.fetched_at}: {count} statt {header.count} Spiele")
+
+
+def write_snapshot_stream(
+    my_games: Iterable[dict],
+    path: str = SNAPSHOT_PATH,
+    user: str = GAME_USER,
+    delta: bool = False,
+    mindate: str = None,
+) -> Iterator[dict]:
+    """
+    Reicht alle Spiele unverändert weiter und schreibt sie dabei als neues Segment in den Snapshot.
+    Ohne delta wird der Snapshot ersetzt, mit delta wird das Segment angehängt. Der Snapshot wird erst geändert,
+    wenn my_games vollständig gelesen wurde.
+
+    """
+    fetched_at = datetime.now().isoformat(timespec="seconds")
+    body_path = f"{path}.body"
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    count = 0
+    try:
+        with gzip.open(body_path, "wt", encoding=ENCODING, compresslevel=SNAPSHOT_COMPRESSLEVEL) as body:
+            for my_game in my_games:
+                body.write(json.dumps(my_game, ensure_ascii=False, separators=(",", ":")) + "\n")
+                count += 1
+                yield my_game
+
+        header = SnapshotHeader("delta" if delta else "full", user, fetched_at, count, mindate)
+        _write_segment(path, header, body_path, append=delta)
+        logger.info(f"[Snapshot] {count} Spiele als {header.kind} in {path} gespeichert")
+    finally:
+        if os.path.exists(body_path):
+            os.remove(body_path)
+
+
+def _write_segment(path: str, header: SnapshotHeader, body_path: str, append: bool):
+    """Schreibt Kopfzeile und Spiele (bereits komprimiert) als neues Segment, atomar über eine temporäre Datei"""
+    part_path = f"{path}.part"
+    with open(part_path, "wb") as part:
+        if append:
+            if os.path.exists(path):
+                with open(path, "rb") as existing:
+                    shutil.copyfileobj(existing, part)
+            else:
+                logger.warning(f"[Snapshot] {path} existiert nicht, Delta wird ohne vollständige Liste gespeichert")
+        part.write(gzip.compress(header.to_line().encode(ENCODING), compresslevel=SNAPSHOT_COMPRESSLEVEL))
+        with open(body_path, "rb") as body:
+            shutil.copyfileobj(body, part)
+    os.replace(part_path, path)
+
+
+def compact_snapshot(path: str = SNAPSHOT_PATH) -> int:
+    """Fasst alle Segmente zu einem vollständigen Segment zusammen (neueste Version jedes Spiels)"""
+    user = read_headers(path)[0].user
+    count = sum(1 for _ in write_snapshot_stream(read_snapshot(path), path, user))
+    logger.info(f"[Snapshot] {path} zusammengefasst: {count} Spiele")
+    return count
+
+
+def convert_json(json_path: str, path: str = SNAPSHOT_PATH, user: str = GAME_USER) -> int:
+    """Wandelt eine JSON-Spieleliste (älteres Format von `update_db(save_file=True)`) in einen Snapshot um"""
+    from bogan.db.importer import read_json_array
+
+    with open(json_path, "r", encoding=ENCODING) as file:
+        count = sum(1 for _ in write_snapshot_stream(read_json_array(file), path, user))
+    logger.info(f"[Snapshot] {json_path} umgewandelt: {count} Spiele in {path}")
+    return count
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Snapshots der Spiele (gzip-komprimiertes NDJSON)")
+    parser.add_argument("command", choices=["info", "compact", "convert"])
+    parser.add_argument("json_path", nargs="?", help="JSON-Spieleliste für convert")
+    parser.add_argument("--path", default=SNAPSHOT_PATH, help="Snapshot, Standard: SNAPSHOT_PATH")
+    args = parser.parse_args()
+
+    if args.command == "info":
+        for snapshot_header in read_headers(args.path):
+            print(snapshot_header)
+        print(f"{os.path.getsize(args.path) / 1024:.1f} KiB")
+    elif args.command == "compact":
+        compact_snapshot(args.path)
+    elif not args.json_path:
+        parser.error("convert benötigt den Pfad der JSON-Spieleliste")
+    else:
+        convert_json(args.json_path, args.path)
@@ -1,80 +1,418 @@
+import hashlib
 import json
+import os
+from collections import defaultdict
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Callable, Iterable, Iterator
+from time import perf_counter
+from sqlalchemy import Select, delete, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
-from datetime import datetime
-from bogan.config import ENCODING, GAME_USER
-from bogan.db.models import Base, Boardgame, Location, Game, Player, PlayerPos
-from bogan.db.ask_bgg import ask_boardgame, ask_games_from
-from bogan.utils import nested_get, get_db_engine, Logger
+from datetime import date, datetime, timedelta
+from bogan.config import (
+    BGG_PLAYS_PER_PAGE,
+    ENCODING,
+    GAME_USER,
+    IMAGE_MIRROR,
+    SNAPSHOT_PATH,
+    SYNC_BATCH_SIZE,
+    SYNC_BOARDGAME_METADATA_TTL_DAYS,
+    SYNC_BOARDGAME_STATS_TTL_DAYS,
+    SYNC_COMMIT_EVERY,
+    SYNC_PIPELINE_DEPTH,
+    SYNC_WRITE_BATCH_SIZE,
+)
+from bogan.db.models import (
+    Base, Boardgame, Location, Game, Player, PlayerPos, SyncRun, SyncState, finishing_positions
+)
+from bogan.db.ask_bgg import ask_boardgame, iter_plays
+from bogan.db.bgg_client import get_client
+from bogan.db.bgg_schema import PLAY, SchemaError
+from bogan.db.bulk import bulk_delete, bulk_upsert
+from bogan.db.images import mirror_images
+from bogan.db.pipeline import Pipeline
+from bogan.db.snapshot import read_snapshot, write_snapshot_stream
+from bogan.utils import get_db_engine, chunked, Logger, PhaseTimer, pool_metrics
 
 logger = Logger().setup_logger(__file__)
-engine = get_db_engine()
-logger.info(f"Datenbank URL {engine.url} wird verwendet")
 
-# Session anlegen
-session = Session(bind=engine)
+# Engine wird erst beim ersten Sync angelegt (init_engine), nicht beim Import.
+# Sessions gehören der jeweiligen Stufe des Syncs (Writer, prepare) und leben nur für einen Lauf.
+engine: Engine = None
 
-# Erstelle alle Felder der Datenbank (nur beim ersten Mal oder bei Änderungen)
-Base.metadata.create_all(engine)
 
+# Spalten, die im Sync für Game und PlayerPos verglichen und geschrieben werden
+GAME_COLUMNS = (
+    Game.id, Game.game_bgg_id, Game.datum, Game.playtime, Game.boardgame_id, Game.location_id, Game.digest
+)
+PLAYER_POS_COLUMNS = (
+    PlayerPos.id, PlayerPos.game_id, PlayerPos.player_id, PlayerPos.points, PlayerPos.win, PlayerPos.position
+)
+GAME_UPDATE_COLUMNS = ["datum", "playtime", "boardgame_id", "location_id", "digest"]
+PLAYER_POS_UPDATE_COLUMNS = ["points", "win", "position"]
+# JSON-Spieleliste älterer Versionen, wird im Offline-Sync gelesen, solange es keinen Snapshot gibt
+LEGACY_SAVE_PATH = "data/example/example_plays.json"
+# Art des Checkpoints beim Offline-Sync (Snapshot oder JSON), der Sync über die API nutzt die Art des Laufs
+CHECKPOINT_OFFLINE = "sync_offline"
 
-def get_boardgames(my_games: list[dict]) -> dict[int, Boardgame]:
+
+def select_games(game_bgg_ids: Iterable[int]) -> Select:
+    """Games (GAME_COLUMNS) mit den angegebenen game_bgg_ids"""
+    return select(*GAME_COLUMNS).where(Game.game_bgg_id.in_(game_bgg_ids))
+
+
+def select_player_pos(game_ids: Iterable[int]) -> Select:
+    """PlayerPos (PLAYER_POS_COLUMNS) der angegebenen Games"""
+    return select(*PLAYER_POS_COLUMNS).where(PlayerPos.game_id.in_(game_ids))
+
+
+def select_bgg_games() -> Select:
+    """Alle Games von BGG (GAME_COLUMNS), ohne importierte Games (negative game_bgg_id)"""
+    return select(*GAME_COLUMNS).where(Game.game_bgg_id > 0)
+
+
+class SyncIdentityMap:
     """
-    Aktualisiert alle Boardgames in der Datenbank anhand der gesammelten IDs aus my_games.
-    Gibt ein Dictionary zurück, das die bgg_id (int) auf das entsprechende Boardgame-Objekt mapped.
-    
+    Hält die für den Sync benötigten Datensätze im Speicher, damit pro Spiel keine Queries nötig sind.
+      - Boardgames (bgg_id), Players (name) und Locations (name) werden einmal komplett als ORM-Objekte geladen.
+      - Games (game_bgg_id) werden pro Batch mit einer IN-Query als einfache Zeilen (dict) geladen,
+        PlayerPos (game_id -> player_id) nur für Games, deren Digest sich geändert hat.
+        Geschrieben werden sie per Bulk Upsert.
+    Neue Objekte werden beim Anlegen direkt in die Maps eingetragen.
+    Die IdentityMap gehört zur Session des Writers, alle Schreibzugriffe laufen über `self.session`.
+
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+        self.boardgames: dict[int, Boardgame] = {bg.bgg_id: bg for bg in session.query(Boardgame)}
+        self.players: dict[str, Player] = {player.name: player for player in session.query(Player)}
+        self.locations: dict[str, Location] = {location.name: location for location in session.query(Location)}
+        self.games: dict[int, dict] = {}
+        self.fetched_boardgames: set[int] = set()
+        self.player_pos: dict[int, dict[int, dict]] = defaultdict(dict)
+        logger.debug(
+            f"[IdentityMap] geladen: {len(self.boardgames)} Boardgames, {len(self.players)} Player, "
+            f"{len(self.locations)} Locations"
+        )
+
+    def load_games(self, digests: dict[int, str]) -> set[int]:
+        """
+        Lädt Games für die angegebenen game_bgg_ids (sofern noch nicht geladen) und die PlayerPos der Games,
+        deren gespeicherter Digest vom aktuellen abweicht.
+
+        Args:
+            digests (dict[int, str]): game_bgg_id -> aktueller Digest des Plays
+
+        Returns:
+            set[int]: game_bgg_ids, deren Digest unverändert ist
+        """
+        missing = [g_id for g_id in digests if g_id and g_id not in self.games]
+        if missing:
+            games = self.session.execute(select_games(missing)).mappings()
+            for game in games:
+                self.games[game["game_bgg_id"]] = dict(game)
+
+        unchanged = set()
+        game_ids = []
+        for g_id in missing:
+            game = self.games.get(g_id)
+            if game is None:
+                continue
+            if game["digest"] == digests[g_id]:
+                unchanged.add(g_id)
+            else:
+                game_ids.append(game["id"])
+
+        if game_ids:
+            positions = self.session.execute(select_player_pos(game_ids)).mappings()
+            for pos in positions:
+                self.player_pos[pos["game_id"]][pos["player_id"]] = dict(pos)
+
+        return unchanged
+
+    def release_games(self):
+        """Gibt die Games des letzten Batches frei, damit der Speicherbedarf nicht mit der Historie wächst"""
+        self.games.clear()
+        self.player_pos.clear()
+
+
+@dataclass
+class SyncPlan:
+    """
+    Geplante Änderungen eines Batches, werden in apply_plan gesammelt per Bulk Upsert geschrieben.
+    PlayerPos neuer Games kennen die game_id noch nicht, sie werden über game_bgg_id zugeordnet.
+
+    """
+
+    games: list[dict] = field(default_factory=list)
+    player_pos: list[dict] = field(default_factory=list)
+    deleted_player_pos: list[int] = field(default_factory=list)
+    digests: dict[int, str] = field(default_factory=dict)
+    counts: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+
+class SyncTelemetry:
+    """
+    Sammelt die Messwerte eines Sync-Laufs (Laufzeit pro Phase, BGG-Calls, geänderte Zeilen)
+    und speichert sie am Ende als SyncRun.
+
+    """
+
+    def __init__(self, kind: str):
+        self.run = SyncRun(kind=kind, status="running", started_at=datetime.now(), plays=0)
+        self.timer = PhaseTimer()
+        self.counts: dict[str, int] = defaultdict(int)
+        self._t_start = perf_counter()
+        self._client_stats = self._bgg_stats()
+        self._pool_stats = self._pool_counts()
+
+    @staticmethod
+    def _bgg_stats() -> tuple[int, int, int]:
+        stats = get_client().stats
+        return stats.calls, stats.retries, stats.bytes
+
+    @staticmethod
+    def _pool_counts() -> dict[str, int]:
+        """Zähler des Connection-Pools der Sync-Engine (leer, wenn die Engine nicht aus get_db_engine stammt)"""
+        metrics = pool_metrics(engine) if engine is not None else None
+        return metrics.as_dict() if metrics else {}
+
+    def finish(self, error: str = None) -> SyncRun:
+        """Berechnet die Messwerte und speichert den Lauf (eigene Session, unabhängig vom Ergebnis des Syncs)"""
+        run = self.run
+        run.status = "failed" if error else "done"
+        run.error = error
+        run.finished_at = datetime.now()
+        run.duration = round(perf_counter() - self._t_start, 3)
+        for phase in SyncRun.PHASES:
+            setattr(run, f"t_{phase}", round(self.timer.durations.get(phase, 0.0), 3))
+
+        calls, retries, size = (now - before for now, before in zip(self._bgg_stats(), self._client_stats))
+        run.bgg_calls, run.bgg_retries, run.bgg_bytes = calls, retries, size
+
+        pool_now = self._pool_counts()
+        for key in ("checkouts", "connects", "invalidated"):
+            self.counts[f"pool_{key}"] = pool_now.get(key, 0) - self._pool_stats.get(key, 0)
+        self.counts["pool_max_checked_out"] = pool_now.get("max_checked_out", 0)
+
+        counts = {key: value for key, value in self.counts.items() if value}
+        run.rows_inserted = sum(value for key, value in counts.items() if key.endswith("_inserted"))
+        run.rows_updated = sum(value for key, value in counts.items() if key.endswith("_updated"))
+        run.rows_deleted = sum(value for key, value in counts.items() if key.endswith("_deleted"))
+        run.rows_unchanged = counts.get("game_unchanged", 0)
+        run.counts = json.dumps(counts, sort_keys=True)
+
+        try:
+            with Session(engine) as run_session:
+                run_session.add(run)
+                run_session.commit()
+                run_session.refresh(run)
+                run_session.expunge(run)
+        except SQLAlchemyError as e:
+            logger.error(f"[SyncRun] konnte nicht gespeichert werden: {e}")
+
+        logger.info(
+            f"[SyncRun] {run.kind} {run.status} in {run.duration}s, Phasen: {run.phase_durations()}, "
+            f"BGG: {run.bgg_calls} Calls / {run.bgg_retries} Retries / {run.bgg_bytes} Bytes"
+        )
+        return run
+
+
+def init_engine(db_engine: Engine = None) -> Engine:
+    """
+    Legt die Engine für den Sync an (einmal pro Prozess oder wenn db_engine übergeben wird)
+    und erstellt fehlende Tabellen.
+
+    """
+    global engine
+    if engine is None or db_engine is not None:
+        engine = db_engine or get_db_engine()
+        logger.info(f"Datenbank URL {engine.url} wird verwendet")
+
+        # Erstelle alle Felder der Datenbank (nur beim ersten Mal oder bei Änderungen)
+        Base.metadata.create_all(engine)
+
+    return engine
+
+
+@dataclass
+class BoardgameFetch:
+    """
+    Von BGG abgefragte Boardgames, werden anschließend in merge_boardgames übernommen.
+    Abfrage (Netzwerk) und Übernahme (Datenbank) sind getrennt, damit sie in verschiedenen Stufen laufen können.
+
+    """
+
+    boardgames: list[Boardgame] = field(default_factory=list)
+    stats_only: set[int] = field(default_factory=set)
+    fetched_at: datetime = field(default_factory=datetime.now)
+
+
+@dataclass
+class PreparedBatch:
+    """
+    Batch aus der prepare-Stufe: Spiele (nach Schema PLAY), Digest pro Spiel und die dafür abgefragten Boardgames.
+    size zählt alle Spiele des Batches, auch die, die nicht zum Schema passen (invalid_ids).
+
+    """
+
+    plays: list[dict]
+    digests: dict[int, str]
+    boardgames: BoardgameFetch
+    size: int = 0
+    invalid_ids: list[int] = field(default_factory=list)
+
+
+class BatchPreparer:
+    """
+    prepare-Stufe des Syncs: liest die Spiele über das Schema PLAY aus, berechnet die Digests und fragt neue oder
+    veraltete Boardgames bei BGG ab.
+    Der Stand der Boardgames wird zu Beginn über eine eigene Session geladen, danach braucht die Stufe
+    keine Datenbank mehr. Jedes Boardgame wird pro Lauf nur einmal geprüft.
+
+    """
+
+    def __init__(self, timer: PhaseTimer):
+        self.timer = timer
+        self.seen: set[int] = set()
+        with Session(engine) as prepare_session:
+            self.known: dict[int, Boardgame] = {bg.bgg_id: bg for bg in prepare_session.query(Boardgame)}
+            prepare_session.expunge_all()
+
+    def __call__(self, my_games: list[dict]) -> PreparedBatch:
+        with self.timer.phase("fetch_plays"):
+            plays, invalid_ids = extract_plays(my_games)
+            digests = {play["id"]: play_digest(play) for play in plays}
+        with self.timer.phase("fetch_boardgames"):
+            fetched = request_boardgames((play["bgg_id"] for play in plays), self.known, self.seen)
+        return PreparedBatch(plays, digests, fetched, len(my_games), invalid_ids)
+
+
+def extract_plays(my_games: Iterable[dict]) -> tuple[list[dict], list[int]]:
+    """
+    Liest die Spiele über das Schema PLAY aus. Spiele, die nicht zum Schema passen, werden gemeldet und übersprungen.
+    Ihre Ids werden zurückgegeben (sofern lesbar), damit sie beim vollständigen Sync nicht gelöscht werden.
+
     """
+    plays, invalid_ids = [], []
+    for my_game in my_games:
+        try:
+            plays.append(PLAY.extract(my_game))
+        except SchemaError as e:
+            logger.warning(f"[Sync] Spiel übersprungen, passt nicht zum Schema: {e}")
+            if str(e.record_id).isdigit():
+                invalid_ids.append(int(e.record_id))
+    return plays, invalid_ids
+
+
+def refresh_boardgames(bgg_ids: Iterable[int], idmap: SyncIdentityMap, counts: dict = None) -> dict[int, Boardgame]:
+    """
+    Aktualisiert die Boardgames mit den angegebenen bgg_ids (Abfrage und Übernahme nacheinander).
+    Boardgames, die in diesem Sync bereits geprüft wurden, werden nicht erneut geprüft.
+
+    """
+    fetched = request_boardgames(bgg_ids, idmap.boardgames, idmap.fetched_boardgames)
+    return merge_boardgames(fetched, idmap, counts)
+
+
+def request_boardgames(bgg_ids: Iterable[int], known: dict[int, Boardgame], seen: set[int]) -> BoardgameFetch:
+    """
+    Fragt die Boardgames mit den angegebenen bgg_ids bei BGG ab, ohne die Datenbank zu verwenden.
+    Bei BGG abgefragt werden nur:
+      - neue Boardgames (nicht in known)
+      - Boardgames, deren Metadaten oder Stats älter als die jeweilige TTL sind
+    Boardgames in seen werden übersprungen, alle geprüften Ids werden in seen eingetragen.
+
+    """
+    fetched = BoardgameFetch()
+    metadata_ttl = timedelta(days=SYNC_BOARDGAME_METADATA_TTL_DAYS)
+    stats_ttl = timedelta(days=SYNC_BOARDGAME_STATS_TTL_DAYS)
     ids = []
-    boardgames_dict = {}
 
     # IDs sammeln
-    for game in my_games:
-        bgg_id = nested_get(game, ["item", "@objectid"], int)
-        if bgg_id and bgg_id not in ids:
+    for bgg_id in bgg_ids:
+        if not bgg_id or bgg_id in ids or bgg_id in seen:
+            continue
+        seen.add(bgg_id)
+
+        boardgame_db = known.get(bgg_id)
+        if boardgame_db is None or boardgame_db.metadata_expired(metadata_ttl, fetched.fetched_at):
             ids.append(bgg_id)
+        elif boardgame_db.stats_expired(stats_ttl, fetched.fetched_at):
+            ids.append(bgg_id)
+            fetched.stats_only.add(bgg_id)
+        else:
+            logger.debug(f"[Boardgame] aktuell, keine Abfrage: {boardgame_db.name}, ID: {bgg_id}")
 
-    # Boardgames vom BGG abfragen (falls IDs vorhanden)
-    boardgames = ask_boardgame(ids) if ids else []
+    # Boardgames vom BGG abfragen (falls IDs vorhanden), bekannte Boardgames ohne Cache
+    refresh = [bgg_id for bgg_id in ids if bgg_id in known]
+    fetched.boardgames = ask_boardgame(ids, refresh=refresh) if ids else []
+    logger.debug(f"[Boardgame] {len(ids)} abgefragt, davon {len(fetched.stats_only)} nur Stats")
+
+    return fetched
+
+
+def merge_boardgames(fetched: BoardgameFetch, idmap: SyncIdentityMap, counts: dict = None) -> dict[int, Boardgame]:
+    """
+    Übernimmt abgefragte Boardgames in die Datenbank.
+    Neue und geänderte Boardgames werden in counts gezählt (boardgame_inserted, boardgame_updated).
+
+    """
+    counts = defaultdict(int) if counts is None else counts
+    now = fetched.fetched_at
 
     # Update oder Neueintrag
-    for boardgame in boardgames:
-        boardgame_db = session.query(Boardgame).filter_by(bgg_id=boardgame.bgg_id).first()
+    for boardgame in fetched.boardgames:
+        boardgame_db = idmap.boardgames.get(boardgame.bgg_id)
         if boardgame_db:
             # Felder vergleichen und ggf. updaten
-            if boardgame_db.update(boardgame):
+            stats_only = boardgame.bgg_id in fetched.stats_only
+            if boardgame_db.update(boardgame, stats_only=stats_only):
+                counts["boardgame_updated"] += 1
                 logger.info(f"[Boardgame] aktualisiert: {boardgame_db.name}, ID: {boardgame_db.bgg_id}")
             else:
                 logger.debug(f"[Boardgame] unverändert: {boardgame_db.name}, ID: {boardgame_db.bgg_id}")
+            if not stats_only:
+                boardgame_db.fetched_at = now
         else:
             # Neues Boardgame
             boardgame_db = boardgame
-            session.add(boardgame_db)
+            boardgame_db.fetched_at = now
+            idmap.session.add(boardgame_db)
+            idmap.boardgames[boardgame_db.bgg_id] = boardgame_db
+            counts["boardgame_inserted"] += 1
             logger.info(f"[Boardgame] neu angelegt: {boardgame_db.name}, ID: {boardgame_db.bgg_id}")
 
-        boardgames_dict[boardgame_db.bgg_id] = boardgame_db
-    
-    # um alle verlinkungen zu erhalten müssen die boardgames separat commitet werden
-    session.commit()
+        boardgame_db.stats_fetched_at = now
 
-    return boardgames_dict
+    # um alle verlinkungen zu erhalten müssen die boardgames separat geflusht werden
+    if fetched.boardgames:
+        idmap.session.flush()
 
+    return idmap.boardgames
 
-def get_location(json_file: dict) -> Location:
+
+def get_location(play: dict, idmap: SyncIdentityMap) -> Location:
     """
-    Erstelle oder finde eine Location anhand der JSON-Daten.
-    Falls keine Location in den JSON-Daten vorhanden ist, wird "Unbekannt" verwendet.
+    Erstelle oder finde die Location eines Spiels (Schema PLAY).
+    Falls keine Location vorhanden ist, wird "Unbekannt" verwendet.
     
     """
-    name = json_file.get("@location")
+    name = play["location"]
     
     # Fallback für fehlende oder leere Location
     if not name or name.strip() == "":
         name = "Unbekannt"
         logger.warning(f"Location ist leer oder fehlt, verwende Fallback: {name}")
 
-    location = session.query(Location).filter_by(name=name).first()
+    location = idmap.locations.get(name)
     if not location:
         location = Location(name=name)
-        session.add(location)
+        idmap.session.add(location)
+        idmap.locations[name] = location
         logger.info(f"[Location] neu erstellt: {name}")
     else:
         logger.debug(f"[Location] unverändert oder bereits vorhanden: {name}")
@@ -82,18 +420,19 @@ def get_location(json_file: dict) -> Location:
     return location
 
 
-def get_or_create_player(player_json: dict) -> Player:
+def get_or_create_player(player_json: dict, idmap: SyncIdentityMap) -> Player:
     """
-    Erstelle oder finde einen Spieler anhand der JSON-Daten.
+    Erstelle oder finde einen Spieler (Schema PLAYER).
     
     """
-    name = player_json.get("@name")
-    bgg_name = player_json.get("@username") or None
+    name = player_json["name"]
+    bgg_name = player_json["username"]
 
-    player = session.query(Player).filter_by(name=name).first()
+    player = idmap.players.get(name)
     if not player:
         player = Player(name=name, bgg_name=bgg_name)
-        session.add(player)
+        idmap.session.add(player)
+        idmap.players[name] = player
         logger.info(f"[Player] neu erstellt: {name}")
     else:
         logger.debug(f"[Player] unverändert oder bereits vorhanden: {name}")
@@ -101,91 +440,90 @@ def get_or_create_player(player_json: dict) -> Player:
     return player
 
 
-def update_player_positions(db_game: Game, players_json: list[dict]):
+def update_player_positions(game_row: dict, players_json: list[dict], idmap: SyncIdentityMap, plan: SyncPlan):
     """
-    Aktualisiert die Spielstände (PlayerPos) zu einem bereits existierenden Game-Objekt.
+    Plant die Spielstände (PlayerPos) zu einem Game.
     Die JSON ist Master:
       - Einträge, die nicht mehr in der JSON sind, werden gelöscht.
       - Einträge, die fehlen, werden angelegt.
       - Vorhandene Einträge werden aktualisiert (nur wenn sich was ändert -> info).
+    Die Platzierungen (position) werden dabei für alle Spieler der Partie neu berechnet.
+    Die Spieler müssen bereits eine ID haben (siehe sync_games).
       
     """
+    game_id = game_row.get("id")
+    game_bgg_id = game_row["game_bgg_id"]
 
-    # 1) PlayerPos aus der DB laden, die zu diesem Spiel gehören
-    existing_positions = session.query(PlayerPos).filter_by(game=db_game).all()
+    # 1) PlayerPos aus der IdentityMap, die zu diesem Spiel gehören (neue Spiele haben noch keine)
     # Mapping von player_id -> PlayerPos
-    existing_positions_map = {pos.player_id: pos for pos in existing_positions}
+    existing_positions_map = idmap.player_pos.get(game_id, {}) if game_id else {}
 
-    # 2) IDs der Player aus JSON sammeln (damit wissen wir, was neu oder gelöscht ist)
-    json_player_ids = []
+    # 2) Positionen aus der JSON, ein Eintrag pro Spieler (bei doppelten Namen gilt der letzte)
+    json_positions = {}
     for p_json in players_json:
-        name = p_json.get("@name")
-        player_obj = session.query(Player).filter_by(name=name).first()
-        if not player_obj:
-            player_obj = get_or_create_player(p_json)
-        json_player_ids.append(player_obj.id)
+        player_obj = idmap.players[p_json["name"]]
+        json_positions[player_obj.id] = (player_obj, p_json["score"], p_json["win"])
+
+    # Platzierungen aller Spieler der Partie (player_id -> position)
+    positions = dict(
+        zip(json_positions, finishing_positions((win, points) for _, points, win in json_positions.values()))
+    )
 
     # 3) PlayerPos, die nicht mehr in der JSON sind, löschen
-    for player_id, pos_obj in existing_positions_map.items():
-        if player_id not in json_player_ids:
-            logger.info(
-                f"[PlayerPos] gelöscht: Player_ID={player_id} in Game_ID={db_game.id}, "
-                f"BGG_ID={db_game.game_bgg_id}"
-            )
-            session.delete(pos_obj)
+    for player_id, pos_row in existing_positions_map.items():
+        if player_id not in json_positions:
+            logger.info(f"[PlayerPos] gelöscht: Player_ID={player_id} in Game_ID={game_id}, BGG_ID={game_bgg_id}")
+            plan.deleted_player_pos.append(pos_row["id"])
+            plan.counts["player_pos_deleted"] += 1
 
     # 4) Anlegen oder Updaten der PlayerPos aus der JSON
-    for p_json in players_json:
-        # passender Player
-        name = p_json.get("@name")
-        player_obj = session.query(Player).filter_by(name=name).first()
-        if not player_obj:
-            player_obj = get_or_create_player(p_json)
-
-        points = nested_get(p_json, ["@score"], float) or 0.0
-        win = (p_json.get("@win") == "1")
-
-        current_pp = PlayerPos(
-            points=points,
-            win=win,
-            game_id=db_game.id,
-            player_id=player_obj.id,
-        )
+    for player_id, (player_obj, points, win) in json_positions.items():
+        position = positions[player_id]
+        row = {
+            "game_id": game_id,
+            "game_bgg_id": game_bgg_id,
+            "player_id": player_id,
+            "points": points,
+            "win": win,
+            "position": position,
+        }
 
-        # Falls PlayerPos existiert, updaten
-        existing_pp = existing_positions_map.get(player_obj.id)
+        existing_pp = existing_positions_map.get(player_id)
         if existing_pp:
-            if existing_pp.update(current_pp):
+            if existing_pp["points"] != points or existing_pp["win"] != win or existing_pp["position"] != position:
+                plan.player_pos.append(row)
+                plan.counts["player_pos_updated"] += 1
                 logger.info(
-                    f"[PlayerPos] aktualisiert: Player={player_obj.name}, "
-                    f"Boardgame={db_game.boardgame.name}, Game_ID={db_game.game_bgg_id} "
-                    f"(points={points}, win={win})"
+                    f"[PlayerPos] aktualisiert: Player={player_obj.name}, Game_ID={game_bgg_id} "
+                    f"(points={points}, win={win}, position={position})"
                 )
             else:
-                logger.debug(
-                    f"[PlayerPos] unverändert: Player={player_obj.name}, "
-                    f"Boardgame={db_game.boardgame.name}, Game_ID={db_game.game_bgg_id}"
-                )
+                logger.debug(f"[PlayerPos] unverändert: Player={player_obj.name}, Game_ID={game_bgg_id}")
         else:
-            # Neu erstellen
-            pp = current_pp
-            session.add(pp)
+            plan.player_pos.append(row)
+            plan.counts["player_pos_inserted"] += 1
             logger.info(
-                f"[PlayerPos] neu erstellt: Player={player_obj.name}, "
-                f"Boardgame={db_game.boardgame.name}, Game_ID={db_game.game_bgg_id}, "
+                f"[PlayerPos] neu erstellt: Player={player_obj.name}, Game_ID={game_bgg_id}, "
                 f"(points={points}, win={win})"
             )
 
 
-def update_or_create_game(my_game: dict, boardgame_obj: Boardgame, location_obj: Location) -> Game:
+def update_or_create_game(
+    play: dict,
+    boardgame_obj: Boardgame,
+    location_obj: Location,
+    digest: str,
+    idmap: SyncIdentityMap,
+    plan: SyncPlan,
+) -> dict:
     """
-    Erstellt oder aktualisiert ein Game anhand eines JSON-Eintrags.
+    Plant das Anlegen oder Aktualisieren eines Games anhand eines Spiels (Schema PLAY).
     Loggt nur INFO, wenn sich wirklich Daten geändert haben.
+    Gibt die (geplante) Zeile des Games zurück.
     """
-    game_bgg_id = nested_get(my_game, ["@id"], int)
-    datum_str = my_game.get("@date")
-    datum = datetime.strptime(datum_str, "%Y-%m-%d").date() if datum_str else None
-    playtime = nested_get(my_game, ["@length"], int)
+    game_bgg_id = play["id"]
+    datum = play["date"]
+    playtime = play["length"]
 
     # Sicherstellen, dass location_obj eine gültige ID hat
     if location_obj is None:
@@ -194,147 +532,528 @@ def update_or_create_game(my_game: dict, boardgame_obj: Boardgame, location_obj:
         
     # Falls location_obj noch keine ID hat, flushen wir die Session
     if location_obj.id is None:
-        session.flush()
+        idmap.session.flush()
         logger.debug(f"Location-Objekt geflusht, ID: {location_obj.id}")
 
-    current_game = Game(
-        game_bgg_id=game_bgg_id,
-        datum=datum,
-        playtime=playtime,
-        boardgame_id=boardgame_obj.id,
-        location_id=location_obj.id,
+    current_game = {
+        "game_bgg_id": game_bgg_id,
+        "datum": datum,
+        "playtime": playtime,
+        "boardgame_id": boardgame_obj.id,
+        "location_id": location_obj.id,
+        "digest": digest,
+    }
+    log_info = (
+        f"game_bgg_id={game_bgg_id}, datum={datum}, boardgame={boardgame_obj.name}, location={location_obj.name}"
     )
 
-    db_game = session.query(Game).filter_by(game_bgg_id=game_bgg_id).first()
+    db_game = idmap.games.get(game_bgg_id)
     if not db_game:
         # Neues Game anlegen
         db_game = current_game
-        session.add(db_game)
-        # Spiel in Datenbank für Logs 'flushen'
-        session.flush()
-        logger.info(
-            f"[Game] neu erstellt: game_bgg_id={db_game.game_bgg_id}, "
-            f"datum={db_game.datum}, boardgame={db_game.boardgame.name if db_game.boardgame else 'None'}, "
-            f"location={db_game.location.name if db_game.location else 'None'}"
-        )
-    else:
+        idmap.games[game_bgg_id] = db_game
+        plan.games.append(current_game)
+        plan.counts["game_inserted"] += 1
+        logger.info(f"[Game] neu erstellt: {log_info}")
+    elif any(db_game[column] != current_game[column] for column in GAME_UPDATE_COLUMNS):
         # Updates vergleichen
-        changed = db_game.update(current_game)
-        if changed:
-            logger.info(
-                f"[Game] aktualisiert: game_bgg_id={game_bgg_id}, "
-                f"datum={db_game.datum}, boardgame={db_game.boardgame.name if db_game.boardgame else 'None'}, "
-                f"location={db_game.location.name if db_game.location else 'None'}"
-            )
-        else:
-            logger.debug(
-                f"[Game] unverändert: game_bgg_id={game_bgg_id}, "
-                f"datum={db_game.datum}, boardgame={db_game.boardgame.name if db_game.boardgame else 'None'}, "
-                f"location={db_game.location.name if db_game.location else 'None'}"
-            )
+        db_game.update(current_game)
+        plan.games.append(current_game)
+        plan.counts["game_updated"] += 1
+        logger.info(f"[Game] aktualisiert: {log_info}")
+    else:
+        logger.debug(f"[Game] unverändert: {log_info}")
 
     # Kein commit hier
     return db_game
 
 
-def update_db(from_api: bool, save_file=False):
+def apply_plan(session: Session, plan: SyncPlan, batch_size: int = SYNC_WRITE_BATCH_SIZE):
     """
-    Aktualisiert die Datenbank mithilfe der JSON-Spieleliste.
-    1. Boardgames updaten/erstellen.
-    2. Spiele (Games) entfernen, die nicht mehr in der JSON existieren.
-    3. Spiele anlegen/updaten (Game + PlayerPos + Location).
-    4. Einmal am Ende committen.
+    Schreibt die geplanten Änderungen eines Batches per Bulk Upsert in die Datenbank.
+    1. Games (Schlüssel game_bgg_id)
+    2. game_id für PlayerPos neuer Games nachladen
+    3. PlayerPos (Schlüssel game_id + player_id) und gelöschte PlayerPos
+
     """
+    # Doppelte Plays (z.B. durch verschobene Seiten bei BGG) nur einmal schreiben, der letzte Stand gewinnt
+    game_rows = list({row["game_bgg_id"]: row for row in plan.games}.values())
+    bulk_upsert(session, Game, game_rows, ["game_bgg_id"], GAME_UPDATE_COLUMNS, batch_size)
 
-    save_path = "data/example/example_plays.json"
+    new_game_bgg_ids = {row["game_bgg_id"] for row in plan.player_pos if row["game_id"] is None}
+    if new_game_bgg_ids:
+        game_ids = dict(
+            session.execute(select(Game.game_bgg_id, Game.id).where(Game.game_bgg_id.in_(new_game_bgg_ids))).all()
+        )
+        for row in plan.player_pos:
+            if row["game_id"] is None:
+                row["game_id"] = game_ids[row["game_bgg_id"]]
 
-    # 1) Daten holen
-    if from_api:
-        logger.info("Empfange Spiele von der BGG-API...")
-        my_games = ask_games_from(GAME_USER)
-        if save_file:
-            with open(save_path, "w", encoding=ENCODING) as file:
-                json.dump(my_games, file, indent=4, ensure_ascii=False)
-    else:
-        with open(save_path, "r", encoding=ENCODING) as file:
-            logger.info("Empfange Spiele aus lokaler JSON-Datei...")
-            my_games = json.load(file)
+    player_pos_rows = list(
+        {
+            (row["game_id"], row["player_id"]): {key: value for key, value in row.items() if key != "game_bgg_id"}
+            for row in plan.player_pos
+        }.values()
+    )
+    bulk_upsert(session, PlayerPos, player_pos_rows, ["game_id", "player_id"], PLAYER_POS_UPDATE_COLUMNS, batch_size)
+    bulk_delete(session, PlayerPos, plan.deleted_player_pos, batch_size)
 
-    logger.info(f"Verarbeite {len(my_games)} Spiele aus der JSON-Datei")
-    
-    # 2) Boardgames aktualisieren/erstellen
-    boardgames_dict = get_boardgames(my_games)
+    logger.debug(f"[Bulk] geschrieben: {dict(plan.counts)}")
 
-    # 3) Alte Games löschen (die nicht mehr in der JSON sind)
-    json_game_ids = set()
-    for my_game in my_games:
-        g_id = nested_get(my_game, ["@id"], int)
-        if g_id:
-            json_game_ids.add(g_id)
 
-    all_db_games = session.query(Game).all()
-    for db_game in all_db_games:
-        if db_game.game_bgg_id not in json_game_ids:
-            logger.info(
-                f"[Game] wird gelöscht, da nicht mehr in der JSON: "
-                f"game_bgg_id={db_game.game_bgg_id}, datum={db_game.datum}, "
-                f"boardgame={db_game.boardgame.name if db_game.boardgame else 'None'}"
-            )
-            session.delete(db_game)
+def get_sync_state(session: Session, bgg_user: str) -> SyncState:
+    """
+    Lade das Sync-Wasserzeichen eines BGG-Users oder lege es an.
+
+    """
+    state = session.query(SyncState).filter_by(bgg_user=bgg_user).first()
+    if not state:
+        state = SyncState(bgg_user=bgg_user)
+        session.add(state)
+        logger.info(f"[SyncState] neu erstellt: {bgg_user}")
+
+    return state
+
+
+def newest_play(plays: list[dict], newest: tuple[date, int]) -> tuple[date, int]:
+    """
+    Gibt das neueste Spiel (Datum, ID) aus plays (Schema PLAY) und newest zurück.
+    Ohne neuere Spiele bleibt newest erhalten.
+
+    """
+    for play in plays:
+        datum, game_bgg_id = play["date"], play["id"]
+        if not datum:
+            continue
+
+        if newest[0] is None or (datum, game_bgg_id) > (newest[0], newest[1] or -1):
+            newest = (datum, game_bgg_id)
+
+    return newest
+
+
+def update_sync_state(state: SyncState, newest: tuple[date, int]):
+    """
+    Setzt das Wasserzeichen auf das neueste Spiel (Datum, ID) und entfernt den Checkpoint.
+    Wird erst am Ende eines erfolgreichen Syncs aufgerufen, ein abgebrochener Sync verschiebt das Wasserzeichen nicht.
+
+    """
+    state.last_play_date, state.last_play_id = newest
+    state.synced_at = datetime.now()
+    state.clear_checkpoint()
+    logger.info(f"[SyncState] Wasserzeichen: datum={state.last_play_date}, game_bgg_id={state.last_play_id}")
+
+
+def save_checkpoint(
+    session: Session,
+    state: SyncState,
+    kind: str,
+    mindate: date,
+    plays: int,
+    last_play_id: int,
+    newest: tuple[date, int],
+):
+    """
+    Zwischencommit: schreibt alle bisherigen Änderungen und den Checkpoint (Seite, letztes und neuestes Spiel).
+    Die Objekte der SyncIdentityMap bleiben dabei geladen (kein expire), sonst würde jedes einzeln nachgeladen.
+
+    """
+    page = plays // BGG_PLAYS_PER_PAGE + 1
+    state.set_checkpoint(kind, mindate, page, last_play_id, plays, newest)
+    commit_batch(session)
+    logger.info(f"[SyncState] Checkpoint: {plays} Spiele verarbeitet, weiter mit Seite {page}")
+
+
+def commit_batch(session: Session):
+    """Zwischencommit, die Objekte der SyncIdentityMap bleiben dabei geladen (kein expire)"""
+    session.expire_on_commit = False
+    try:
+        session.commit()
+    finally:
+        session.expire_on_commit = True
+
+
+def sync_games(
+    plays: list[dict], idmap: SyncIdentityMap, timer: PhaseTimer = None, digests: dict[int, str] = None
+) -> SyncPlan:
+    """
+    Legt die Spiele eines Batches (Schema PLAY, siehe extract_plays) an oder aktualisiert sie
+    (Game + PlayerPos + Location).
+    Die Änderungen werden zuerst geplant und anschließend gesammelt geschrieben.
+    Die Laufzeit wird in timer auf die Phasen "locations" und "games" verteilt.
+    digests (game_bgg_id -> Digest) werden berechnet, falls sie nicht übergeben werden.
 
-    # 4) Alle Spiele aus der JSON -> anlegen oder updaten
-    # Zuerst alle Locations sammeln und committen
+    """
+    timer = timer or PhaseTimer()
+    with timer.phase("games"):
+        plan = SyncPlan()
+        plays = _skip_unchanged_games(plays, idmap, plan, digests)
+
+    with timer.phase("locations"):
+        _create_locations_and_players(plays, idmap)
+
+    with timer.phase("games"):
+        _plan_and_apply_games(plays, idmap, plan)
+
+    return plan
+
+
+def _skip_unchanged_games(
+    plays: list[dict], idmap: SyncIdentityMap, plan: SyncPlan, digests: dict[int, str] = None
+) -> list[dict]:
+    # Digest pro Play berechnen, Games des Batches mit einer Query laden.
+    # Plays mit unverändertem Digest werden übersprungen, nur für die übrigen werden PlayerPos geladen
+    if digests is None:
+        digests = {play["id"]: play_digest(play) for play in plays}
+    unchanged = idmap.load_games(digests)
+    plan.counts["game_unchanged"] = len(unchanged)
+    plan.digests = digests
+    return [play for play in plays if play["id"] not in unchanged]
+
+
+def _create_locations_and_players(plays: list[dict], idmap: SyncIdentityMap):
+    # Zuerst alle Locations und Player sammeln und flushen, damit sie gültige IDs haben
     locations_to_commit = set()
-    for my_game in my_games:
-        location_obj = get_location(my_game)
+    for play in plays:
+        location_obj = get_location(play, idmap)
         locations_to_commit.add(location_obj)
-    
-    # Locations committen, damit sie gültige IDs haben
-    session.flush()
+        for p_json in play["players"]:
+            get_or_create_player(p_json, idmap)
+
+    idmap.session.flush()
     logger.debug(f"Locations geflusht: {len(locations_to_commit)} Locations")
-    
-    # Dann die Games verarbeiten
-    for i, my_game in enumerate(my_games):
-        logger.debug(f"Verarbeite Spiel {i+1}/{len(my_games)}: {my_game.get('@id', 'No ID')}")
-        
+
+
+def _plan_and_apply_games(plays: list[dict], idmap: SyncIdentityMap, plan: SyncPlan):
+    # Dann die Games planen
+    for i, play in enumerate(plays):
+        game_bgg_id = play["id"]
+        logger.debug(f"Verarbeite Spiel {i+1}/{len(plays)}: {game_bgg_id}")
+
         # Boardgame-Objekt holen
-        bgg_id = nested_get(my_game, ["item", "@objectid"], int)
-        boardgame_obj = boardgames_dict.get(bgg_id)
-        
+        bgg_id = play["bgg_id"]
+        boardgame_obj = idmap.boardgames.get(bgg_id)
+
         if not boardgame_obj:
-            logger.warning(f"Kein Boardgame gefunden für bgg_id={bgg_id} in Spiel {my_game.get('@id', 'No ID')}")
+            logger.warning(f"Kein Boardgame gefunden für bgg_id={bgg_id} in Spiel {game_bgg_id}")
             continue
 
-        # Location aus JSON holen (bereits committet)
-        location_obj = get_location(my_game)
-        
-        logger.debug(f"Location für Spiel {my_game.get('@id', 'No ID')}: {location_obj.name if location_obj else 'None'}")
+        # Location holen (bereits geflusht)
+        location_obj = get_location(play, idmap)
+
+        logger.debug(f"Location für Spiel {game_bgg_id}: {location_obj.name if location_obj else 'None'}")
 
         # Game anlegen / updaten
         try:
-            db_game = update_or_create_game(my_game, boardgame_obj, location_obj)
+            game_row = update_or_create_game(
+                play, boardgame_obj, location_obj, plan.digests[game_bgg_id], idmap, plan
+            )
         except Exception as e:
-            logger.error(f"Fehler beim Erstellen/Updaten von Spiel {my_game.get('@id', 'No ID')}: {e}")
-            logger.debug(f"Spiel-Daten: {my_game}")
+            logger.error(f"Fehler beim Erstellen/Updaten von Spiel {game_bgg_id}: {e}")
+            logger.debug(f"Spiel-Daten: {play}")
             raise
 
         # PlayerPos aktualisieren
-        players_json = nested_get(my_game, ["players", "player"]) or []
-        if isinstance(players_json, dict):
-            players_json = [players_json]
+        update_player_positions(game_row, play["players"], idmap, plan)
+        plan.counts["game_changed"] += 1
 
-        update_player_positions(db_game, players_json)
+    # Änderungen des Batches schreiben und die Games wieder freigeben
+    apply_plan(idmap.session, plan)
+    idmap.release_games()
 
-    # 5) Alles committen
-    session.commit()
+
+def play_digest(play: dict) -> str:
+    """
+    Hash über den normalisierten Inhalt eines Plays (Schema PLAY: Datum, Dauer, Location, Boardgame
+    und die sortierten Spieler mit Punkten und Sieg). Ändert sich nichts davon, bleibt der Digest gleich.
+
+    """
+    location = play["location"].strip() or "Unbekannt"
+    players = sorted((p_json["name"], p_json["score"], p_json["win"]) for p_json in play["players"])
+    content = [
+        play["date"].isoformat() if play["date"] else None,
+        play["length"],
+        location,
+        play["bgg_id"],
+        players,
+    ]
+    return hashlib.blake2b(json.dumps(content).encode(), digest_size=16).hexdigest()
+
+
+def delete_missing_games(session: Session, json_game_ids: set[int]) -> int:
+    """
+    Löscht alle Games (inkl. PlayerPos), deren game_bgg_id nicht mehr in der JSON enthalten ist.
+    Importierte Games (negative game_bgg_id, siehe importer.py) stammen nicht von BGG und bleiben erhalten.
+    Es werden nur die IDs aller Games geladen, gelöscht wird per Bulk Delete.
+
+    """
+    missing_games = [
+        row
+        for row in session.execute(select_bgg_games()).mappings()
+        if row["game_bgg_id"] not in json_game_ids
+    ]
+    for row in missing_games:
+        logger.info(
+            f"[Game] wird gelöscht, da nicht mehr in der JSON: "
+            f"game_bgg_id={row['game_bgg_id']}, datum={row['datum']}, boardgame_id={row['boardgame_id']}"
+        )
+
+    game_ids = [row["id"] for row in missing_games]
+    for ids_chunk in chunked(game_ids, SYNC_WRITE_BATCH_SIZE):
+        session.execute(delete(PlayerPos).where(PlayerPos.game_id.in_(ids_chunk)))
+    bulk_delete(session, Game, game_ids)
+
+    return len(game_ids)
+
+
+def update_db(
+    from_api: bool,
+    save_file=False,
+    incremental: bool = False,
+    batch_size: int = SYNC_BATCH_SIZE,
+    progress: Callable[[int, str], None] = None,
+    commit_every: int = SYNC_COMMIT_EVERY,
+):
+    """
+    Aktualisiert die Datenbank mithilfe der JSON-Spieleliste.
+    Die Spiele werden als Stream verarbeitet, jeweils batch_size Spiele gemeinsam. Der Sync läuft als Pipeline
+    aus drei Stufen mit begrenzten Queues (SYNC_PIPELINE_DEPTH Batches), jede mit eigener Session:
+      - fetch: Seiten von BGG laden und parsen
+      - prepare: Digests berechnen, neue oder veraltete Boardgames bei BGG abfragen
+      - Writer: alle Schreibzugriffe auf die Datenbank
+    Der Writer verarbeitet pro Batch:
+    1. Boardgames updaten/erstellen.
+    2. Spiele anlegen/updaten (Game + PlayerPos + Location).
+    3. Spiele (Games) entfernen, die nicht mehr in der JSON existieren (nur beim vollständigen Sync).
+    4. Am Ende committen und das Sync-Wasserzeichen speichern.
+
+    Beim inkrementellen Sync werden von der BGG-API nur Spiele ab dem Datum des
+    letzten erfolgreichen Syncs abgefragt (`mindate`). Da die Liste dann unvollständig ist,
+    werden keine Spiele gelöscht.
+
+    Alle SYNC_COMMIT_EVERY Spiele wird committet und ein Checkpoint gespeichert. Ein abgebrochener Sync
+    derselben Art und Quelle (API oder offline) setzt beim nächsten Aufruf dort fort, statt von vorne zu beginnen.
+
+    Mit save_file werden die Spiele von BGG im Snapshot (SNAPSHOT_PATH, siehe snapshot.py) gespeichert,
+    ein inkrementeller Sync hängt sie als Delta an. Ohne from_api wird der Snapshot gelesen (Offline-Sync).
+
+    progress wird nach jedem Batch mit der Anzahl verarbeiteter Spiele und einer Meldung aufgerufen.
+    Bei einem Fehler wird die Transaktion seit dem letzten Checkpoint zurückgerollt.
+    Jeder Lauf wird mit seinen Messwerten in der Tabelle sync_run gespeichert.
+    """
+    init_engine()
+    telemetry = SyncTelemetry("sync_incremental" if incremental else "sync")
+    with Session(engine) as session:
+        try:
+            _update_db(session, from_api, save_file, incremental, batch_size, progress, telemetry, commit_every)
+        except BaseException as e:
+            session.rollback()
+            telemetry.finish(error=f"{type(e).__name__}: {e}")
+            raise
+    telemetry.finish()
+
+
+def _update_db(
+    session: Session,
+    from_api: bool,
+    save_file: bool,
+    incremental: bool,
+    batch_size: int,
+    progress: Callable[[int, str], None],
+    telemetry: "SyncTelemetry",
+    commit_every: int,
+):
+    timer = telemetry.timer
+    sync_state = get_sync_state(session, GAME_USER)
+
+    if incremental and not from_api:
+        logger.warning("Inkrementeller Sync ist nur mit der BGG-API möglich, verwende vollständigen Sync")
+        incremental = False
+
+    # Checkpoint eines abgebrochenen Syncs derselben Art und Quelle, der Offline-Sync zählt Spiele im Snapshot,
+    # der Sync über die API Seiten bei BGG
+    kind = telemetry.run.kind if from_api else CHECKPOINT_OFFLINE
+    resumed = sync_state.checkpoint_kind == kind
+    if resumed:
+        logger.info(
+            f"[SyncState] setze abgebrochenen Sync fort: {sync_state.checkpoint_plays} Spiele verarbeitet, "
+            f"Seite {sync_state.checkpoint_page}, letztes Spiel {sync_state.checkpoint_play_id}"
+        )
+        telemetry.counts["resumed_plays"] = sync_state.checkpoint_plays
+
+    # 1) Daten holen
+    mindate = None
+    if from_api:
+        start_page = 1
+        if resumed:
+            mindate = sync_state.checkpoint_mindate
+            # eine Seite früher beginnen: durch gelöschte Spiele können Spiele auf vorherige Seiten rutschen,
+            # bereits verarbeitete Spiele werden über ihren Digest übersprungen
+            start_page = max(1, sync_state.checkpoint_page - 1)
+        elif incremental and sync_state.last_play_date:
+            mindate = sync_state.last_play_date
+
+        if mindate:
+            logger.info(f"Empfange Spiele von der BGG-API ab {mindate} (inkrementell)...")
+        else:
+            logger.info("Empfange Spiele von der BGG-API...")
+        mindate_str = mindate.strftime("%Y-%m-%d") if mindate else None
+        my_games = iter_plays(GAME_USER, mindate=mindate_str, start_page=start_page)
+        if save_file:
+            # unvollständige Liste (inkrementell oder fortgesetzt) wird als Delta angehängt
+            delta = mindate is not None or start_page > 1
+            my_games = write_snapshot_stream(my_games, SNAPSHOT_PATH, GAME_USER, delta=delta, mindate=mindate_str)
+        processed = (start_page - 1) * BGG_PLAYS_PER_PAGE
+    else:
+        processed = sync_state.checkpoint_plays if resumed else 0
+        if os.path.exists(SNAPSHOT_PATH):
+            logger.info(f"Empfange Spiele aus dem Snapshot {SNAPSHOT_PATH}...")
+            my_games = islice(read_snapshot(SNAPSHOT_PATH), processed, None)
+        else:
+            with timer.phase("fetch_plays"), open(LEGACY_SAVE_PATH, "r", encoding=ENCODING) as file:
+                logger.info("Empfange Spiele aus lokaler JSON-Datei...")
+                my_games = json.load(file)[processed:]
+
+    # 2) Spiele batchweise verarbeiten
+    json_game_ids = set()
+    counts = telemetry.counts
+    # neuestes Spiel für das Wasserzeichen, ein fortgesetzter Sync übernimmt es aus dem Checkpoint
+    newest = sync_state.checkpoint_newest() if resumed else (sync_state.last_play_date, sync_state.last_play_id)
+    since_commit = 0
+    for prepared in write_batches(session, my_games, timer, counts, batch_size):
+        batch = prepared.plays
+        # Spiele, die nicht zum Schema passen, gelten als vorhanden und werden nicht gelöscht
+        json_game_ids.update(play["id"] for play in batch)
+        json_game_ids.update(prepared.invalid_ids)
+
+        newest = newest_play(batch, newest)
+        processed += prepared.size
+        since_commit += prepared.size
+        if commit_every and since_commit >= commit_every:
+            last_play_id = batch[-1]["id"] if batch else None
+            with timer.phase("commit"):
+                save_checkpoint(session, sync_state, kind, mindate, processed, last_play_id, newest)
+            since_commit = 0
+
+        if progress:
+            progress(processed, f"{processed} Spiele verarbeitet")
+
+    logger.info(f"{len(json_game_ids)} Spiele verarbeitet")
+    telemetry.run.plays = len(json_game_ids)
+
+    # 3) Alte Games löschen (die nicht mehr in der JSON sind), nur bei vollständiger Liste
+    if not incremental:
+        if resumed:
+            # die Spiele vor dem Checkpoint wurden in diesem Lauf nicht geladen, die Liste ist unvollständig
+            logger.warning("[DB-Update] fortgesetzter Sync, gelöschte Spiele werden erst beim nächsten Sync entfernt")
+        else:
+            with timer.phase("delete"):
+                counts["game_deleted"] = delete_missing_games(session, json_game_ids)
+    logger.info(
+        f"[DB-Update] {counts['game_changed']} Spiele geändert / {counts['game_unchanged']} unverändert, "
+        f"Änderungen: {dict(counts)}"
+    )
+
+    # 4) Restliche Änderungen und Wasserzeichen committen
+    update_sync_state(sync_state, newest)
+    with timer.phase("commit"):
+        session.commit()
     logger.info("[DB-Update] abgeschlossen.")
 
 
+def write_batches(
+    session: Session, my_games: Iterable[dict], timer: PhaseTimer, counts: dict, batch_size: int = SYNC_BATCH_SIZE
+) -> Iterator[PreparedBatch]:
+    """
+    Schreibt Spiele (Format der BGG-API) batchweise in die Datenbank und liefert jeden Batch, nachdem er geschrieben
+    wurde (für Checkpoints, Commits und Fortschritt beim Aufrufer). Läuft als Pipeline aus drei Stufen mit
+    begrenzten Queues (SYNC_PIPELINE_DEPTH Batches):
+      - fetch: my_games lesen (z.B. Seiten von BGG laden und parsen)
+      - prepare: Spiele nach Schema auslesen, Digests berechnen, neue oder veraltete Boardgames bei BGG abfragen
+      - Writer: Boardgames übernehmen, Games, PlayerPos, Locations und Spieler per Bulk Upsert schreiben
+    Bekannte Boardgames, Spieler und Locations werden einmal vorab geladen (SyncIdentityMap).
+    Es wird nicht committet.
+
+    """
+    idmap = SyncIdentityMap(session)
+    preparer = BatchPreparer(timer)
+    with Pipeline(maxsize=SYNC_PIPELINE_DEPTH) as pipeline:
+        batches = pipeline.source("fetch", chunked(timer.iterate("fetch_plays", my_games), batch_size))
+        prepared_batches = pipeline.stage("prepare", preparer, batches)
+
+        # Writer
+        for prepared in pipeline.results(prepared_batches):
+            logger.info(f"Verarbeite {prepared.size} Spiele")
+
+            # Boardgames aktualisieren/erstellen
+            with timer.phase("fetch_boardgames"):
+                merge_boardgames(prepared.boardgames, idmap, counts)
+
+            # Spiele anlegen oder updaten
+            plan = sync_games(prepared.plays, idmap, timer, prepared.digests)
+            for key, value in plan.counts.items():
+                counts[key] += value
+            counts["play_invalid"] += prepared.size - len(prepared.plays)
+
+            yield prepared
+
+
+def update_boardgames(batch_size: int = SYNC_BATCH_SIZE, progress: Callable[[int, str], None] = None) -> int:
+    """
+    Aktualisiert alle Boardgames der Datenbank, deren Metadaten oder Stats veraltet sind
+    (unabhängig davon, ob sie in neuen Spielen vorkommen). Gibt die Anzahl geprüfter Boardgames zurück.
+
+    """
+    init_engine()
+    telemetry = SyncTelemetry("metadata")
+    timer = telemetry.timer
+    with Session(engine) as session:
+        try:
+            idmap = SyncIdentityMap(session)
+            bgg_ids = sorted(idmap.boardgames)
+            for done, batch in enumerate(chunked(bgg_ids, batch_size), start=1):
+                with timer.phase("fetch_boardgames"):
+                    refresh_boardgames(batch, idmap, telemetry.counts)
+                if progress:
+                    checked = min(done * batch_size, len(bgg_ids))
+                    progress(checked, f"{checked}/{len(bgg_ids)} Boardgames geprüft")
+            with timer.phase("commit"):
+                session.commit()
+        except BaseException as e:
+            session.rollback()
+            telemetry.finish(error=f"{type(e).__name__}: {e}")
+            raise
+    telemetry.finish()
+
+    logger.info(f"[Boardgame] Aktualisierung abgeschlossen, {len(bgg_ids)} Boardgames geprüft")
+    return len(bgg_ids)
+
+
 if __name__ == "__main__":
+    import argparse
     from time import time
 
+    parser = argparse.ArgumentParser(description="Aktualisiert die Datenbank mit den Spielen aus BGG")
+    parser.add_argument(
+        "--incremental", action="store_true", help="nur Spiele seit dem letzten erfolgreichen Sync abfragen"
+    )
+    parser.add_argument("--no-images", action="store_true", help="Bilder der Boardgames nicht lokal spiegeln")
+    args = parser.parse_args()
+
+    from bogan.jobs.queue import JobLocked
+    from bogan.jobs.worker import Worker
+
+    def run(progress: Callable[[int, str], None]):
+        update_db(from_api=True, save_file=False, incremental=args.incremental, progress=progress)
+        if IMAGE_MIRROR and not args.no_images:
+            mirror_images(engine, progress=progress)
+
     t_start = time()
-    update_db(from_api=True, save_file=False)
+    # als Job mit der Sperre der Job-Queue, damit nicht gleichzeitig der Worker synchronisiert
+    try:
+        Worker(init_engine(), schedule=False).run_now("sync_incremental" if args.incremental else "sync", run)
+    except JobLocked as e:
+        parser.exit(1, f"{e}, Sync nicht gestartet\n")
     t_stop = time()
     t_ges = round(t_stop - t_start, 4)
     logger.info(f"[SUCCESS] Das Updaten/Erstellen der Datenbank dauerte {t_ges} sek")
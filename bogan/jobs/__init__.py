@@ -0,0 +1,6 @@
+"""
+Hintergrund-Jobs: Job-Queue in der Datenbank, Worker-Prozess und Zeitplan.
+
+Worker starten:  python -m bogan.jobs
+Job einreihen:   python -m bogan.jobs enqueue sync
+"""
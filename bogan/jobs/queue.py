@@ -0,0 +1,197 @@
+"""
+Job-Queue in der Datenbank (Tabelle sync_job)
+
+Jobs werden von der Weboberfläche, dem Scheduler oder der Kommandozeile eingereiht und vom Worker abgearbeitet.
+Es läuft immer nur ein Job gleichzeitig: beim Start wird `running_lock` gesetzt (eindeutige Spalte),
+ein zweiter Job scheitert daran mit einem IntegrityError und bleibt in der Warteschlange.
+Syncs und Importe von der Kommandozeile laufen als Job mit derselben Sperre (start_now), aber ohne Warteschlange.
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from bogan.config import JOB_STALE_AFTER
+from bogan.db.models import SyncJob
+from bogan.utils import Logger
+
+# Add Logging
+logger = Logger().setup_logger(__file__)
+
+# Art des Jobs -> Beschreibung
+JOB_KINDS = {
+    "sync": "Vollständiger Sync",
+    "sync_incremental": "Inkrementeller Sync",
+    "metadata": "Boardgames aktualisieren",
+}
+ACTIVE_STATUS = ("queued", "running")
+RUNNING_LOCK = "sync"
+
+
+def enqueue(session: Session, kind: str, requested_by: str = None) -> tuple[SyncJob, bool]:
+    """Reiht einen Job ein, sofern nicht bereits ein Job derselben Art wartet oder läuft
+
+    Args:
+        session (Session): Session, wird committet
+        kind (str): Art des Jobs, siehe JOB_KINDS
+        requested_by (str, optional): Auslöser, z.B. Benutzername oder "scheduler". Defaults to None.
+
+    Raises:
+        ValueError: unbekannte Art des Jobs
+
+    Returns:
+        tuple[SyncJob, bool]: Job und ob er neu angelegt wurde
+    """
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unbekannter Job: {kind}")
+
+    active = session.scalars(
+        select(SyncJob).where(SyncJob.kind == kind, SyncJob.status.in_(ACTIVE_STATUS)).order_by(SyncJob.id).limit(1)
+    ).first()
+    if active:
+        logger.info(f"[Job] {kind} wird nicht eingereiht, Job {active.id} ist bereits {active.status}")
+        return active, False
+
+    job = SyncJob(kind=kind, status="queued", requested_by=requested_by, created_at=datetime.now(), progress=0)
+    session.add(job)
+    session.commit()
+    logger.info(f"[Job] eingereiht: {job.id} {kind} von {requested_by}")
+    return job, True
+
+
+class JobLocked(Exception):
+    """Es läuft bereits ein Job (running_lock ist gesetzt)"""
+
+
+def start_now(session: Session, kind: str, requested_by: str = None) -> SyncJob:
+    """Legt einen Job an, der sofort im aufrufenden Prozess läuft (z.B. Sync oder Import von der Kommandozeile).
+    Er setzt dieselbe Sperre wie claim_next, solange er läuft, startet der Worker keinen Job.
+
+    Args:
+        session (Session): Session, wird committet
+        kind (str): Art des Jobs, z.B. aus JOB_KINDS oder "import"
+        requested_by (str, optional): Auslöser. Defaults to None.
+
+    Raises:
+        JobLocked: es läuft bereits ein Job
+
+    Returns:
+        SyncJob: gestarteter Job, mit finish beenden
+    """
+    now = datetime.now()
+    job = SyncJob(
+        kind=kind,
+        status="running",
+        running_lock=RUNNING_LOCK,
+        requested_by=requested_by,
+        created_at=now,
+        started_at=now,
+        heartbeat_at=now,
+        progress=0,
+    )
+    session.add(job)
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        running = session.scalars(select(SyncJob).where(SyncJob.running_lock == RUNNING_LOCK)).first()
+        detail = f" (Job {running.id} {running.kind})" if running else ""
+        raise JobLocked(f"Es läuft bereits ein Job{detail}")
+    logger.info(f"[Job] gestartet: {job.id} {kind} von {requested_by}")
+    return job
+
+
+def claim_next(session: Session) -> Optional[SyncJob]:
+    """Startet den ältesten wartenden Job, gibt None zurück, wenn keiner wartet oder bereits ein Job läuft"""
+    job = session.scalars(
+        select(SyncJob).where(SyncJob.status == "queued").order_by(SyncJob.created_at, SyncJob.id).limit(1)
+    ).first()
+    if job is None:
+        return None
+
+    now = datetime.now()
+    try:
+        result = session.execute(
+            update(SyncJob)
+            .where(SyncJob.id == job.id, SyncJob.status == "queued")
+            .values(status="running", running_lock=RUNNING_LOCK, started_at=now, heartbeat_at=now)
+        )
+        session.commit()
+    except IntegrityError:
+        # ein anderer Job hält die Sperre
+        session.rollback()
+        logger.debug(f"[Job] {job.id} wartet, es läuft bereits ein Job")
+        return None
+
+    if result.rowcount != 1:
+        # ein anderer Worker war schneller
+        return None
+
+    session.refresh(job)
+    logger.info(f"[Job] gestartet: {job.id} {job.kind}")
+    return job
+
+
+def update_progress(session: Session, job_id: int, progress: int, message: str):
+    """Speichert den Fortschritt eines laufenden Jobs (zählt auch als Lebenszeichen)"""
+    session.execute(
+        update(SyncJob)
+        .where(SyncJob.id == job_id)
+        .values(progress=progress, message=message[:255], heartbeat_at=datetime.now())
+    )
+    session.commit()
+
+
+def heartbeat(session: Session, job_id: int):
+    """Lebenszeichen eines laufenden Jobs"""
+    session.execute(update(SyncJob).where(SyncJob.id == job_id).values(heartbeat_at=datetime.now()))
+    session.commit()
+
+
+def finish(session: Session, job_id: int, error: str = None):
+    """Beendet einen Job (done oder failed) und gibt die Sperre frei"""
+    session.execute(
+        update(SyncJob)
+        .where(SyncJob.id == job_id)
+        .values(
+            status="failed" if error else "done",
+            running_lock=None,
+            finished_at=datetime.now(),
+            error=error,
+        )
+    )
+    session.commit()
+    logger.info(f"[Job] beendet: {job_id} {'mit Fehler' if error else 'erfolgreich'}")
+
+
+def release_stale(session: Session, stale_after: int = JOB_STALE_AFTER) -> int:
+    """Markiert laufende Jobs ohne Lebenszeichen seit stale_after Sekunden als fehlgeschlagen und gibt die Sperre frei
+
+    Returns:
+        int: Anzahl freigegebener Jobs
+    """
+    now = datetime.now()
+    result = session.execute(
+        update(SyncJob)
+        .where(SyncJob.status == "running", SyncJob.heartbeat_at < now - timedelta(seconds=stale_after))
+        .values(status="failed", running_lock=None, finished_at=now, error="Kein Lebenszeichen vom Worker")
+    )
+    session.commit()
+    if result.rowcount:
+        logger.warning(f"[Job] {result.rowcount} Job(s) ohne Lebenszeichen abgebrochen")
+    return result.rowcount
+
+
+def last_created(session: Session, kind: str) -> Optional[datetime]:
+    """Zeitpunkt, zu dem zuletzt ein Job dieser Art eingereiht wurde"""
+    return session.scalars(
+        select(SyncJob.created_at).where(SyncJob.kind == kind).order_by(SyncJob.created_at.desc()).limit(1)
+    ).first()
+
+
+def recent_jobs(session: Session, limit: int = 20) -> list[SyncJob]:
+    """Die zuletzt eingereihten Jobs, neueste zuerst"""
+    return list(session.scalars(select(SyncJob).order_by(SyncJob.id.desc()).limit(limit)))
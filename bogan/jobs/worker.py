@@ -0,0 +1,222 @@
+"""
+Job-Worker
+
+Eigener Prozess neben gunicorn, arbeitet die Job-Queue ab und reiht die geplanten Jobs ein:
+  - inkrementeller Sync alle JOB_INCREMENTAL_SYNC_INTERVAL Sekunden
+  - nächtliche Aktualisierung der Boardgames um JOB_METADATA_REFRESH_HOUR Uhr
+Syncs laufen damit nie innerhalb eines Web-Requests.
+"""
+
+import signal
+import threading
+import traceback
+from datetime import datetime, timedelta
+from typing import Callable
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from bogan.config import (
+    IMAGE_MIRROR,
+    JOB_HEARTBEAT_INTERVAL,
+    JOB_INCREMENTAL_SYNC_INTERVAL,
+    JOB_METADATA_REFRESH_HOUR,
+    JOB_POLL_INTERVAL,
+)
+from bogan.db.models import Base, SyncJob
+from bogan.jobs import queue
+from bogan.utils import Logger, create_db_engine, get_db_engine
+
+# Add Logging
+logger = Logger().setup_logger(__file__)
+
+
+def mirror_images(progress: Callable[[int, str], None]):
+    """Bilder neuer oder geänderter Boardgames nach dem Sync lokal spiegeln"""
+    if not IMAGE_MIRROR:
+        return
+    from bogan.db import images, update_db
+
+    images.mirror_images(update_db.engine, progress=progress)
+
+
+def run_sync(progress: Callable[[int, str], None]):
+    from bogan.db.update_db import update_db
+
+    update_db(from_api=True, incremental=False, progress=progress)
+    mirror_images(progress)
+
+
+def run_incremental_sync(progress: Callable[[int, str], None]):
+    from bogan.db.update_db import update_db
+
+    update_db(from_api=True, incremental=True, progress=progress)
+    mirror_images(progress)
+
+
+def run_metadata_refresh(progress: Callable[[int, str], None]):
+    from bogan.db.update_db import update_boardgames
+
+    update_boardgames(progress=progress)
+    mirror_images(progress)
+
+
+# Art des Jobs -> Funktion, die den Job ausführt
+HANDLERS = {
+    "sync": run_sync,
+    "sync_incremental": run_incremental_sync,
+    "metadata": run_metadata_refresh,
+}
+
+
+def schedule_jobs(session: Session, now: datetime = None):
+    """Reiht die geplanten Jobs ein, wenn sie fällig sind"""
+    now = now or datetime.now()
+
+    if JOB_INCREMENTAL_SYNC_INTERVAL > 0:
+        last = queue.last_created(session, "sync_incremental")
+        if last is None or now - last >= timedelta(seconds=JOB_INCREMENTAL_SYNC_INTERVAL):
+            queue.enqueue(session, "sync_incremental", requested_by="scheduler")
+
+    if 0 <= JOB_METADATA_REFRESH_HOUR <= now.hour:
+        due = now.replace(hour=JOB_METADATA_REFRESH_HOUR, minute=0, second=0, microsecond=0)
+        last = queue.last_created(session, "metadata")
+        if last is None or last < due:
+            queue.enqueue(session, "metadata", requested_by="scheduler")
+
+
+class Worker:
+    """Arbeitet die Job-Queue ab, immer nur ein Job gleichzeitig"""
+
+    def __init__(self, engine=None, schedule: bool = True):
+        self.engine = engine or get_db_engine()
+        self.schedule = schedule
+        # Fortschritt und Lebenszeichen über eine eigene Engine: SQLite erlaubt nur eine schreibende Verbindung und ist
+        # während eines Syncs für andere Schreibzugriffe gesperrt, dort nur kurz warten statt den Sync aufzuhalten
+        if self.engine.dialect.name == "sqlite":
+            self.status_engine = create_db_engine(self.engine.url, sqlite_busy_timeout=100)
+        else:
+            self.status_engine = self.engine
+        self.stop_event = threading.Event()
+        Base.metadata.create_all(self.engine, tables=[SyncJob.__table__])
+
+    def stop(self, *args):
+        logger.info("[Worker] wird nach dem aktuellen Job beendet")
+        self.stop_event.set()
+
+    def run_forever(self):
+        logger.info(f"[Worker] gestartet, Datenbank {self.engine.url}")
+        while not self.stop_event.is_set():
+            if not self.run_once():
+                self.stop_event.wait(JOB_POLL_INTERVAL)
+        logger.info("[Worker] beendet")
+
+    def run_once(self) -> bool:
+        """Plant fällige Jobs ein und führt den nächsten wartenden Job aus
+
+        Returns:
+            bool: True, wenn ein Job ausgeführt wurde
+        """
+        with Session(self.engine) as session:
+            queue.release_stale(session)
+            if self.schedule:
+                schedule_jobs(session)
+            job = queue.claim_next(session)
+            if job is None:
+                return False
+            job_id, kind = job.id, job.kind
+
+        self.run_job(job_id, kind)
+        return True
+
+    def run_now(self, kind: str, handler: Callable[[Callable[[int, str], None]], None], requested_by: str = "cli"):
+        """Führt einen Job sofort in diesem Prozess aus (Kommandozeile), mit derselben Sperre wie die Jobs der Queue
+
+        Raises:
+            queue.JobLocked: es läuft bereits ein Job
+            RuntimeError: der Job ist fehlgeschlagen
+        """
+        with Session(self.engine) as session:
+            queue.release_stale(session)
+            job_id = queue.start_now(session, kind, requested_by=requested_by).id
+
+        error = self.run_job(job_id, kind, handler)
+        if error:
+            raise RuntimeError(error)
+
+    def run_job(self, job_id: int, kind: str, handler: Callable[[Callable[[int, str], None]], None] = None):
+        """Führt einen gestarteten Job aus, Fortschritt und Lebenszeichen werden über eigene Sessions geschrieben
+
+        Args:
+            job_id (int): ID des Jobs
+            kind (str): Art des Jobs
+            handler (Callable, optional): führt den Job aus. Defaults to HANDLERS[kind].
+
+        Returns:
+            Optional[str]: Fehler oder None
+        """
+        beating = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job_id, beating), daemon=True)
+        heartbeat.start()
+
+        error = None
+        try:
+            (handler or HANDLERS[kind])(lambda done, message: self._progress(job_id, done, message))
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            logger.error(f"[Job] {job_id} {kind} fehlgeschlagen: {error}")
+            logger.debug(traceback.format_exc())
+        except BaseException as e:
+            # z.B. Strg+C bei einem Job von der Kommandozeile: Sperre trotzdem freigeben
+            error = f"{type(e).__name__}: abgebrochen"
+            raise
+        finally:
+            beating.set()
+            heartbeat.join()
+            with Session(self.engine) as session:
+                queue.finish(session, job_id, error=error)
+        return error
+
+    def _progress(self, job_id: int, done: int, message: str):
+        # der Fortschritt ist nur informativ, z.B. kann SQLite während des Syncs gesperrt sein
+        try:
+            with Session(self.status_engine) as session:
+                queue.update_progress(session, job_id, done, message)
+        except SQLAlchemyError as e:
+            logger.debug(f"[Job] Fortschritt von {job_id} nicht gespeichert: {e}")
+
+    def _heartbeat(self, job_id: int, stop: threading.Event):
+        while not stop.wait(JOB_HEARTBEAT_INTERVAL):
+            try:
+                with Session(self.status_engine) as session:
+                    queue.heartbeat(session, job_id)
+            except SQLAlchemyError as e:
+                logger.debug(f"[Job] Lebenszeichen von {job_id} nicht gespeichert: {e}")
+
+
+def main(argv: list[str] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m bogan.jobs", description="Job-Worker für Syncs mit BGG")
+    subparsers = parser.add_subparsers(dest="command")
+    worker_parser = subparsers.add_parser("worker", help="Worker starten (Standard)")
+    worker_parser.add_argument("--once", action="store_true", help="nur den nächsten Job ausführen und beenden")
+    worker_parser.add_argument("--no-schedule", action="store_true", help="keine geplanten Jobs einreihen")
+    enqueue_parser = subparsers.add_parser("enqueue", help="Job einreihen")
+    enqueue_parser.add_argument("kind", choices=sorted(queue.JOB_KINDS))
+    args = parser.parse_args(argv)
+
+    if args.command == "enqueue":
+        with Session(get_db_engine()) as session:
+            job, created = queue.enqueue(session, args.kind, requested_by="cli")
+            print(f"Job {job.id} {job.kind}: {'eingereiht' if created else job.status}")
+        return
+
+    worker = Worker(schedule=not getattr(args, "no_schedule", False))
+    if getattr(args, "once", False):
+        worker.run_once()
+        return
+
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run_forever()
@@ -1,10 +1,9 @@
-from bogan.utils import load_yaml, get_date, get_db_engine, DateFormat
+from bogan.utils import load_yaml, get_date, DateFormat
 import bogan.config as cfg
 
-from sqlalchemy.orm import Session
-from bogan.db.models import Game, Location
-
-engine = get_db_engine()
+from bogan.db.images import image_url
+from bogan.db.models import db
+from bogan.main.lib.fetch_db import select_event_games
 
 events = load_yaml(cfg.EVENT_YAML)
 
@@ -41,60 +40,55 @@ def get_game_list(event_name: str, mode: str) -> list[dict]:
     included_players = _normalize_player_filter(event_dict.get("included_players"))
     included_players_set = set(included_players)
 
-    with Session(engine) as session:
-        match_games = (
-            session.query(Game)
-            .join(Location)
-            .filter(Game.datum >= datum_start, Game.datum <= datum_ende, Location.name == location)
-            .all()
-        )
-        spiele_list = []
-        for match in match_games:
-            spiel_dict = {}
-            spiel_dict["id"] = match.id  # Hinzugefügte Game ID
-            spiel_dict["datum"] = match.datum
-            spiel_dict["datum_fmt"] = match.datum.strftime("%d.%b %Y")
-            spiel_dict["boardgame"] = match.boardgame.name
-            spiel_dict["bgg_id"] = match.boardgame.bgg_id
-            spiel_dict["playtime"] = match.playtime
-            spiel_dict["game_bgg_id"] = match.game_bgg_id
-            spiel_dict["img_small"] = match.boardgame.img_small
-            
-            # Verwende die neue get_sorted_players Methode
-            players_data = match.get_sorted_players()
-
-            # Wenn included_players gesetzt ist, sind nur Spiele erlaubt,
-            # deren komplette Spielerliste in der Whitelist enthalten ist.
-            # In diesem Modus wird ignored_player bewusst nicht kombiniert.
-            if included_players:
-                game_player_names = {player["name"] for player in players_data}
-                if not game_player_names.issubset(included_players_set):
-                    continue
-            elif ignored_players:
-                # Standardmodus: optional Spieler ausblenden, wenn nur ignored_player gesetzt ist.
-                players_data = [p for p in players_data if p["name"] not in ignored_players]
-            
-            # Filtere Spieler ohne Punkte heraus (falls gewünscht)
-            players_with_points = [player for player in players_data if player["punkte"] is not None]
+    session = db.session
+    match_games = session.scalars(select_event_games(datum_start, datum_ende, location)).all()
+    spiele_list = []
+    for match in match_games:
+        spiel_dict = {}
+        spiel_dict["id"] = match.id  # Hinzugefügte Game ID
+        spiel_dict["datum"] = match.datum
+        spiel_dict["datum_fmt"] = match.datum.strftime("%d.%b %Y")
+        spiel_dict["boardgame"] = match.boardgame.name
+        spiel_dict["bgg_id"] = match.boardgame.bgg_id
+        spiel_dict["playtime"] = match.playtime
+        spiel_dict["game_bgg_id"] = match.game_bgg_id
+        spiel_dict["img_small"] = image_url(match.boardgame, "small")
+        
+        # Verwende die neue get_sorted_players Methode
+        players_data = match.get_sorted_players()
+
+        # Wenn included_players gesetzt ist, sind nur Spiele erlaubt,
+        # deren komplette Spielerliste in der Whitelist enthalten ist.
+        # In diesem Modus wird ignored_player bewusst nicht kombiniert.
+        if included_players:
+            game_player_names = {player["name"] for player in players_data}
+            if not game_player_names.issubset(included_players_set):
+                continue
+        elif ignored_players:
+            # Standardmodus: optional Spieler ausblenden, wenn nur ignored_player gesetzt ist.
+            players_data = [p for p in players_data if p["name"] not in ignored_players]
+        
+        # Filtere Spieler ohne Punkte heraus (falls gewünscht)
+        players_with_points = [player for player in players_data if player["punkte"] is not None]
+        
+        if players_with_points:
+            # TODO: wenn keine Playtime gesetzt, soll der Default Wert aus BGG genommen werden
+            match_playtime = (
+                match.playtime / 60 if match.playtime > 10 else 0.5
+            )  # wenn keine Match Playtime gesetzt wird 30min angenommen
             
-            if players_with_points:
-                # TODO: wenn keine Playtime gesetzt, soll der Default Wert aus BGG genommen werden
-                match_playtime = (
-                    match.playtime / 60 if match.playtime > 10 else 0.5
-                )  # wenn keine Match Playtime gesetzt wird 30min angenommen
-                
-                spiel_dict["players"] = create_ranking(
-                    players_with_points, mode=mode, playtime_hours=match_playtime, complexity=match.boardgame.weight
-                )
-            else:
-                spiel_dict["players"] = players_data
+            spiel_dict["players"] = create_ranking(
+                players_with_points, mode=mode, playtime_hours=match_playtime, complexity=match.boardgame.weight
+            )
+        else:
+            spiel_dict["players"] = players_data
 
-            spiele_list.append(spiel_dict)
+        spiele_list.append(spiel_dict)
 
-        # Spiele nach Datum sortieren -> neuestes Spiel zuerst
-        spiele_list = sorted(spiele_list, key=lambda x: x["datum"], reverse=True)
+    # Spiele nach Datum sortieren -> neuestes Spiel zuerst
+    spiele_list = sorted(spiele_list, key=lambda x: x["datum"], reverse=True)
 
-        return spiele_list
+    return spiele_list
 
 
 def create_ranking(players, mode='default', playtime_hours=1, complexity=1):
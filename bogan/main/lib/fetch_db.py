@@ -1,9 +1,74 @@
-from sqlalchemy.orm import Session
+from datetime import date
 
-from bogan.utils import get_db_engine
-from bogan.db.models import Game, Boardgame, Location
+from sqlalchemy import Select, desc, select
+from sqlalchemy.orm import Session, contains_eager, joinedload, selectinload
 
-engine = get_db_engine()
+from bogan.db.models import Game, Boardgame, Location, Player, PlayerPos
+
+# Ladeoptionen für Abfragen auf Game, z.B. session.query(Game).options(*GAME_WITH_PLAYERS).
+# Ohne sie lädt jeder Zugriff auf game.boardgame, game.location oder game.player_pos (get_sorted_players) einzeln
+# nach, eine Seite mit n Partien braucht dann mehrere Statements pro Partie.
+
+# Partie mit Spielern: ein weiteres Statement für alle PlayerPos inkl. Player (WHERE game_id IN ...)
+GAME_WITH_PLAYERS = (selectinload(Game.player_pos).joinedload(PlayerPos.player),)
+# Partie mit Brettspiel und Ort: im selben Statement per LEFT OUTER JOIN
+GAME_WITH_BOARDGAME_AND_LOCATION = (joinedload(Game.boardgame), joinedload(Game.location))
+# wie GAME_WITH_BOARDGAME_AND_LOCATION, für Abfragen mit join(Boardgame).join(Location) (Filter/Sortierung).
+# Die Spalten kommen aus diesen Joins, es wird nicht ein zweites Mal gejoint.
+GAME_WITH_BOARDGAME_AND_LOCATION_JOINED = (contains_eager(Game.boardgame), contains_eager(Game.location))
+
+# Abfragen der Routen auf Game, ausgeführt mit session.scalars(...). Die Query-Pläne werden mit denselben Funktionen
+# geprüft (bogan.db.query_plans), Änderungen hier sind dort automatisch abgedeckt.
+
+
+def select_latest_games(limit: int = None) -> Select:
+    """Partien mit Brettspiel, Ort und Spielern, neueste zuerst (Startseite, Übersicht aller Partien)"""
+    games = (
+        select(Game)
+        .join(Boardgame)
+        .join(Location)
+        .options(*GAME_WITH_BOARDGAME_AND_LOCATION_JOINED, *GAME_WITH_PLAYERS)
+        .order_by(Game.datum.desc())
+    )
+    return games.limit(limit) if limit else games
+
+
+def select_boardgame_games(boardgame_id: int, ignore_solo: bool = True) -> Select:
+    """Partien eines Brettspiels (bgg_id) mit Brettspiel, Ort und Spielern, neueste zuerst"""
+    games = (
+        select(Game)
+        .join(Boardgame)
+        .join(Location)
+        .options(*GAME_WITH_BOARDGAME_AND_LOCATION_JOINED, *GAME_WITH_PLAYERS)
+        .where(Boardgame.bgg_id == boardgame_id)
+        .order_by(Game.datum.desc())
+    )
+    if ignore_solo:
+        games = games.where(Location.name != "Solospiel")
+    return games
+
+
+def select_event_games(datum_start: date, datum_ende: date, location: str) -> Select:
+    """Partien eines Events (Zeitraum und Ort) mit Brettspiel, Ort und Spielern"""
+    return (
+        select(Game)
+        .join(Location)
+        .options(contains_eager(Game.location), joinedload(Game.boardgame), *GAME_WITH_PLAYERS)
+        .where(Game.datum >= datum_start, Game.datum <= datum_ende, Location.name == location)
+    )
+
+
+def select_player_games(player_name: str = None) -> Select:
+    """Partien eines Spielers (ohne Name: alle Partien) mit Brettspiel, Ort und Spielern, neueste zuerst"""
+    games = select(Game).options(*GAME_WITH_BOARDGAME_AND_LOCATION, *GAME_WITH_PLAYERS).order_by(desc(Game.datum))
+    if player_name is not None:
+        games = games.join(PlayerPos).join(Player).where(Player.name == player_name)
+    return games
+
+
+def select_game(game_id: int) -> Select:
+    """Eine Partie mit Brettspiel, Ort und Spielern"""
+    return select(Game).options(*GAME_WITH_BOARDGAME_AND_LOCATION, *GAME_WITH_PLAYERS).where(Game.id == game_id)
 
 
 def get_boardgame_by(id: str, session: Session):
@@ -27,13 +92,9 @@ def get_games_by(boardgame_id: int, session: Session, ignore_solo:bool=True):
     Returns:
         Game: SQL Object mit allen Spielen zu einem Boardgame
     """
-    print(f"Type ID: {type(boardgame_id)}")
-    games = session.query(Game).join(Boardgame).join(Location).filter(Boardgame.bgg_id == boardgame_id).order_by(Game.datum.desc())
-    if ignore_solo:
-        games = games.filter(Location.name != "Solospiel")
-    games = games.all()
+    games = session.scalars(select_boardgame_games(boardgame_id, ignore_solo)).all()
     
-    # Sortiere die Spiele nach Punkten
+    # Sortiere die Spieler nach Punkten, Spieler ohne Punkte zuletzt
     for game in games:
-        game.player_pos = sorted(game.player_pos, key=lambda x: x.points, reverse=True)
+        game.player_pos = sorted(game.player_pos, key=lambda x: (x.points is not None, x.points or 0), reverse=True)
     return games
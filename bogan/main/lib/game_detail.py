@@ -7,7 +7,8 @@ for display in the game detail template.
 
 from typing import Dict, Any, List
 from sqlalchemy.orm import Session
-from bogan.db.models import Game
+from bogan.db.images import image_url
+from bogan.main.lib.fetch_db import select_game
 
 
 def get_game_detail_data(game_id: int, session: Session) -> Dict[str, Any]:
@@ -25,7 +26,7 @@ def get_game_detail_data(game_id: int, session: Session) -> Dict[str, Any]:
         ValueError: Wenn das Spiel nicht gefunden wird
     """
     # Lade das Spiel mit allen zugehörigen Daten
-    game = session.query(Game).filter(Game.id == game_id).first()
+    game = session.scalars(select_game(game_id)).first()
     
     if not game:
         raise ValueError(f"Partie mit ID {game_id} nicht gefunden")
@@ -42,8 +43,8 @@ def get_game_detail_data(game_id: int, session: Session) -> Dict[str, Any]:
         'boardgame': {
             'id': game.boardgame.bgg_id,
             'name': game.boardgame.name,
-            'img': game.boardgame.img,
-            'img_small': game.boardgame.img_small,
+            'img': image_url(game.boardgame, 'large'),
+            'img_small': image_url(game.boardgame, 'small'),
             'playtime': game.boardgame.playtime,
             'weight': game.boardgame.weight,
             'minplayers': game.boardgame.minplayers,
@@ -6,8 +6,8 @@ Berechnet Statistiken und Rankings für einzelne Spieler.
 
 from typing import List, Dict, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from bogan.db.models import Game, PlayerPos, Player
+from bogan.db.models import Game, Player
+from bogan.main.lib.fetch_db import select_player_games
 from collections import defaultdict
 import bogan.config as cfg
 
@@ -47,26 +47,40 @@ def group_games_by_month(games: List[Dict[str, Any]]) -> Dict[str, List[Dict[str
     return dict(months)
 
 
-def get_player_stats(player_name: str, session: Session) -> Dict[str, Any]:
+def get_games_by_player(session: Session) -> Dict[str, List[Game]]:
+    """
+    Lädt alle Spiele mit einer Abfrage und ordnet sie den Spielern zu (neuestes Spiel zuerst).
+    Für Seiten mit den Statistiken aller Spieler, statt get_player_stats für jeden Spieler abfragen zu lassen.
+    
+    Args:
+        session: SQLAlchemy Session
+        
+    Returns:
+        Dictionary mit Spielernamen als Keys und ihren Spielen als Values
+    """
+    games = session.scalars(select_player_games()).all()
+    games_by_player = defaultdict(list)
+    for game in games:
+        for player_pos in game.player_pos:
+            games_by_player[player_pos.player.name].append(game)
+    return dict(games_by_player)
+
+
+def get_player_stats(player_name: str, session: Session, player_games: List[Game] = None) -> Dict[str, Any]:
     """
     Berechnet umfassende Statistiken für einen Spieler.
     
     Args:
         player_name: Name des Spielers
         session: SQLAlchemy Session
+        player_games: bereits geladene Spiele des Spielers (siehe get_games_by_player), sonst werden sie abgefragt
         
     Returns:
         Dictionary mit Spielerstatistiken
     """
     # Alle Spiele des Spielers holen
-    player_games = (
-        session.query(Game)
-        .join(PlayerPos)
-        .join(Player)
-        .filter(Player.name == player_name)
-        .order_by(desc(Game.datum))
-        .all()
-    )
+    if player_games is None:
+        player_games = session.scalars(select_player_games(player_name)).all()
     
     if not player_games:
         return {
@@ -74,6 +88,7 @@ def get_player_stats(player_name: str, session: Session) -> Dict[str, Any]:
             'wins': 0,
             'win_rate': 0,
             'avg_position': 0,
+            'avg_player_count': 0,
             'best_games': [],
             'recent_games': [],
             'boardgame_stats': {}
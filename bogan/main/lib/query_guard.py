@@ -0,0 +1,62 @@
+"""
+Budget für SQL-Statements pro Route
+
+Zählt während eines Requests alle Statements, die über eine Engine ausgeführt werden (auch Flask-SQLAlchemy, z.B.
+der User-Loader des Logins). Braucht eine Route mehr als QUERY_BUDGET Statements, steht das mit Endpoint und Anzahl
+im Log. Mit QUERY_BUDGET_STRICT=1 antwortet die Route stattdessen mit einem Fehler, so fallen fehlende Ladeoptionen
+(N+1 Abfragen, siehe fetch_db.GAME_WITH_PLAYERS) schon beim Entwickeln auf. Im Debug-Modus steht die Anzahl zusätzlich
+im Header X-Query-Count.
+
+Mit den Ladeoptionen ist die Anzahl unabhängig von der Anzahl Partien, nur selectinload braucht pro 500 Partien
+ein weiteres Statement.
+"""
+
+from flask import Blueprint, Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+import bogan.config as cfg
+from bogan.utils import Logger
+
+# Add Logging
+logger = Logger().setup_logger(__file__)
+
+QUERY_COUNT_HEADER = "X-Query-Count"
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def _count_statement(*args):
+    # Statements außerhalb eines Requests (Jobs, CLI) und von Blueprints ohne Budget zählen nicht
+    if has_request_context() and "query_count" in g:
+        g.query_count += 1
+
+
+def init_query_guard(blueprint: Blueprint, budget: int = None):
+    """Prüft für alle Routen des Blueprints die Anzahl Statements
+
+    Args:
+        blueprint (Blueprint): Blueprint, dessen Routen geprüft werden
+        budget (int, optional): erlaubte Statements pro Request, 0 = keine Prüfung. Defaults to cfg.QUERY_BUDGET.
+    """
+    budget = cfg.QUERY_BUDGET if budget is None else budget
+    if not event.contains(Engine, "before_cursor_execute", _count_statement):
+        event.listen(Engine, "before_cursor_execute", _count_statement)
+
+    @blueprint.before_request
+    def start_query_count():
+        g.query_count = 0
+
+    @blueprint.after_request
+    def check_query_count(response: Response) -> Response:
+        count = g.pop("query_count", 0)
+        if current_app.debug:
+            response.headers[QUERY_COUNT_HEADER] = str(count)
+        if budget and count > budget:
+            message = f"[QueryBudget] {request.endpoint} ({request.path}): {count} Statements, erlaubt {budget}"
+            if cfg.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
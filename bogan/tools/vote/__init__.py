@@ -1,7 +1,8 @@
 from flask import Blueprint, render_template, request, redirect, url_for
-from flask_login import login_required
-from bogan.db.ask_bgg import search_boardgame
-from bogan.db.models import Boardgame, db
+from flask_login import current_user, login_required
+from typing import Optional
+from bogan.db.ask_bgg import ask_boardgame, boardgames_from_results, search_results
+from bogan.db.models import Boardgame, VoteSearch, db
 from bogan.utils import Logger
 
 # Add Logging
@@ -9,8 +10,24 @@ logger = Logger().setup_logger(__file__)
 
 vote = Blueprint("vote", __name__, url_prefix="vote", template_folder="templates")
 
-# Global Variable
-current_bg_results: list[Boardgame] = []
+# Suchergebnisse pro User in der Datenbank (VoteSearch), unabhängig von der TTL des BggCache
+
+
+def save_search(user_id: int, results: list[dict]):
+    search = db.session.get(VoteSearch, user_id) or VoteSearch(user_id=user_id)
+    search.set_results(results)
+    db.session.add(search)
+    db.session.commit()
+
+
+def load_selection(user_id: int, bgg_id: str) -> Optional[Boardgame]:
+    """Brettspiel aus der letzten Suche des Users, die Daten kommen aus dem thing-Cache"""
+    search = db.session.get(VoteSearch, user_id)
+    for result in search.get_results() if search else []:
+        if result["id"] == bgg_id:
+            boardgames = ask_boardgame([bgg_id], names=[(result["name"], result["is_primary"])])
+            return boardgames[0] if boardgames else None
+    return None
 
 
 @vote.route("/")
@@ -33,15 +50,10 @@ def add_game():
         # Suche Brettspiel
         if button_pressed == "search_bg":
             search = request.form.get("search_input")
-            found_games = search_boardgame(search=search)
-
-            # save to global Variable
-            global current_bg_results
-            current_bg_results = found_games
-
-            for game in found_games:
-                print(f"type: {type(game)}")
-                print(f"Name: {game.name}, primary_name: {game.name_primary}")
+            results = search_results(search)
+            save_search(current_user.id, results)
+            found_games = boardgames_from_results(results)
+            logger.debug(f"Suche '{search}': {len(found_games)} Spiele gefunden")
 
             return render_template(
                 "vote_add_game.html", found_games=found_games, boardgames=boardgames
@@ -51,9 +63,10 @@ def add_game():
         elif button_pressed == "add_bg":
             # new_game: Boardgame = Boardgame(request.form.get("games"))
             game_id = str(request.form.get("game_id"))
-            for game in current_bg_results:
-                if game_id == str(game.bgg_id):
-                    new_game = game
+            new_game = load_selection(current_user.id, game_id)
+            if new_game is None:
+                logger.warning(f"Spiel {game_id} ist nicht in der letzten Suche von {current_user.name}")
+                return redirect(url_for("tools.vote.add_game"))
 
             boardgame = Boardgame.query.filter_by(bgg_id=new_game.bgg_id).first()
 
@@ -1,7 +1,14 @@
 import os
 import logging
-from typing import Union, Optional, Any
-from sqlalchemy import create_engine
+import threading
+import weakref
+from contextlib import contextmanager
+from functools import partial
+from itertools import islice
+from time import perf_counter
+from typing import Union, Optional, Any, Iterable, Iterator
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 import yaml
 from datetime import datetime
 from enum import Enum
@@ -53,15 +60,181 @@ def nested_get(nested_input: Union[dict, list], keys: list, cast_type: Optional[
     return cast_type(nested_input) if cast_type else nested_input
 
 
-def get_db_engine():
+def chunked(iterable: Iterable, size: int) -> Iterator[list]:
+    """Teilt ein (beliebig langes) Iterable in Listen mit maximal 'size' Einträgen, ohne es komplett zu laden"""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+# eine Engine (und damit ein Pool) pro URL und Prozess, siehe get_db_engine
+_engines: dict[str, Engine] = {}
+_engines_lock = threading.Lock()
+_pool_metrics: "weakref.WeakKeyDictionary[Engine, PoolMetrics]" = weakref.WeakKeyDictionary()
+
+
+class PoolMetrics:
+    """Zähler des Connection-Pools einer Engine
+
+    Attributes:
+        checkouts (int): Verbindungen, die aus dem Pool geholt wurden (eine pro Session/Transaktion)
+        connects (int): neu aufgebaute Verbindungen zur Datenbank
+        invalidated (int): verworfene Verbindungen (z.B. pool_pre_ping fehlgeschlagen, Verbindungsfehler)
+        checked_out (int): aktuell ausgeliehene Verbindungen
+        max_checked_out (int): Maximum von checked_out seit dem Start
+    """
+
+    def __init__(self, engine: Engine):
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidated = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self._lock = threading.Lock()
+        event.listen(engine, "checkout", self._checkout)
+        event.listen(engine, "checkin", self._checkin)
+        event.listen(engine, "connect", self._connect)
+        event.listen(engine, "invalidate", self._invalidate)
+
+    def _checkout(self, *args):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def _checkin(self, *args):
+        with self._lock:
+            self.checked_out -= 1
+
+    def _connect(self, *args):
+        with self._lock:
+            self.connects += 1
+
+    def _invalidate(self, *args):
+        with self._lock:
+            self.invalidated += 1
+
+    def as_dict(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "invalidated": self.invalidated,
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+            }
+
+
+def pool_metrics(engine: Engine) -> Optional[PoolMetrics]:
+    """Zähler des Pools, nur für Engines aus create_db_engine"""
+    return _pool_metrics.get(engine)
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record, wal: bool, busy_timeout: int):
+    cursor = dbapi_connection.cursor()
+    # WAL: Lesende blockieren Schreibende nicht (und umgekehrt), die Einstellung bleibt in der Datei gespeichert
+    if wal:
+        cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(busy_timeout)}")
+    cursor.close()
+
+
+def create_db_engine(url: Union[str, Any], sqlite_busy_timeout: int = None) -> Engine:
+    """
+    Legt eine neue Engine mit den Pool-Einstellungen aus der Config an (DB_POOL_*). Bei SQLite wird statt
+    pool_pre_ping/pool_recycle WAL und busy_timeout gesetzt. Im Normalfall get_db_engine verwenden.
+
+    Args:
+        url (str | URL): Datenbank-URL
+        sqlite_busy_timeout (int, optional): Wartezeit in ms auf eine gesperrte SQLite-Datenbank.
+            Defaults to DB_SQLITE_BUSY_TIMEOUT.
+    """
+    import bogan.config as cfg
+
+    url = make_url(url)
+    options = dict(pool_size=cfg.DB_POOL_SIZE, max_overflow=cfg.DB_POOL_MAX_OVERFLOW, pool_timeout=cfg.DB_POOL_TIMEOUT)
+    sqlite_file = url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+    if url.get_backend_name() == "sqlite":
+        if not sqlite_file:
+            # In-Memory: eigener Pool von SQLAlchemy (eine Verbindung pro Thread), keine Pool-Einstellungen
+            options = {}
+        elif os.path.dirname(url.database):
+            # wenn lokale datenbank verwendet wird, erstelle Ordnerstruktur
+            make_dir(os.path.dirname(url.database))
+    else:
+        # MySQL beendet ungenutzte Verbindungen (wait_timeout), vor der Verwendung prüfen und regelmäßig erneuern
+        options.update(pool_pre_ping=cfg.DB_POOL_PRE_PING, pool_recycle=cfg.DB_POOL_RECYCLE)
+
+    engine = create_engine(url, **options)
+    if sqlite_file:
+        busy_timeout = cfg.DB_SQLITE_BUSY_TIMEOUT if sqlite_busy_timeout is None else sqlite_busy_timeout
+        event.listen(engine, "connect", partial(_sqlite_pragmas, wal=cfg.DB_SQLITE_WAL, busy_timeout=busy_timeout))
+    _pool_metrics[engine] = PoolMetrics(engine)
+    return engine
+
+
+def get_db_engine(url: Union[str, Any] = None) -> Engine:
+    """
+    Engine für url (Standard: DB2USE). Pro Prozess wird für jede URL nur eine Engine samt Pool angelegt,
+    alle Blueprints, der Sync und Flask-SQLAlchemy (db.session) teilen sich diese Engine.
+    """
     import bogan.config as cfg
 
-    # wenn lokale datenbank verwendet wird, erstelle Ordnerstruktur
-    if cfg.DB2USE.startswith("sqlite:///"):
-        path = os.path.dirname(cfg.DB2USE.replace("sqlite:///", ""))
-        make_dir(path)
+    key = make_url(url or cfg.DB2USE).render_as_string(hide_password=False)
+    with _engines_lock:
+        if key not in _engines:
+            _engines[key] = create_db_engine(key)
+        return _engines[key]
+
+
+class QueryCounter:
+    """Zählt alle SQL-Statements, die innerhalb des with-Blocks über die Engine ausgeführt werden"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _count(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._count)
 
-    return create_engine(cfg.DB2USE)
+
+class PhaseTimer:
+    """Summiert die Laufzeit (Wall Time) pro Phase, z.B. `with timer.phase("commit"): ...`
+
+    Threadsicher: laufen Phasen parallel (z.B. Stufen einer Pipeline), ist die Summe größer als die Laufzeit.
+    """
+
+    def __init__(self):
+        self.durations: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str):
+        t_start = perf_counter()
+        try:
+            yield
+        finally:
+            duration = perf_counter() - t_start
+            with self._lock:
+                self.durations[name] = self.durations.get(name, 0.0) + duration
+
+    def iterate(self, name: str, iterable: Iterable) -> Iterator:
+        """Gibt die Elemente von iterable weiter, die Zeit für das Erzeugen jedes Elements zählt zur Phase name"""
+        iterator = iter(iterable)
+        while True:
+            with self.phase(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
 
 
 def load_yaml(yaml_file: str) -> Any:
@@ -0,0 +1,32 @@
+"""
+Gunicorn-Konfiguration
+
+Startet neben den Web-Workern genau einen Job-Worker (`python -m bogan.jobs`) für die Syncs mit BGG,
+damit kein Sync in einem Web-Request läuft. Abschalten mit JOB_WORKER_WITH_GUNICORN=0.
+
+    uv run gunicorn -c gunicorn.conf.py -w 4 -b 0.0.0.0:<port> wsgi:app
+"""
+
+import subprocess
+import sys
+
+from bogan.config import JOB_WORKER_WITH_GUNICORN
+
+_job_worker = None
+
+
+def when_ready(server):
+    global _job_worker
+    if JOB_WORKER_WITH_GUNICORN:
+        _job_worker = subprocess.Popen([sys.executable, "-m", "bogan.jobs"])
+        server.log.info(f"Job-Worker gestartet (pid {_job_worker.pid})")
+
+
+def on_exit(server):
+    if _job_worker is not None and _job_worker.poll() is None:
+        server.log.info("Job-Worker wird beendet")
+        _job_worker.terminate()
+        try:
+            _job_worker.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            _job_worker.kill()
@@ -0,0 +1,97 @@
+"""
+Gemeinsame Fixtures der Tests
+
+Die Konfiguration wird vor dem ersten Import von bogan gesetzt: lokale SQLite-Datenbank, Logs in ein temporäres
+Verzeichnis statt ins Repository. Jeder Test mit `engine` bekommt eine eigene, leere Datenbank.
+"""
+
+import os
+import tempfile
+
+os.environ["DB2USE"] = "local"
+os.environ.setdefault("DB_NAME", "bogan_test")
+os.environ["LOG_DIR"] = tempfile.mkdtemp(prefix="bogan_logs_")
+os.environ["LOG_IN_FILE"] = "0"
+
+import pytest  # noqa: E402
+
+import bogan.config as cfg  # noqa: E402
+
+
+@pytest.fixture
+def db_url(tmp_path, monkeypatch) -> str:
+    """URL einer leeren SQLite-Datenbank, wird auch als DB2USE gesetzt"""
+    url = f"sqlite:///{tmp_path / 'bogan.db'}"
+    monkeypatch.setattr(cfg, "DB2USE", url)
+    return url
+
+
+@pytest.fixture
+def engine(db_url):
+    """Engine mit allen Tabellen der Models, für den Sync als update_db.engine gesetzt"""
+    from bogan.db import update_db
+    from bogan.db.models import Base
+    from bogan.utils import get_db_engine
+
+    engine = get_db_engine(db_url)
+    Base.metadata.create_all(engine)
+    previous = update_db.engine
+    update_db.engine = engine
+    yield engine
+    update_db.engine = previous
+    engine.dispose()
+
+
+@pytest.fixture
+def session(engine):
+    from sqlalchemy.orm import Session
+
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def app(engine):
+    """Flask-App auf der Datenbank von `engine`"""
+    from bogan import create_app
+
+    app = create_app()
+    app.config.update(TESTING=True, SECRET_KEY="test")
+    return app
+
+
+@pytest.fixture
+def admin_client(app, session):
+    """Test-Client mit angemeldetem Admin"""
+    from bogan.db.models import User
+
+    admin = User(name="admin", password="-", role="admin")
+    session.add(admin)
+    session.commit()
+    client = app.test_client()
+    with client.session_transaction() as flask_session:
+        flask_session["_user_id"] = str(admin.id)
+        flask_session["_fresh"] = True
+    return client
+
+
+@pytest.fixture
+def offline_boardgames(monkeypatch):
+    """Sync und Import fragen Boardgames nicht bei BGG ab, sondern bekommen Platzhalter"""
+    from datetime import datetime
+
+    from bogan.db import update_db
+    from bogan.db.models import Boardgame
+
+    def ask_boardgame(ids, refresh=None) -> list[Boardgame]:
+        now = datetime.now()
+        return [
+            Boardgame(
+                bgg_id=bgg_id, name=f"Spiel {bgg_id}", name_primary=f"Spiel {bgg_id}", img="", img_small="",
+                yearpublished=2000, minplayers=1, maxplayers=4, playtime=60, rating=7.0, weight=2.0,
+                fetched_at=now, stats_fetched_at=now,
+            )
+            for bgg_id in ids
+        ]
+
+    monkeypatch.setattr(update_db, "ask_boardgame", ask_boardgame)
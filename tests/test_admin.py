@@ -0,0 +1,77 @@
+from datetime import date
+
+from bogan.db.models import Boardgame, Game, Location, Player, PlayerPos, SyncJob, User
+
+
+def test_dashboard_counts(admin_client, session):
+    session.add_all([Player(name="Anna"), Player(name="Ben"), Location(name="Cafe")])
+    session.commit()
+
+    response = admin_client.get("/admin/")
+
+    assert response.status_code == 200
+    assert b"Gesamtzahl Spieler:</strong> 2" in response.data
+    assert b"Gesamtzahl Locations:</strong> 1" in response.data
+
+
+def test_pages_render(admin_client):
+    for path in ("/admin/events", "/admin/database", "/admin/users", "/admin/sync", "/admin/sync/runs"):
+        assert admin_client.get(path).status_code == 200, path
+
+
+def test_change_user_role(admin_client, session):
+    user = User(name="anna", password="-")
+    session.add(user)
+    session.commit()
+
+    response = admin_client.post(f"/admin/users/role/{user.id}", data={"role": "admin"})
+
+    assert response.status_code == 302
+    session.expire_all()
+    assert session.get(User, user.id).role == "admin"
+
+
+def test_delete_user(admin_client, session):
+    user = User(name="anna", password="-")
+    session.add(user)
+    session.commit()
+    user_id = user.id
+
+    admin_client.post(f"/admin/users/delete/{user_id}")
+
+    session.expire_all()
+    assert session.get(User, user_id) is None
+
+
+def test_admin_cannot_delete_self(admin_client, session):
+    admin = session.query(User).filter_by(name="admin").one()
+
+    admin_client.post(f"/admin/users/delete/{admin.id}")
+
+    session.expire_all()
+    assert session.get(User, admin.id) is not None
+
+
+def test_start_sync_and_job_status(admin_client, session):
+    admin_client.post("/admin/sync/start", data={"kind": "sync_incremental"})
+    admin_client.post("/admin/sync/start", data={"kind": "sync_incremental"})
+
+    jobs = session.query(SyncJob).all()
+    assert [(job.kind, job.status, job.requested_by) for job in jobs] == [("sync_incremental", "queued", "admin")]
+    assert admin_client.get(f"/admin/sync/jobs/{jobs[0].id}").json["status"] == "queued"
+    assert admin_client.get("/admin/sync/jobs").json["active"] is True
+    assert admin_client.get("/admin/sync/jobs/999").status_code == 404
+
+
+def test_game_rankings(app, session):
+    boardgame = Boardgame(bgg_id=13, name="Catan", name_primary="Catan", img="", img_small="", yearpublished=1995,
+                          minplayers=3, maxplayers=4, playtime=90, rating=7.0, weight=2.3)
+    game = Game(game_bgg_id=1, datum=date(2024, 1, 1), boardgame=boardgame, location=Location(name="Cafe"))
+    session.add_all([
+        PlayerPos(game=game, player=Player(name="Anna"), points=10, win=True),
+        PlayerPos(game=game, player=Player(name="Ben"), points=5, win=False),
+    ])
+    session.commit()
+
+    with app.app_context():
+        assert PlayerPos.get_game_rankings(game.id) == {"Anna": 1, "Ben": 2}
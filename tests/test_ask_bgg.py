@@ -0,0 +1,85 @@
+import threading
+from collections import Counter
+
+import pytest
+
+from bogan.db import ask_bgg
+from bogan.db.ask_bgg import ChunkSizer, fetch_boardgames
+from bogan.db.bgg_client import BggApiError
+
+
+class FakeThings:
+    """Ersetzt fetch_things: `flaky` Ids fehlen bei den ersten n Abrufen, `missing` Ids immer, `broken` Ids scheitern"""
+
+    def __init__(self, flaky=None, missing=(), broken=()):
+        self.flaky = flaky or {}
+        self.missing = set(missing)
+        self.broken = set(broken)
+        self.calls = []
+        self.seen = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, ids, repeat=2):
+        with self._lock:
+            self.calls.append(list(ids))
+            self.seen.update(ids)
+            late = {id_ for id_ in ids if self.seen[id_] <= self.flaky.get(id_, 0)}
+        if self.broken & set(ids):
+            raise BggApiError("kaputt")
+        found = [id_ for id_ in ids if id_ not in self.missing and id_ not in late]
+        return [{"@id": id_} for id_ in found], 0.1
+
+
+@pytest.fixture
+def sleeps(monkeypatch) -> list:
+    sleeps = []
+    monkeypatch.setattr(ask_bgg.time, "sleep", sleeps.append)
+    return sleeps
+
+
+def run(fake, ids, monkeypatch, size=4) -> dict:
+    monkeypatch.setattr(ask_bgg, "fetch_things", fake)
+    return fetch_boardgames(ids, sizer=ChunkSizer(minimum=1, maximum=size))
+
+
+def test_all_ids_in_one_chunk(monkeypatch, sleeps):
+    fake = FakeThings()
+    assert set(run(fake, ["1", "2", "3"], monkeypatch)) == {"1", "2", "3"}
+    assert fake.calls == [["1", "2", "3"]]
+    assert sleeps == []
+
+
+def test_single_id_is_retried_with_backoff(monkeypatch, sleeps):
+    monkeypatch.setattr(ask_bgg, "BGG_THING_SINGLE_RETRIES", 1)
+    monkeypatch.setattr(ask_bgg, "BGG_BACKOFF_BASE", 2)
+    # 3 fehlt zweimal: im Chunk und beim ersten Einzelabruf, erst der Versuch nach dem Backoff findet es
+    fake = FakeThings(flaky={"3": 2})
+
+    items = run(fake, ["1", "2", "3", "4"], monkeypatch)
+
+    assert set(items) == {"1", "2", "3", "4"}
+    assert fake.seen["3"] == 3
+    assert sleeps == [2]
+
+
+def test_missing_id_gives_up_after_retries(monkeypatch, sleeps):
+    monkeypatch.setattr(ask_bgg, "BGG_THING_SINGLE_RETRIES", 2)
+    monkeypatch.setattr(ask_bgg, "BGG_BACKOFF_BASE", 1)
+    fake = FakeThings(missing=["9"])
+
+    items = run(fake, ["9"], monkeypatch)
+
+    assert items == {}
+    assert fake.seen["9"] == 3
+    assert sleeps == [1, 2]
+
+
+def test_failed_single_id_is_retried(monkeypatch, sleeps):
+    monkeypatch.setattr(ask_bgg, "BGG_THING_SINGLE_RETRIES", 1)
+    fake = FakeThings(broken=["5"])
+
+    items = run(fake, ["5", "6"], monkeypatch)
+
+    assert set(items) == {"6"}
+    assert fake.seen["5"] == 3
+    assert len(sleeps) == 1
@@ -0,0 +1,104 @@
+import threading
+import time
+
+import pytest
+
+from bogan.db import bgg_cache
+from bogan.db.bgg_cache import BggCache, cache_key
+
+
+class Clock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(bgg_cache.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path) -> BggCache:
+    return BggCache(str(tmp_path / "cache.sqlite"), ttl={"thing": 100, "search": 100}, max_entries={"search": 2})
+
+
+def test_cache_key_is_normalized():
+    assert cache_key("thing", {"stats": 1, "ID": " 13 "}) == cache_key("thing", {"id": "13", "stats": "1"})
+
+
+def test_value_expires_after_ttl(cache, clock):
+    cache.set("thing", {"id": 13}, {"name": "Catan"})
+    clock.now += 99
+    assert cache.get("thing", {"id": 13}) == {"name": "Catan"}
+    clock.now += 1
+    assert cache.get("thing", {"id": 13}) is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_ratio": 0.5}
+
+
+def test_endpoint_without_ttl_is_not_cached(cache):
+    cache.set("plays", {"page": 1}, ["x"])
+    assert cache.get("plays", {"page": 1}) is None
+    assert not cache.enabled("plays")
+
+
+def test_purge_expired(cache, clock):
+    cache.set("thing", {"id": 1}, 1)
+    clock.now += 50
+    cache.set("thing", {"id": 2}, 2)
+    clock.now += 60
+    assert cache.purge_expired() == 1
+    assert cache.get("thing", {"id": 2}) == 2
+
+
+def test_invalidate(cache):
+    cache.set("thing", {"id": 1}, 1)
+    cache.invalidate("thing", {"id": 1})
+    assert cache.get("thing", {"id": 1}) is None
+
+
+def test_least_recently_used_search_is_evicted(cache, clock):
+    for query in ("a", "b"):
+        cache.set("search", {"query": query}, [query])
+        clock.now += 1
+    # a wird gelesen und ist damit jünger als b
+    assert cache.get("search", {"query": "a"}) == ["a"]
+    clock.now += 1
+    cache.set("search", {"query": "c"}, ["c"])
+
+    assert cache.get("search", {"query": "b"}) is None
+    assert cache.get("search", {"query": "a"}) == ["a"]
+    assert cache.get("search", {"query": "c"}) == ["c"]
+
+
+def test_get_or_load_calls_loader_once(cache):
+    calls = []
+    started = threading.Barrier(5)
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return {"name": "Catan"}
+
+    def worker(results: list):
+        started.wait()
+        results.append(cache.get_or_load("thing", {"id": 13}, loader))
+
+    results = []
+    threads = [threading.Thread(target=worker, args=(results,)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"name": "Catan"}] * 5
+
+
+def test_get_or_load_does_not_store_none(cache):
+    assert cache.get_or_load("thing", {"id": 1}, lambda: None) is None
+    assert cache.get_or_load("thing", {"id": 1}, lambda: 1) == 1
@@ -0,0 +1,98 @@
+from collections import deque
+
+import pytest
+from requests.exceptions import ConnectionError
+
+from bogan.db import bgg_client
+from bogan.db.bgg_client import BggClient, parse_retry_after
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, content: bytes = b"", headers: dict = None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.url = "http://bgg.test/thing"
+
+
+class FakeSession:
+    """Liefert die vorgegebenen Antworten der Reihe nach, Exceptions werden geworfen"""
+
+    def __init__(self, *responses):
+        self.responses = deque(responses)
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        response = self.responses.popleft()
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@pytest.fixture
+def sleeps(monkeypatch) -> list[float]:
+    """Wartezeiten des Clients, ohne tatsächlich zu warten"""
+    delays = []
+    monkeypatch.setattr(bgg_client.time, "sleep", delays.append)
+    return delays
+
+
+def make_client(*responses, max_retries: int = 3) -> BggClient:
+    client = BggClient(base_url="http://bgg.test", token=None, requests_per_second=0, max_retries=max_retries,
+                       backoff_base=1, backoff_max=60)
+    client.session = FakeSession(*responses)
+    return client
+
+
+def test_success_without_retry(sleeps):
+    client = make_client(FakeResponse(200, b"<items/>"))
+    assert client.get("thing", {"id": 1}) == b"<items/>"
+    assert client.stats.calls == 1 and client.stats.retries == 0 and client.stats.bytes == 8
+    assert sleeps == []
+
+
+def test_retries_server_errors_with_exponential_backoff(sleeps):
+    client = make_client(FakeResponse(503), FakeResponse(500), ConnectionError("reset"), FakeResponse(200, b"ok"))
+    assert client.get("thing", {"id": 1}) == b"ok"
+    assert client.session.calls == 4
+    assert client.stats.retries == 3
+    # Jitter: Wartezeit liegt zwischen der Hälfte und dem vollen exponentiellen Wert (1, 2, 4 s)
+    for attempt, delay in enumerate(sleeps):
+        assert 2**attempt / 2 <= delay <= 2**attempt
+
+
+def test_retry_after_has_priority(sleeps):
+    client = make_client(FakeResponse(429, headers={"Retry-After": "7"}), FakeResponse(200, b"ok"))
+    assert client.get("plays", {"page": 1}) == b"ok"
+    assert 7 <= sleeps[0] <= 8
+
+
+def test_polls_on_202_until_ready(sleeps):
+    client = make_client(FakeResponse(202), FakeResponse(202), FakeResponse(200, b"ready"))
+    assert client.get("plays", {"page": 1}) == b"ready"
+    assert client.stats.polls == 2
+
+
+def test_gives_up_after_max_retries(sleeps):
+    client = make_client(*[FakeResponse(503)] * 3, max_retries=2)
+    assert client.get("thing", {"id": 1}) is None
+    assert client.session.calls == 3
+    assert client.stats.failures == 1
+    assert len(sleeps) == 2
+
+
+def test_no_retry_on_client_error(sleeps):
+    client = make_client(FakeResponse(404))
+    assert client.get("thing", {"id": 1}) is None
+    assert client.session.calls == 1 and sleeps == []
+
+
+def test_backoff_is_capped():
+    client = BggClient(base_url="http://bgg.test", token=None, backoff_base=1, backoff_max=10)
+    assert all(5 <= client.backoff(attempt) <= 10 for attempt in range(5, 15))
+
+
+@pytest.mark.parametrize("value, expected", [("12", 12.0), ("-3", 0.0), ("", None), ("kein Datum", None)])
+def test_parse_retry_after(value, expected):
+    assert parse_retry_after(value) == expected
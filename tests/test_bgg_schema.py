@@ -0,0 +1,87 @@
+from datetime import date
+
+import pytest
+
+from bogan.db.bgg_schema import PLAY, THING, Field, Schema, SchemaError, flag
+
+
+def make_play(**overrides) -> dict:
+    play = {
+        "@id": "42",
+        "@date": "2024-03-01",
+        "@length": "60",
+        "@location": "Daheim",
+        "item": {"@name": "Catan", "@objectid": "13"},
+        "players": {
+            "player": [
+                {"@name": "Anna", "@username": "anna", "@score": "10", "@win": "1"},
+                {"@name": "Ben", "@username": "", "@score": "", "@win": "0"},
+            ]
+        },
+    }
+    play.update(overrides)
+    return play
+
+
+def test_play_is_extracted_with_types_and_defaults():
+    play = PLAY.extract(make_play())
+
+    assert (play["id"], play["date"], play["length"], play["bgg_id"]) == (42, date(2024, 3, 1), 60, 13)
+    assert play["players"] == [
+        {"name": "Anna", "username": "anna", "score": 10.0, "win": True},
+        {"name": "Ben", "username": None, "score": 0.0, "win": False},
+    ]
+
+
+def test_single_player_and_empty_players():
+    single = {"player": {"@name": "Anna", "@score": "3", "@win": "1"}}
+    assert [player["name"] for player in PLAY.extract(make_play(players=single))["players"]] == ["Anna"]
+    assert PLAY.extract(make_play(players=None))["players"] == []
+    assert PLAY.extract({k: v for k, v in make_play().items() if k != "players"})["players"] == []
+
+
+def test_missing_required_field():
+    with pytest.raises(SchemaError) as error:
+        PLAY.extract(make_play(item={"@name": "Catan"}))
+
+    assert error.value.record_id == "42"
+    assert error.value.problems == ["bgg_id fehlt"]
+
+
+def test_invalid_value_and_changed_structure_are_reported():
+    with pytest.raises(SchemaError) as error:
+        PLAY.extract(make_play(**{"@date": "gestern", "item": "Catan"}))
+
+    assert len(error.value.problems) == 3
+    assert any(problem.startswith("date: ungültiger Wert") for problem in error.value.problems)
+    assert any(problem.startswith("bgg_id: Struktur abweichend") for problem in error.value.problems)
+
+
+def test_invalid_player_is_reported_with_field_name():
+    players = {"player": [{"@name": "Anna", "@score": "viel"}]}
+    with pytest.raises(SchemaError) as error:
+        PLAY.extract(make_play(players=players))
+
+    assert error.value.problems == ["players: score: ungültiger Wert 'viel'"]
+
+
+def test_thing_with_links_and_stats():
+    thing = THING.extract(
+        {
+            "@id": "13",
+            "name": [{"@type": "primary", "@value": "Catan"}],
+            "thumbnail": "https://example.org/t.jpg",
+            "minplayers": {"@value": "3"},
+            "statistics": {"ratings": {"average": {"@value": "7.1"}, "averageweight": {"@value": "2.3"}}},
+            "link": {"@type": "boardgamemechanic", "@value": "Cooperative Game"},
+        }
+    )
+
+    assert (thing["bgg_id"], thing["name"], thing["img"], thing["minplayers"]) == (13, "Catan", "", 3)
+    assert (thing["rating"], thing["weight"], thing["maxplayers"]) == (7.1, 2.3, None)
+    assert thing["links"] == [{"type": "boardgamemechanic", "value": "Cooperative Game"}]
+
+
+def test_default_must_match_type():
+    with pytest.raises(TypeError):
+        Schema("broken", {"win": Field(("@win",), flag, default="no")})
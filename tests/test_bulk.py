@@ -0,0 +1,70 @@
+from datetime import date
+
+from sqlalchemy import func, select
+
+from bogan.db.bulk import bulk_delete, bulk_upsert
+from bogan.db.models import Game, Location, Player, PlayerPos
+from bogan.db.update_db import GAME_UPDATE_COLUMNS, PLAYER_POS_UPDATE_COLUMNS
+
+
+def game_rows(count: int, playtime: int = 30) -> list[dict]:
+    return [
+        {
+            "game_bgg_id": 1000 + i,
+            "datum": date(2024, 1, 1 + i % 28),
+            "playtime": playtime,
+            "boardgame_id": 1,
+            "location_id": 1,
+            "digest": f"digest-{i}-{playtime}",
+        }
+        for i in range(count)
+    ]
+
+
+def count(session, model) -> int:
+    return session.scalar(select(func.count()).select_from(model))
+
+
+def test_bulk_upsert_is_idempotent(session):
+    rows = game_rows(7)
+    assert bulk_upsert(session, Game, rows, ["game_bgg_id"], GAME_UPDATE_COLUMNS, batch_size=3) == 7
+    ids = dict(session.execute(select(Game.game_bgg_id, Game.id)).all())
+
+    bulk_upsert(session, Game, rows, ["game_bgg_id"], GAME_UPDATE_COLUMNS, batch_size=3)
+    session.commit()
+
+    assert count(session, Game) == 7
+    assert dict(session.execute(select(Game.game_bgg_id, Game.id)).all()) == ids
+
+
+def test_bulk_upsert_updates_existing_rows(session):
+    bulk_upsert(session, Game, game_rows(5), ["game_bgg_id"], GAME_UPDATE_COLUMNS)
+    bulk_upsert(session, Game, game_rows(6, playtime=90), ["game_bgg_id"], GAME_UPDATE_COLUMNS)
+    session.commit()
+
+    assert count(session, Game) == 6
+    assert set(session.scalars(select(Game.playtime))) == {90}
+
+
+def test_bulk_upsert_player_pos_composite_key(session):
+    session.add_all([Location(name="Daheim"), Player(name="Anna"), Player(name="Ben")])
+    session.flush()
+    bulk_upsert(session, Game, game_rows(1), ["game_bgg_id"], GAME_UPDATE_COLUMNS)
+    game_id = session.scalar(select(Game.id))
+    rows = [
+        {"game_id": game_id, "player_id": 1, "points": 10.0, "win": False, "position": 2},
+        {"game_id": game_id, "player_id": 2, "points": 12.0, "win": True, "position": 1},
+    ]
+    index = ["game_id", "player_id"]
+
+    bulk_upsert(session, PlayerPos, rows, index, PLAYER_POS_UPDATE_COLUMNS)
+    rows[0].update(points=14.0, win=True, position=1)
+    bulk_upsert(session, PlayerPos, rows, index, PLAYER_POS_UPDATE_COLUMNS)
+    session.commit()
+
+    assert count(session, PlayerPos) == 2
+    anna = session.scalars(select(PlayerPos).filter_by(player_id=1)).one()
+    assert (anna.points, anna.win, anna.position) == (14.0, True, 1)
+
+    assert bulk_delete(session, PlayerPos, [anna.id]) == 1
+    assert count(session, PlayerPos) == 1
@@ -0,0 +1,53 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+from bogan.db.models import Boardgame, Game, Location, Player, PlayerPos
+from bogan.main.lib.fetch_db import get_games_by
+
+
+def add_game(session, boardgame, location, game_bgg_id, points):
+    game = Game(game_bgg_id=game_bgg_id, datum=date(2024, 1, game_bgg_id), boardgame=boardgame, location=location)
+    session.add(game)
+    for i, value in enumerate(points):
+        player = session.query(Player).filter_by(name=f"Spieler {i}").first() or Player(name=f"Spieler {i}")
+        session.add(PlayerPos(game=game, player=player, points=value, win=False))
+    return game
+
+
+@pytest.fixture
+def boardgame(session):
+    boardgame = Boardgame(bgg_id=13, name="Catan", name_primary="Catan", img="", img_small="", yearpublished=1995,
+                          minplayers=3, maxplayers=4, playtime=90, rating=7.0, weight=2.3)
+    cafe, solo = Location(name="Cafe"), Location(name="Solospiel")
+    add_game(session, boardgame, cafe, 1, [3, None, 10])
+    add_game(session, boardgame, cafe, 2, [None, None])
+    add_game(session, boardgame, solo, 3, [5])
+    session.commit()
+    session.expunge_all()
+    return boardgame
+
+
+def test_players_sorted_by_points_without_points_last(session, boardgame):
+    games = get_games_by(13, session)
+
+    assert [game.game_bgg_id for game in games] == [2, 1]
+    assert [pos.points for pos in games[1].player_pos] == [10, 3, None]
+    assert [pos.points for pos in games[0].player_pos] == [None, None]
+
+
+def test_solo_games(session, boardgame):
+    assert [game.game_bgg_id for game in get_games_by(13, session, ignore_solo=False)] == [3, 2, 1]
+
+
+def test_players_loaded_with_games(session, engine, boardgame):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    games = get_games_by(13, session)
+    names = [pos.player.name for game in games for pos in game.player_pos]
+
+    # eine Abfrage für die Partien mit Brettspiel und Ort, eine für alle Spieler
+    assert len(statements) == 2
+    assert len(names) == 5
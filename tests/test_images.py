@@ -0,0 +1,118 @@
+import json
+import os
+from io import BytesIO
+
+import pytest
+from sqlalchemy import select
+
+from bogan.db import images
+from bogan.db.models import Boardgame
+
+IMG = "https://cf.geekdo-images.com/original/pic1.png"
+THUMB = "https://cf.geekdo-images.com/thumb/pic1.jpg"
+
+
+class FakeResponse:
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeHttp:
+    def __init__(self, contents: dict[str, bytes]):
+        self.contents = contents
+        self.urls = []
+
+    def get(self, url, timeout=None):
+        self.urls.append(url)
+        return FakeResponse(self.contents[url])
+
+
+def png(width: int, height: int) -> bytes:
+    image_module = pytest.importorskip("PIL.Image")
+    buffer = BytesIO()
+    image_module.new("RGB", (width, height), "red").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def boardgame(session) -> Boardgame:
+    boardgame = Boardgame(
+        bgg_id=13, name="Catan", name_primary="Catan", img=IMG, img_small=THUMB,
+        yearpublished=1995, minplayers=3, maxplayers=4, playtime=90, rating=7.1, weight=2.3,
+    )
+    session.add(boardgame)
+    session.commit()
+    return boardgame
+
+
+def mirror(engine, monkeypatch, tmp_path, contents: dict[str, bytes]) -> tuple[FakeHttp, str]:
+    http = FakeHttp(contents)
+    monkeypatch.setattr(images.requests, "Session", lambda: http)
+    path = str(tmp_path / "images")
+    images.mirror_images(engine, path=path)
+    return http, path
+
+
+def stored_files(session) -> dict[str, str]:
+    session.expire_all()
+    return json.loads(session.scalars(select(Boardgame.img_files)).one())
+
+
+def read(path: str, filename: str) -> bytes:
+    with open(os.path.join(path, filename), "rb") as file:
+        return file.read()
+
+
+def test_without_pillow_small_variants_use_thumbnail(engine, session, boardgame, monkeypatch, tmp_path):
+    monkeypatch.setattr(images, "Image", None)
+    _, path = mirror(engine, monkeypatch, tmp_path, {IMG: b"original", THUMB: b"thumbnail"})
+
+    files = stored_files(session)
+    assert read(path, files["large"]) == b"original"
+    assert read(path, files["small"]) == b"thumbnail"
+    assert files["medium"] == files["small"]
+    assert files["small"].endswith(".jpg") and files["large"].endswith(".png")
+
+
+def test_without_pillow_old_mirror_is_renewed(engine, session, boardgame, monkeypatch, tmp_path):
+    monkeypatch.setattr(images, "Image", None)
+    path = str(tmp_path / "images")
+    os.makedirs(path)
+    open(os.path.join(path, "13-old.png"), "wb").close()
+    boardgame.img_source = IMG
+    boardgame.img_files = json.dumps({variant: "13-old.png" for variant in ("small", "medium", "large")})
+    session.commit()
+
+    assert images.needs_mirror(boardgame, path)
+
+    mirror(engine, monkeypatch, tmp_path, {IMG: b"original", THUMB: b"thumbnail"})
+    session.refresh(boardgame)
+    assert not images.needs_mirror(boardgame, path)
+    assert not os.path.exists(os.path.join(path, "13-old.png"))
+
+
+def test_without_pillow_no_thumbnail_uses_image(engine, session, boardgame, monkeypatch, tmp_path):
+    monkeypatch.setattr(images, "Image", None)
+    boardgame.img_small = IMG
+    session.commit()
+
+    http, _ = mirror(engine, monkeypatch, tmp_path, {IMG: b"original"})
+
+    assert http.urls == [IMG]
+    assert len(set(stored_files(session).values())) == 1
+
+
+def test_with_pillow_variants_are_resized(engine, session, boardgame, monkeypatch, tmp_path):
+    http, path = mirror(engine, monkeypatch, tmp_path, {IMG: png(1000, 500)})
+
+    # das Thumbnail wird nicht gebraucht, die Varianten entstehen aus dem großen Bild
+    assert http.urls == [IMG]
+    from PIL import Image
+
+    files = stored_files(session)
+    for variant, width in images.IMAGE_VARIANTS.items():
+        with Image.open(os.path.join(path, files[variant])) as image:
+            assert image.size == (width, width // 2)
@@ -0,0 +1,99 @@
+import gzip
+import json
+
+import pytest
+from sqlalchemy import func, select
+
+from bogan.db import importer
+from bogan.db.models import Game, Player, PlayerPos
+
+CSV = """play_id,date,bgg_id,length,location,player,username,score,win
+a1,2019-05-01,13,60,Cafe,Anna,,12,1
+a1,2019-05-01,13,60,Cafe,Ben,ben,9,0
+a2,2019-05-02,822,45,Daheim,Anna,,30,0
+a2,2019-05-02,822,45,Daheim,Cleo,,31,x
+"""
+
+
+def flat_plays(count: int) -> list[dict]:
+    return [
+        {
+            "id": f"p{i}",
+            "date": f"2020-01-{1 + i % 28:02d}",
+            "bgg_id": 100 + i % 3,
+            "length": 30,
+            "location": "Daheim",
+            "players": [{"name": "Anna", "score": i, "win": True}, {"name": "Ben", "score": 0, "win": False}],
+        }
+        for i in range(count)
+    ]
+
+
+def count(session, model) -> int:
+    session.expire_all()
+    return session.scalar(select(func.count()).select_from(model))
+
+
+@pytest.fixture
+def import_plays(engine, offline_boardgames):
+    def import_plays(path, **kwargs):
+        kwargs.setdefault("batch_size", 10)
+        kwargs.setdefault("commit_every", 20)
+        return importer.import_plays(str(path), **kwargs)
+
+    return import_plays
+
+
+def test_csv_rows_are_grouped_into_plays(import_plays, session, tmp_path):
+    path = tmp_path / "plays.csv"
+    path.write_text(CSV)
+
+    counts = import_plays(path, source="bgstats")
+
+    assert counts["game_inserted"] == 2
+    assert count(session, PlayerPos) == 4
+    assert set(session.scalars(select(Player.name))) == {"Anna", "Ben", "Cleo"}
+    winners = session.scalars(select(Player.name).join(PlayerPos).where(PlayerPos.win)).all()
+    assert sorted(winners) == ["Anna", "Cleo"]
+    # importierte Spiele haben negative Ids, der Sync mit BGG löscht sie nicht
+    assert all(game_bgg_id < 0 for game_bgg_id in session.scalars(select(Game.game_bgg_id)))
+
+
+def test_reimport_is_idempotent(import_plays, session, tmp_path):
+    path = tmp_path / "plays.ndjson.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as file:
+        file.writelines(json.dumps(play) + "\n" for play in flat_plays(45))
+
+    first = import_plays(path)
+    second = import_plays(path)
+
+    assert first["game_inserted"] == 45
+    assert (second["game_inserted"], second["game_unchanged"]) == (0, 45)
+    assert count(session, Game) == 45
+
+
+def test_other_source_gets_other_ids(import_plays, session, tmp_path):
+    path = tmp_path / "plays.json"
+    path.write_text(json.dumps(flat_plays(5)))
+
+    import_plays(path, file_format="bgg", source="a")
+    import_plays(path, file_format="bgg", source="b")
+
+    assert count(session, Game) == 10
+
+
+def test_keep_ids(import_plays, session, tmp_path):
+    path = tmp_path / "plays.ndjson"
+    plays = flat_plays(3)
+    for index, play in enumerate(plays):
+        play["id"] = str(500 + index)
+    path.write_text("\n".join(json.dumps(play) for play in plays))
+
+    import_plays(path, keep_ids=True)
+
+    assert set(session.scalars(select(Game.game_bgg_id))) == {500, 501, 502}
+
+
+def test_unknown_extension():
+    with pytest.raises(ValueError):
+        importer.detect_format("plays.xml")
@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from bogan.db.models import SyncJob
+from bogan.jobs import queue
+from bogan.jobs.worker import Worker
+
+
+def test_enqueue_deduplicates_active_jobs(session):
+    job, created = queue.enqueue(session, "sync", "anna")
+    again, created_again = queue.enqueue(session, "sync", "ben")
+
+    assert created and not created_again
+    assert again.id == job.id
+    assert queue.enqueue(session, "metadata")[1]
+
+
+def test_enqueue_rejects_unknown_kind(session):
+    with pytest.raises(ValueError):
+        queue.enqueue(session, "unknown")
+
+
+def test_only_one_job_runs_at_a_time(session):
+    first, _ = queue.enqueue(session, "sync")
+    second, _ = queue.enqueue(session, "metadata")
+
+    assert queue.claim_next(session).id == first.id
+    # die Sperre running_lock verhindert den Start des zweiten Jobs
+    assert queue.claim_next(session) is None
+    session.refresh(second)
+    assert second.status == "queued"
+
+    queue.finish(session, first.id)
+    assert queue.claim_next(session).id == second.id
+
+
+def test_release_stale_frees_the_lock(session):
+    job, _ = queue.enqueue(session, "sync")
+    queue.claim_next(session)
+    waiting, _ = queue.enqueue(session, "metadata")
+    session.execute(
+        update(SyncJob).where(SyncJob.id == job.id).values(heartbeat_at=datetime.now() - timedelta(hours=1))
+    )
+    session.commit()
+
+    assert queue.release_stale(session, stale_after=60) == 1
+    session.refresh(job)
+    assert (job.status, job.running_lock) == ("failed", None)
+    assert queue.claim_next(session).id == waiting.id
+
+
+def test_run_now_holds_the_lock(engine, session):
+    waiting, _ = queue.enqueue(session, "metadata")
+    claimed = []
+
+    def handler(progress):
+        # während der Sync von der Kommandozeile läuft, startet der Worker keinen Job
+        with Session(engine) as other:
+            claimed.append(queue.claim_next(other))
+        progress(5, "läuft")
+
+    Worker(engine, schedule=False).run_now("import", handler)
+
+    assert claimed == [None]
+    job = session.scalars(select(SyncJob).where(SyncJob.kind == "import")).one()
+    assert (job.status, job.running_lock, job.requested_by, job.progress) == ("done", None, "cli", 5)
+    assert queue.claim_next(session).id == waiting.id
+
+
+def test_run_now_refuses_while_a_job_runs(engine, session):
+    queue.enqueue(session, "sync")
+    queue.claim_next(session)
+    called = []
+
+    with pytest.raises(queue.JobLocked):
+        Worker(engine, schedule=False).run_now("sync", called.append)
+
+    assert called == []
+    assert session.scalars(select(SyncJob).where(SyncJob.status == "running")).one().kind == "sync"
+
+
+def test_run_now_releases_the_lock_on_error(engine, session):
+    def handler(progress):
+        raise ConnectionError("BGG nicht erreichbar")
+
+    with pytest.raises(RuntimeError, match="BGG nicht erreichbar"):
+        Worker(engine, schedule=False).run_now("sync", handler)
+
+    job = session.scalars(select(SyncJob)).one()
+    assert (job.status, job.running_lock) == ("failed", None)
+
+
+def test_admin_dashboard_links_sync(admin_client):
+    response = admin_client.get("/admin/")
+
+    assert response.status_code == 200
+    assert b'href="/admin/sync"' in response.data
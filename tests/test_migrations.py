@@ -0,0 +1,165 @@
+import importlib.util
+import io
+import os
+
+import flask_migrate
+import pytest
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import BigInteger, MetaData, UniqueConstraint, inspect, select, text
+
+from bogan.db.models import Base, Boardgame, Game, Location, Player, PlayerPos
+
+MIGRATIONS = os.path.join(os.path.dirname(__file__), os.pardir, "bogan", "db", "migrations")
+# Stand vor game_bgg_id als BigInteger (c7a2e5f91d36) und allen späteren Migrationen
+BEFORE_BIGINT = "9b4e7f2a1c68"
+
+
+@pytest.fixture
+def migrate(app):
+    """Alembic über Flask-Migrate, die Datenbank ist mit den Models angelegt und auf head gestempelt"""
+    with app.app_context():
+        flask_migrate.stamp(MIGRATIONS, "head")
+        yield lambda command, revision: getattr(flask_migrate, command)(MIGRATIONS, revision)
+
+
+def columns(engine, table: str) -> dict:
+    return {column["name"]: column for column in inspect(engine).get_columns(table)}
+
+
+def indexes(engine, table: str) -> set[str]:
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+
+def test_downgrade_and_upgrade_later_migrations(engine, session, migrate):
+    session.add_all([Location(name="Daheim"), Player(name="Anna"), Player(name="Ben")])
+    session.add(
+        Boardgame(bgg_id=13, name="Catan", name_primary="Catan", img="", img_small="", yearpublished=1995,
+                  minplayers=3, maxplayers=4, playtime=90, rating=7.1, weight=2.3)
+    )
+    session.flush()
+    game = Game(game_bgg_id=2**40, boardgame_id=1, location_id=1)
+    session.add(game)
+    session.flush()
+    session.add_all(
+        [
+            PlayerPos(game_id=game.id, player_id=1, points=10, win=False),
+            PlayerPos(game_id=game.id, player_id=2, points=12, win=True),
+        ]
+    )
+    session.commit()
+    session.close()
+
+    migrate("downgrade", BEFORE_BIGINT)
+    assert "position" not in columns(engine, "player_pos")
+    assert "checkpoint_newest_date" not in columns(engine, "sync_state")
+    assert not columns(engine, "game")["game_bgg_id"]["nullable"]
+
+    migrate("upgrade", "head")
+    game_bgg_id = columns(engine, "game")["game_bgg_id"]
+    assert isinstance(game_bgg_id["type"], BigInteger)
+    assert not game_bgg_id["nullable"]
+    assert {"checkpoint_newest_date", "checkpoint_newest_id"} <= set(columns(engine, "sync_state"))
+    assert "ix_player_pos_position" in indexes(engine, "player_pos")
+
+    # Daten bleiben erhalten, die Platzierungen werden beim Upgrade berechnet
+    assert session.scalar(select(Game.game_bgg_id)) == 2**40
+    positions = dict(session.execute(select(PlayerPos.player_id, PlayerPos.position)).all())
+    assert positions == {1: 2, 2: 1}
+
+
+def load_revision(revision: str):
+    for filename in os.listdir(os.path.join(MIGRATIONS, "versions")):
+        if filename.startswith(f"{revision}_"):
+            spec = importlib.util.spec_from_file_location(revision, os.path.join(MIGRATIONS, "versions", filename))
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            return module
+    raise LookupError(revision)
+
+
+@pytest.mark.parametrize("step", ["upgrade", "downgrade"])
+def test_bigint_migration_keeps_not_null_on_mysql(step):
+    # MySQL setzt bei MODIFY ohne NOT NULL die Spalte auf nullable, SQLite übernimmt es beim Kopieren der Tabelle
+    output = io.StringIO()
+    context = MigrationContext.configure(dialect_name="mysql", opts={"as_sql": True, "output_buffer": output})
+    with Operations.context(context):
+        getattr(load_revision("c7a2e5f91d36"), step)()
+
+    assert "MODIFY game_bgg_id" in output.getvalue()
+    assert "NOT NULL" in output.getvalue()
+
+
+
+# Stand vor den eindeutigen Schlüsseln für den Bulk Upsert (3e7b9c0a5d21)
+BEFORE_UNIQUE_KEYS = "8c1f3a2d9e47"
+UNIQUE_KEYS = "3e7b9c0a5d21"
+
+
+@pytest.fixture
+def duplicates(engine, session, migrate):
+    """game und player_pos ohne eindeutige Schlüssel (Stand vor 3e7b9c0a5d21), mit einer doppelten Partie
+    (game_bgg_id 7) und einem doppelten PlayerPos. Die übrigen Tabellen kommen aus den Models."""
+    session.add_all([Location(name="Daheim"), Player(name="Anna"), Player(name="Ben")])
+    session.add(
+        Boardgame(bgg_id=13, name="Catan", name_primary="Catan", img="", img_small="", yearpublished=1995,
+                  minplayers=3, maxplayers=4, playtime=90, rating=7.1, weight=2.3)
+    )
+    session.commit()
+    session.close()
+
+    metadata = MetaData()
+    for table in Base.metadata.sorted_tables:
+        table.to_metadata(metadata)
+    tables = [metadata.tables["game"], metadata.tables["player_pos"]]
+    for table in tables:
+        for constraint in [c for c in table.constraints if isinstance(c, UniqueConstraint)]:
+            table.constraints.discard(constraint)
+        for column in table.columns:
+            column.unique = False
+    metadata.drop_all(engine, tables=tables)
+    metadata.create_all(engine, tables=tables)
+    migrate("stamp", BEFORE_UNIQUE_KEYS)
+
+    with engine.begin() as connection:
+        for game_id in (1, 2):
+            connection.execute(
+                text("INSERT INTO game (id, game_bgg_id, boardgame_id, location_id) VALUES (:id, 7, 1, 1)"),
+                {"id": game_id},
+            )
+        # Anna in beiden Partien und doppelt in der ersten, Ben nur in der doppelten Partie
+        for pos_id, game_id, player_id in ((1, 1, 1), (2, 2, 1), (3, 2, 2), (4, 1, 1)):
+            connection.execute(
+                text("INSERT INTO player_pos (id, game_id, player_id, points, win) VALUES (:id, :game, :player, 1, 0)"),
+                {"id": pos_id, "game": game_id, "player": player_id},
+            )
+
+
+def player_pos_rows(engine) -> list[tuple]:
+    with engine.connect() as connection:
+        return connection.execute(text("SELECT id, game_id, player_id FROM player_pos ORDER BY id")).all()
+
+
+def test_unique_keys_abort_on_duplicates(engine, migrate, duplicates, capsys):
+    # Flask-Migrate beendet sich bei Fehlern mit Exit-Code 1 und loggt die Meldung
+    with pytest.raises(SystemExit):
+        migrate("upgrade", UNIQUE_KEYS)
+
+    assert "1 doppelte game (game_bgg_id) und 1 doppelte player_pos" in capsys.readouterr().err
+    assert len(player_pos_rows(engine)) == 4
+
+
+def test_unique_keys_merge_duplicates(engine, app, duplicates, capsys):
+    with app.app_context():
+        flask_migrate.upgrade(MIGRATIONS, UNIQUE_KEYS, x_arg=["merge_duplicates=1"])
+
+    log = capsys.readouterr().err
+    assert "2 PlayerPos auf das älteste Game umgehängt" in log
+    assert "2 doppelte PlayerPos gelöscht" in log
+    assert "1 doppelte Games gelöscht" in log
+
+    # Bens Eintrag der doppelten Partie hängt an der behaltenen Partie, Annas Duplikate sind gelöscht
+    assert player_pos_rows(engine) == [(1, 1, 1), (3, 1, 2)]
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT id FROM game")).scalars().all() == [1]
+    assert {"game_bgg_id"} <= {c["name"] for c in inspect(engine).get_unique_constraints("game")}
@@ -0,0 +1,69 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import select
+
+from bogan.db.models import Boardgame, Game, Location, Player, PlayerPos
+
+
+@pytest.fixture
+def game(session):
+    boardgame = Boardgame(bgg_id=13, name="Catan", name_primary="Catan", img="", img_small="", yearpublished=1995,
+                          minplayers=3, maxplayers=4, playtime=90, rating=7.0, weight=2.3)
+    game = Game(game_bgg_id=1, datum=date(2024, 1, 1), boardgame=boardgame, location=Location(name="Cafe"))
+    session.add_all([
+        PlayerPos(game=game, player=Player(name="A"), points=10, win=False),
+        Player(name="B"),
+    ])
+    session.commit()
+    return game
+
+
+def positions(session) -> list[tuple]:
+    session.expire_all()
+    return session.execute(
+        select(Player.name, PlayerPos.points, PlayerPos.position).join(PlayerPos.player).order_by(Player.name)
+    ).all()
+
+
+def test_positions_on_insert_with_relationship(session, game):
+    session.add(PlayerPos(game=game, player=session.scalars(select(Player).filter_by(name="B")).one(), points=20,
+                          win=False))
+    session.commit()
+
+    assert positions(session) == [("A", 10.0, 2), ("B", 20.0, 1)]
+
+
+def test_positions_on_insert_with_foreign_keys(session, game):
+    player = session.scalars(select(Player).filter_by(name="B")).one()
+    assert len(game.player_pos) == 1  # Collection ist geladen
+
+    session.add(PlayerPos(game_id=game.id, player_id=player.id, points=20, win=False))
+    session.commit()
+
+    assert positions(session) == [("A", 10.0, 2), ("B", 20.0, 1)]
+
+
+def test_positions_on_insert_with_foreign_keys_collection_not_loaded(session, game):
+    game_id = game.id
+    player_id = session.scalars(select(Player.id).filter_by(name="B")).one()
+    session.expire_all()
+
+    session.add(PlayerPos(game_id=game_id, player_id=player_id, points=5, win=False))
+    session.commit()
+
+    assert positions(session) == [("A", 10.0, 1), ("B", 5.0, 2)]
+
+
+def test_positions_on_update_and_delete(session, game):
+    player = session.scalars(select(Player).filter_by(name="B")).one()
+    session.add(PlayerPos(game=game, player=player, points=20, win=False))
+    session.commit()
+
+    game.player_pos[0].points = 30
+    session.commit()
+    assert positions(session) == [("A", 30.0, 1), ("B", 20.0, 2)]
+
+    session.delete(game.player_pos[0])
+    session.commit()
+    assert positions(session) == [("B", 20.0, 1)]
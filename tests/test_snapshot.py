@@ -0,0 +1,77 @@
+import gzip
+
+import pytest
+
+from bogan.db.snapshot import compact_snapshot, read_headers, read_snapshot, write_snapshot_stream
+
+
+def plays(*ids, version: int = 1) -> list[dict]:
+    return [{"@id": str(id_), "@length": str(version)} for id_ in ids]
+
+
+def write(path, my_games, **kwargs) -> list[dict]:
+    return list(write_snapshot_stream(my_games, str(path), "anna", **kwargs))
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "snapshot" / "plays.ndjson.gz"
+
+
+def test_stream_passes_plays_through(path):
+    assert write(path, plays(1, 2, 3)) == plays(1, 2, 3)
+    assert list(read_snapshot(str(path))) == plays(1, 2, 3)
+    assert [(header.kind, header.count) for header in read_headers(str(path))] == [("full", 3)]
+
+
+def test_delta_replaces_older_versions(path):
+    write(path, plays(3, 2, 1))
+    write(path, plays(4, 2, version=2), delta=True, mindate="2024-01-01")
+
+    assert sorted(read_snapshot(str(path)), key=lambda play: play["@id"]) == [
+        *plays(1), *plays(2, version=2), *plays(3), *plays(4, version=2)
+    ]
+    headers = read_headers(str(path))
+    assert [(header.kind, header.count, header.mindate) for header in headers] == [
+        ("full", 3, None), ("delta", 2, "2024-01-01")
+    ]
+
+
+def test_full_sync_replaces_snapshot(path):
+    write(path, plays(1, 2))
+    write(path, plays(5), delta=True)
+    write(path, plays(7))
+
+    assert list(read_snapshot(str(path))) == plays(7)
+
+
+def test_interrupted_stream_keeps_snapshot(path):
+    write(path, plays(1, 2))
+
+    def broken():
+        yield from plays(3)
+        raise ConnectionError("BGG nicht erreichbar")
+
+    with pytest.raises(ConnectionError):
+        write(path, broken(), delta=True)
+
+    assert list(read_snapshot(str(path))) == plays(1, 2)
+    assert not path.with_name(path.name + ".body").exists()
+
+
+def test_compact_keeps_newest_versions(path):
+    write(path, plays(1, 2))
+    write(path, plays(2, version=2), delta=True)
+
+    assert compact_snapshot(str(path)) == 2
+    assert [header.kind for header in read_headers(str(path))] == ["full"]
+    assert sorted(read_snapshot(str(path)), key=lambda play: play["@id"]) == [*plays(1), *plays(2, version=2)]
+
+
+def test_file_without_header_is_rejected(path):
+    path.parent.mkdir()
+    with gzip.open(path, "wt") as file:
+        file.write('{"@id": "1"}\n')
+
+    with pytest.raises(ValueError):
+        list(read_snapshot(str(path)))
@@ -0,0 +1,165 @@
+import json
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from bogan.db import update_db
+from bogan.db.models import Game, SyncState
+from bogan.config import BGG_PLAYS_PER_PAGE, GAME_USER
+
+START = date(2024, 1, 1)
+
+
+def make_plays(count: int, first_id: int = 1000) -> list[dict]:
+    """Spiele im Format der BGG-API, neueste zuerst (wie BGG sie liefert)"""
+    plays = []
+    for i in range(count):
+        players = [
+            {"@name": name, "@score": str(10 + (i + j) % 7), "@win": "1" if j == i % 3 else "0"}
+            for j, name in enumerate(("Anna", "Ben", "Cleo"))
+        ]
+        plays.append(
+            {
+                "@id": str(first_id + i),
+                "@date": (START + timedelta(days=i // 2)).isoformat(),
+                "@length": "60",
+                "@location": "Daheim",
+                "item": {"@name": f"Spiel {i % 5}", "@objectid": str(100 + i % 5)},
+                "players": {"player": players},
+            }
+        )
+    plays.reverse()
+    return plays
+
+
+class FakeBgg:
+    """Ersetzt iter_plays: liefert `plays` seitenweise ab start_page, bricht optional nach `fail_after` Spielen ab"""
+
+    def __init__(self, plays: list[dict], fail_after: int = None):
+        self.plays = plays
+        self.fail_after = fail_after
+        self.start_pages = []
+
+    def __call__(self, user, mindate=None, start_page=1):
+        self.start_pages.append(start_page)
+        for index, play in enumerate(self.plays[(start_page - 1) * BGG_PLAYS_PER_PAGE:]):
+            if self.fail_after is not None and index >= self.fail_after:
+                raise ConnectionError("BGG nicht erreichbar")
+            yield play
+
+
+@pytest.fixture
+def sync(engine, offline_boardgames, monkeypatch, tmp_path):
+    monkeypatch.setattr(update_db, "SNAPSHOT_PATH", str(tmp_path / "missing.ndjson.gz"))
+
+    def sync(fake=None, **kwargs):
+        if fake is not None:
+            monkeypatch.setattr(update_db, "iter_plays", fake)
+        kwargs.setdefault("from_api", True)
+        update_db.update_db(batch_size=50, commit_every=100, **kwargs)
+
+    return sync
+
+
+def sync_state(session) -> SyncState:
+    session.expire_all()
+    return session.scalars(select(SyncState).filter_by(bgg_user=GAME_USER)).one()
+
+
+def game_ids(session) -> set[int]:
+    return set(session.scalars(select(Game.game_bgg_id)))
+
+
+def test_full_sync_sets_watermark(sync, session):
+    plays = make_plays(120)
+    sync(FakeBgg(plays))
+
+    state = sync_state(session)
+    assert (state.last_play_date, state.last_play_id) == (date.fromisoformat(plays[0]["@date"]), 1119)
+    assert state.checkpoint_kind is None
+    assert len(game_ids(session)) == 120
+
+
+def test_resumed_sync_keeps_watermark_of_earlier_pages(sync, session):
+    plays = make_plays(250)
+    newest = (date.fromisoformat(plays[0]["@date"]), int(plays[0]["@id"]))
+
+    with pytest.raises(ConnectionError):
+        sync(FakeBgg(plays, fail_after=220))
+    state = sync_state(session)
+    assert (state.checkpoint_kind, state.checkpoint_plays, state.checkpoint_page) == ("sync", 200, 3)
+    assert state.checkpoint_newest() == newest
+    # abgebrochener Sync verschiebt das Wasserzeichen nicht
+    assert state.last_play_date is None
+
+    fake = FakeBgg(plays)
+    sync(fake)
+
+    # eine Seite vor dem Checkpoint, die neuesten Spiele (Seite 1) werden nicht erneut geladen
+    assert fake.start_pages == [2]
+    state = sync_state(session)
+    assert (state.last_play_date, state.last_play_id) == newest
+    assert state.checkpoint_kind is None
+    assert len(game_ids(session)) == 250
+
+
+def test_offline_sync_ignores_checkpoint_of_api_sync(sync, session, tmp_path, monkeypatch):
+    with pytest.raises(ConnectionError):
+        sync(FakeBgg(make_plays(250), fail_after=220))
+    assert sync_state(session).checkpoint_kind == "sync"
+
+    offline_plays = make_plays(150, first_id=5000)
+    legacy = tmp_path / "plays.json"
+    legacy.write_text(json.dumps(offline_plays))
+    monkeypatch.setattr(update_db, "LEGACY_SAVE_PATH", str(legacy))
+    sync(from_api=False)
+
+    # alle Spiele der Datei verarbeitet, nicht ab dem Checkpoint der API, die übrigen Spiele gelöscht
+    assert game_ids(session) == {int(play["@id"]) for play in offline_plays}
+    assert sync_state(session).last_play_id == 5149
+
+
+@pytest.fixture
+def interrupted_offline_sync(sync, session, tmp_path, monkeypatch) -> list[dict]:
+    """Offline-Sync aus einer JSON-Datei mit 250 Spielen, bricht nach 4 Batches (200 Spielen) ab"""
+    offline_plays = make_plays(250)
+    legacy = tmp_path / "plays.json"
+    legacy.write_text(json.dumps(offline_plays))
+    monkeypatch.setattr(update_db, "LEGACY_SAVE_PATH", str(legacy))
+    original = update_db.write_batches
+
+    def failing_write_batches(*args, **kwargs):
+        for index, prepared in enumerate(original(*args, **kwargs)):
+            if index == 4:
+                raise ConnectionError("abgebrochen")
+            yield prepared
+
+    monkeypatch.setattr(update_db, "write_batches", failing_write_batches)
+    with pytest.raises(ConnectionError):
+        sync(from_api=False)
+    monkeypatch.setattr(update_db, "write_batches", original)
+
+    state = sync_state(session)
+    assert (state.checkpoint_kind, state.checkpoint_plays) == (update_db.CHECKPOINT_OFFLINE, 200)
+    return offline_plays
+
+
+def test_interrupted_offline_sync_resumes_offline(sync, session, interrupted_offline_sync):
+    sync(from_api=False)
+
+    # die Spiele nach dem Checkpoint sind älter, das Wasserzeichen stammt aus dem Checkpoint
+    state = sync_state(session)
+    newest = interrupted_offline_sync[0]
+    assert (state.last_play_date, state.last_play_id) == (date.fromisoformat(newest["@date"]), int(newest["@id"]))
+    assert state.checkpoint_kind is None
+    assert len(game_ids(session)) == 250
+
+
+def test_api_sync_ignores_checkpoint_of_offline_sync(sync, session, interrupted_offline_sync):
+    fake = FakeBgg(interrupted_offline_sync)
+    sync(fake)
+
+    assert fake.start_pages == [1]
+    assert sync_state(session).checkpoint_kind is None
+    assert len(game_ids(session)) == 250
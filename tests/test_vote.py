@@ -0,0 +1,68 @@
+import pytest
+from flask import url_for
+
+from bogan.db import ask_bgg
+from bogan.db.models import Boardgame, User
+from bogan.tools import vote
+
+RESULTS = [{"id": "13", "name": "Die Siedler von Catan", "is_primary": False}]
+
+
+@pytest.fixture
+def bgg(monkeypatch):
+    """Suche und Brettspiele ohne BGG, zählt die Suchen"""
+    searches = []
+
+    def search_results(search):
+        searches.append(search)
+        return RESULTS
+
+    def ask_boardgame(ids, names=None):
+        return [
+            Boardgame(bgg_id=int(bgg_id), name=name, name_primary="Catan", img="", img_small="", yearpublished=1995,
+                      minplayers=3, maxplayers=4, playtime=90, rating=7.0, weight=2.3)
+            for bgg_id, (name, _) in zip(ids, names or [("Catan", True)] * len(ids))
+        ]
+
+    monkeypatch.setattr(vote, "search_results", search_results)
+    monkeypatch.setattr(vote, "ask_boardgame", ask_boardgame)
+    monkeypatch.setattr(ask_bgg, "ask_boardgame", ask_boardgame)
+    return searches
+
+
+@pytest.fixture
+def add_game_url(app):
+    with app.test_request_context():
+        return url_for("tools.vote.add_game")
+
+
+def test_add_game_from_last_search(admin_client, session, bgg, add_game_url):
+    response = admin_client.post(add_game_url, data={"button_pressed": "search_bg", "search_input": "catan"})
+    assert response.status_code == 200
+    assert bgg == ["catan"]
+
+    admin_client.post(add_game_url, data={"button_pressed": "add_bg", "game_id": "13"})
+
+    boardgame = session.query(Boardgame).filter_by(bgg_id=13).one()
+    assert boardgame.name == "Die Siedler von Catan"
+
+
+def test_add_game_not_in_search(admin_client, session, bgg, add_game_url):
+    admin_client.post(add_game_url, data={"button_pressed": "search_bg", "search_input": "catan"})
+
+    response = admin_client.post(add_game_url, data={"button_pressed": "add_bg", "game_id": "42"})
+
+    assert response.status_code == 302
+    assert session.query(Boardgame).count() == 0
+
+
+def test_search_is_stored_per_user(app, session, bgg):
+    session.add_all([User(id=1, name="anna", password="-"), User(id=2, name="ben", password="-")])
+    session.commit()
+
+    with app.app_context():
+        vote.save_search(1, RESULTS)
+        vote.save_search(1, RESULTS)
+
+        assert vote.load_selection(1, "13").bgg_id == 13
+        assert vote.load_selection(2, "13") is None